@@ -1,9 +1,36 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-import plotly.graph_objects as go
-from datetime import datetime
-import re
+import os
+import time
+from collections import OrderedDict
+
+from cache import DataFrameCache, content_key
+from calllog import CallLog
+from charts import downsample, histogram_bins, histogram_figure
+from classifier import DERIVED_COLUMNS, decode_emotion_column, rules_error
+from dedup import cluster_table, near_duplicate_clusters
+from llm import CompletionsClient, LLMClassifier, ResponseCache
+from loader import classify_calls, iter_call_chunks, load_call_data, loader_version
+from memo import label_memo
+from metrics import CallSummary
+from prompts import (
+    LLM_COLUMNS,
+    booking_success_prompt,
+    emergency_prompt,
+    insurance_prompt,
+    patient_type_prompt,
+    purpose_prompt,
+    sentiment_prompt,
+)
+from practices import compare_practices
+import profiling
+from report import dashboard_metrics, summarize_exports
+from schema import resolve_schema, schema_columns
+from search import TranscriptIndex
+from store import CallStore
+from tail import CallTail
+from trends import TREND_FREQUENCIES
 
 # Set up the page
 st.set_page_config(
@@ -17,151 +44,257 @@ st.title("🎙️ Voicestack - Dental Front Desk Call Dashboard")
 
 # File upload section
 st.subheader("📁 Upload Call Data")
-uploaded_file = st.file_uploader("Choose your CSV file", type=['csv'])
-
-# REAL AI CLASSIFICATION FUNCTIONS
-def classify_call_purpose(transcript):
-    """Real AI classification based on transcript content"""
-    if pd.isna(transcript) or transcript == "":
-        return "Unknown"
-    
-    transcript_lower = str(transcript).lower()
-    
-    # Booking detection
-    booking_terms = ['schedule', 'appointment', 'booking', 'make an appt', 'book', 'reserve']
-    if any(term in transcript_lower for term in booking_terms):
-        return "Appointment Booking"
-    
-    # Cancellation detection
-    cancel_terms = ['cancel', 'cancellation', 'reschedule', 'change appointment', 'can\'t make it']
-    if any(term in transcript_lower for term in cancel_terms):
-        return "Cancellation"
-    
-    # No-show detection
-    noshow_terms = ['missed appointment', 'no show', 'didn\'t come', 'wasn\'t there', 'missed my appt']
-    if any(term in transcript_lower for term in noshow_terms):
-        return "No-Show Followup"
-    
-    # Billing detection
-    billing_terms = ['bill', 'payment', 'insurance', 'cost', 'price', 'charge', 'fee']
-    if any(term in transcript_lower for term in billing_terms):
-        return "Billing/Insurance"
-    
-    # Emergency detection
-    emergency_terms = ['emergency', 'hurt', 'pain', 'toothache', 'broken', 'urgent', 'swelling']
-    if any(term in transcript_lower for term in emergency_terms):
-        return "Clinical Emergency"
-    
-    return "General Inquiry"
-
-def detect_booking_success(transcript):
-    """Detect if booking attempt was successful"""
-    if pd.isna(transcript) or transcript == "":
-        return "Unknown"
-    
-    transcript_lower = str(transcript).lower()
-    
-    success_terms = ['sure', 'ok', 'great', 'confirmed', 'thank you', 'see you', 'scheduled', 'perfect', 'thanks']
-    failure_terms = ['think about', 'call back', 'check', 'maybe', 'not sure', 'let me know', 'get back']
-    
-    success_count = sum(1 for term in success_terms if term in transcript_lower)
-    failure_count = sum(1 for term in failure_terms if term in transcript_lower)
-    
-    if success_count > failure_count:
-        return "Successful"
-    elif failure_count > success_count:
-        return "Failed"
-    else:
-        return "Unknown"
+uploaded_files = st.file_uploader(
+    "Choose your CSV file",
+    type=['csv'],
+    accept_multiple_files=True,
+    help="Upload one export per practice to compare practices side by side"
+)
+# One file drives the full dashboard; several open the practice comparison
+uploaded_file = uploaded_files[0] if len(uploaded_files) == 1 else None
+
+@st.cache_resource
+def get_data_cache():
+    """Process-wide cache of parsed and classified uploads, shared across reruns"""
+    max_mb = int(os.environ.get('VOICESTACK_CACHE_MB', '512'))
+    cache_dir = os.environ.get('VOICESTACK_CACHE_DIR') or None
+    return DataFrameCache(max_bytes=max_mb * 1024 ** 2, cache_dir=cache_dir)
+
+@st.cache_resource
+def get_call_store():
+    """Optional persisted Parquet store of classified calls (VOICESTACK_STORE_DIR)"""
+    store_dir = os.environ.get('VOICESTACK_STORE_DIR')
+    return CallStore(store_dir) if store_dir else None
+
+@st.cache_resource
+def get_llm_classifier():
+    """Optional LLM classification backend (VOICESTACK_LLM_URL), with its response cache"""
+    base_url = os.environ.get('VOICESTACK_LLM_URL')
+    if not base_url:
+        return None
+    concurrency = int(os.environ.get('VOICESTACK_LLM_CONCURRENCY', '8'))
+    client = CompletionsClient(
+        base_url,
+        model=os.environ.get('VOICESTACK_LLM_MODEL', 'default'),
+        api_key=os.environ.get('VOICESTACK_LLM_API_KEY'),
+        max_concurrency=concurrency
+    )
+    return LLMClassifier(
+        client,
+        cache=ResponseCache(os.environ.get('VOICESTACK_LLM_CACHE', ':memory:')),
+        batch_size=int(os.environ.get('VOICESTACK_LLM_BATCH', '16')),
+        max_concurrency=concurrency,
+        requests_per_second=float(os.environ.get('VOICESTACK_LLM_RPS', '0')) or None
+    )
+
+@st.cache_resource
+def get_call_tail():
+    """Optional live call log: a CSV file or drop directory followed by every session (VOICESTACK_TAIL_PATH)"""
+    path = os.environ.get('VOICESTACK_TAIL_PATH')
+    return CallTail(path) if path else None
+
+# Call logs kept for incremental re-uploads, least recently used first
+MAX_CALL_LOGS = 8
+
+@st.cache_resource
+def get_call_logs():
+    """Process-wide CallLogs, one per uploaded file name and classification mode"""
+    return OrderedDict()
+
+def get_call_log(key, call_store=None):
+    """The CallLog for key, created (classifying through the call store if configured) on first use"""
+    call_logs = get_call_logs()
+    if key not in call_logs:
+        call_logs[key] = CallLog(call_store.classify_and_append if call_store is not None else classify_calls)
+        while len(call_logs) > MAX_CALL_LOGS:
+            call_logs.popitem(last=False)
+    call_logs.move_to_end(key)
+    return call_logs[key]
+
+def dashboard_columns(columns):
+    """Columns the dashboard sections read, so the store can skip the rest"""
+    return schema_columns(resolve_schema(columns)) + [
+        col for col in columns if col in DERIVED_COLUMNS or col in LLM_COLUMNS
+    ]
+
+def practice_exports(files):
+    """Practice name (the file name) -> CSV bytes for several uploads"""
+    exports = {}
+    for file in files:
+        name = base = os.path.splitext(file.name)[0]
+        copy = 1
+        while name in exports:
+            copy += 1
+            name = f"{base} ({copy})"
+        exports[name] = file.getvalue()
+    return exports
+
+# Default seconds between live mode refreshes
+TAIL_REFRESH_SECONDS = int(os.environ.get('VOICESTACK_TAIL_INTERVAL', '10'))
+
+# Uploads above this size default to streaming mode
+STREAMING_THRESHOLD_BYTES = 100 * 1024 ** 2
+# Practice picker entry for the side-by-side view of every uploaded practice
+ALL_PRACTICES = "🏥 All practices (comparison)"
+
+# Performance panel - stage timings of this rerun, filled in at the end of the script
+performance_panel = st.sidebar.expander("⏱️ Performance")
+profile = None
+# A previous run that raised or was interrupted never reached the end: release its profile now
+profiling.stop(st.session_state.pop('profile', None))
+profiling.stop()
+if performance_panel.checkbox("Profile reruns", value=profiling.PROFILE_DEFAULT,
+                              help="Time every stage of each rerun: CSV parsing, classification, aggregation, sections"):
+    profile = profiling.start(trace_memory=performance_panel.checkbox(
+        "Track peak memory", help="Trace allocations per stage - slows reruns down while on"
+    ))
+    st.session_state['profile'] = profile
+
+data_cache = get_data_cache()
+call_store = get_call_store()
+call_tail = get_call_tail()
+llm_classifier = get_llm_classifier()
+data = None
+summary = None
+comparison = None
+call_log = None
 
-def analyze_sentiment(transcript):
-    """Basic sentiment analysis from transcript"""
-    if pd.isna(transcript) or transcript == "":
-        return "Neutral"
-    
-    transcript_lower = str(transcript).lower()
-    
-    positive_terms = ['thank', 'thanks', 'appreciate', 'great', 'good', 'helpful', 'wonderful', 'excellent', 'perfect', 'happy']
-    negative_terms = ['angry', 'frustrated', 'upset', 'disappointed', 'not happy', 'problem', 'issue', 'complaint', 'bad', 'terrible']
-    
-    positive_count = sum(1 for term in positive_terms if term in transcript_lower)
-    negative_count = sum(1 for term in negative_terms if term in transcript_lower)
-    
-    if positive_count > negative_count:
-        return "Positive"
-    elif negative_count > positive_count:
-        return "Negative"
+if uploaded_file is not None:
+    # Load data - parsed and classified frames are cached by file content.
+    # With a call store configured, only calls it has not seen are classified.
+    raw_bytes = uploaded_file.getvalue()
+    mode = loader_version()
+    if call_store is not None:
+        mode += "-stored"
+    
+    # LLM mode runs the classification prompts below on top of the keyword labels
+    use_llm = llm_classifier is not None and st.sidebar.checkbox(
+        "LLM classification",
+        help="Send each distinct transcript through the classification prompts (answers are cached)"
+    )
+    if use_llm:
+        mode += f"-llm-{llm_classifier.version()}"
+    cache_key = content_key(raw_bytes, mode)
+    
+    # Re-uploads of a growing log only classify, and fold into the
+    # aggregates, the calls the previous upload of that file did not have
+    call_log = get_call_log(f"{uploaded_file.name}-{mode}", call_store)
+    # Reused/classified rows of this upload, kept with the session (the CallLog is shared)
+    label_tallies = st.session_state.setdefault('label_tallies', {})
+    classify = lambda data: call_log.classify(data, label_tallies.setdefault(cache_key, {}))
+    if use_llm:
+        classify = lambda data: llm_classifier.label_calls(call_log.classify(data, label_tallies.setdefault(cache_key, {})))
+
+    def read_upload():
+        # Each read labels the whole upload again: count it afresh
+        label_tallies[cache_key] = {}
+        return iter_call_chunks(raw_bytes, classify=classify)
+    
+    # Streaming mode never builds the full frame: each chunk is classified
+    # and folded into the dashboard aggregates, then dropped
+    streaming = st.sidebar.checkbox(
+        "Streaming mode (large exports)",
+        value=len(raw_bytes) > STREAMING_THRESHOLD_BYTES,
+        help="Read the CSV in chunks and keep only the aggregates the dashboard needs"
+    )
+    if streaming:
+        summary = data_cache.get(cache_key + "-summary")
+        if summary is None:
+            with st.spinner("🤖 Streaming calls through AI classification..."), profiling.stage("Streaming load"):
+                summary = call_log.summarize(read_upload)
+            data_cache.put(cache_key + "-summary", summary)
     else:
-        return "Neutral"
-
-def detect_emotions(transcript):
-    """Detect specific emotions in transcript"""
-    if pd.isna(transcript) or transcript == "":
-        return []
-    
-    transcript_lower = str(transcript).lower()
-    emotions = []
-    
-    emotion_patterns = {
-        'grateful': ['thank', 'appreciate', 'grateful'],
-        'frustrated': ['frustrated', 'annoyed', 'angry', 'mad'],
-        'anxious': ['worried', 'anxious', 'nervous', 'scared'],
-        'satisfied': ['happy', 'satisfied', 'pleased', 'good'],
-        'confused': ['confused', 'not sure', 'don\'t understand']
-    }
-    
-    for emotion, terms in emotion_patterns.items():
-        if any(term in transcript_lower for term in terms):
-            emotions.append(emotion)
-    
-    return emotions[:3]  # Return top 3 emotions
-
-def assess_call_quality(transcript, sentiment):
-    """Assess call quality based on transcript and sentiment"""
-    if pd.isna(transcript) or transcript == "":
-        return "Unknown"
-    
-    transcript_lower = str(transcript).lower()
-    words = len(transcript_lower.split())
-    
-    # Quality assessment logic
-    if sentiment == 'Positive' and words > 30:
-        return "Excellent"
-    elif sentiment == 'Positive':
-        return "Good"
-    elif sentiment == 'Negative' and words < 10:
-        return "Poor"
-    elif sentiment == 'Negative':
-        return "Needs Improvement"
+        data = data_cache.get(cache_key)
+        if data is None:
+            with st.spinner("🤖 Applying AI classification to call transcripts..."):
+                label_tallies[cache_key] = {}
+                data = load_call_data(raw_bytes, classify=classify)
+            data_cache.put(cache_key, data)
+        summary_key = cache_key + "-summary"
+    tally = label_tallies.get(cache_key, {})
+    if tally.get('reused'):
+        st.sidebar.caption(
+            f"♻️ {uploaded_file.name}: {tally['reused']:,} call labels reused, "
+            f"{tally.get('classified', 0):,} calls classified"
+        )
+
+# Several uploads: one streamed summary per practice, built in parallel
+# (one process per export) and cached per file like a streaming upload
+if len(uploaded_files) > 1:
+    exports = practice_exports(uploaded_files)
+    keys = {name: content_key(raw_bytes, loader_version()) + "-summary" for name, raw_bytes in exports.items()}
+    summaries = {name: data_cache.get(key) for name, key in keys.items()}
+    missing = {name: exports[name] for name, cached in summaries.items() if cached is None}
+    if missing:
+        with st.spinner(f"🤖 Classifying {len(missing)} practice exports in parallel..."), profiling.stage("Practice exports"):
+            for name, practice_summary in summarize_exports(missing).items():
+                summaries[name] = practice_summary
+                if practice_summary is not None:
+                    data_cache.put(keys[name], practice_summary)
+    
+    st.sidebar.subheader("🏥 Practices")
+    practice = st.sidebar.selectbox("Practice", [ALL_PRACTICES] + list(summaries))
+    if practice == ALL_PRACTICES:
+        comparison = compare_practices(summaries)
     else:
-        return "Average"
+        summary = summaries[practice]
+
+# Call store browsing - load a date range of previously classified calls
+if call_store is not None and call_store.date_range() is not None:
+    st.sidebar.subheader("📦 Call Store")
+    source = st.sidebar.radio("Data source", ["Uploaded file", "Call store"],
+                              index=0 if uploaded_files else 1)
+    if source == "Call store":
+        comparison = None
+        call_log = None
+        first_day, last_day = call_store.date_range()
+        picked = st.sidebar.date_input("Call dates", value=(first_day, last_day),
+                                       min_value=first_day, max_value=last_day)
+        start, end = (picked[0], picked[-1]) if isinstance(picked, (list, tuple)) else (picked, picked)
+        columns = dashboard_columns(call_store.columns())
+        summary_key = f"store-{call_store.version()}-{start}-{end}-{loader_version()}"
+        with profiling.stage("Store load"):
+            data = data_cache.get_or_compute(summary_key, lambda: call_store.load(start, end, columns=columns))
+        summary_key += "-summary"
+
+if rules_error() is not None:
+    st.sidebar.warning(f"Classifier rule edit not applied - {rules_error()}")
+
+# Live mode - each rerun ingests only the calls written since the last poll
+live = False
+if call_tail is not None:
+    st.sidebar.subheader("📡 Live Mode")
+    live = st.sidebar.checkbox("Follow call log", value=not uploaded_files,
+                               help=f"Read new calls from {call_tail.path} as they are written")
+    if live:
+        refresh_seconds = st.sidebar.number_input("Refresh every (seconds)", min_value=1, max_value=3600,
+                                                  value=TAIL_REFRESH_SECONDS, step=1)
+        with st.spinner("📡 Reading new calls..."), profiling.stage("Live poll") as poll_stage:
+            new_calls = call_tail.poll()
+            poll_stage['rows'] = new_calls
+        data, comparison, call_log = None, None, None
+        summary = call_tail.summary
+        st.sidebar.caption(f"{new_calls:,} new calls at {time.strftime('%H:%M:%S')}")
+
+# Every section renders from the aggregates, never from the raw frame
+if data is not None:
+    with profiling.stage("Aggregation", rows=len(data)):
+        if call_log is not None:
+            summary = data_cache.get_or_compute(summary_key, lambda: call_log.summarize(lambda: [data]))
+        else:
+            summary = data_cache.get_or_compute(summary_key, lambda: CallSummary.from_frame(data))
 
-if uploaded_file is not None:
-    # Load data
-    data = pd.read_csv(uploaded_file)
-    
-    # Basic data cleaning
-    date_columns = [col for col in data.columns if 'time' in col.lower() or 'date' in col.lower()]
-    for date_col in date_columns:
-        data[date_col] = pd.to_datetime(data[date_col], errors='coerce')
-    
-    st.success(f"✅ Successfully loaded {len(data)} calls")
-    
-    # APPLY REAL AI CLASSIFICATION
-    if 'transcript' in data.columns:
-        with st.spinner("🤖 Applying AI classification to call transcripts..."):
-            data['Call_Purpose'] = data['transcript'].apply(classify_call_purpose)
-            data['Booking_Success'] = data['transcript'].apply(detect_booking_success)
-            data['Sentiment'] = data['transcript'].apply(analyze_sentiment)
-            data['Emotions'] = data['transcript'].apply(detect_emotions)
-            data['Call_Quality'] = data.apply(lambda row: assess_call_quality(row['transcript'], row['Sentiment']), axis=1)
-        st.success("✅ AI classification completed!")
-    
-    # =================================================================
-    # 1. QUANTITATIVE METRICS DASHBOARD WITH CHARTS
-    # =================================================================
-    
-    st.header("📊 QUANTITATIVE METRICS")
+# =================================================================
+# DASHBOARD SECTIONS
+# =================================================================
+# Each section reads only the CallSummary. Only the selected section runs on a
+# rerun, and CallSummary memoizes its queries, so revisiting a section
+# recomputes nothing.
+
+def render_call_volumes(summary):
+    """Call volumes by direction, status and contact type"""
+    schema = summary.schema
+    kpis = dashboard_metrics(summary)
     
     # 1. CALL VOLUMES DASHBOARD
     st.subheader("📞 1. Call Volumes Analysis")
@@ -170,9 +303,8 @@ if uploaded_file is not None:
     
     with col1:
         # Call Direction Pie Chart
-        direction_cols = [col for col in data.columns if 'direction' in col.lower()]
-        if direction_cols:
-            direction_counts = data[direction_cols[0]].value_counts()
+        if schema['direction']:
+            direction_counts = summary.value_counts('direction')
             fig = px.pie(
                 values=direction_counts.values,
                 names=direction_counts.index,
@@ -185,9 +317,8 @@ if uploaded_file is not None:
     
     with col2:
         # Call Status Pie Chart
-        status_cols = [col for col in data.columns if 'status' in col.lower()]
-        if status_cols:
-            status_counts = data[status_cols[0]].value_counts()
+        if schema['status']:
+            status_counts = summary.value_counts('status')
             fig = px.pie(
                 values=status_counts.values,
                 names=status_counts.index,
@@ -202,47 +333,48 @@ if uploaded_file is not None:
     col1, col2, col3, col4, col5 = st.columns(5)
     
     with col1:
-        total_calls = len(data)
-        st.metric("Total Calls", total_calls)
+        st.metric("Total Calls", kpis['total_calls'])
     
     with col2:
-        if direction_cols:
-            inbound_calls = data[data[direction_cols[0]] == 'Inbound'].shape[0]
-            st.metric("Inbound Calls", inbound_calls)
+        if kpis['inbound_calls'] is not None:
+            st.metric("Inbound Calls", kpis['inbound_calls'])
         else:
             st.metric("Inbound Calls", "N/A")
     
     with col3:
-        if status_cols:
-            answered_calls = data[data[status_cols[0]] == 'Answered'].shape[0]
-            st.metric("Answered Calls", answered_calls)
+        if kpis['answered_calls'] is not None:
+            st.metric("Answered Calls", kpis['answered_calls'])
         else:
             st.metric("Answered Calls", "N/A")
     
     with col4:
-        if status_cols:
-            missed_calls = data[data[status_cols[0]] == 'Missed'].shape[0]
-            st.metric("Missed Calls", missed_calls)
+        if kpis['missed_calls'] is not None:
+            st.metric("Missed Calls", kpis['missed_calls'])
         else:
             st.metric("Missed Calls", "N/A")
     
     with col5:
-        contact_cols = [col for col in data.columns if 'contact' in col.lower()]
-        if contact_cols:
-            new_patients = data[data[contact_cols[0]] == 'New Patient'].shape[0]
-            st.metric("New Patient Calls", new_patients)
+        if kpis['new_patient_calls'] is not None:
+            st.metric("New Patient Calls", kpis['new_patient_calls'])
         else:
             st.metric("New Patients", "N/A")
     
+    if kpis['duplicate_calls']:
+        st.caption(f"🧬 {kpis['duplicate_calls']:,} duplicate rows (calls exported more than once) are left out of every count")
+
+def render_booking(summary):
+    """Booking inquiries and their conversion"""
+    kpis = dashboard_metrics(summary)
+    
     # 2. BOOKING CONVERSION RATES DASHBOARD
     st.subheader("🎯 2. Booking Conversion Rates")
     
     col1, col2 = st.columns(2)
     
     with col1:
-        if 'Call_Purpose' in data.columns:
+        if summary.has('Call_Purpose'):
             # Booking Purpose Distribution
-            purpose_counts = data['Call_Purpose'].value_counts()
+            purpose_counts = summary.value_counts('purpose')
             fig = px.pie(
                 values=purpose_counts.values,
                 names=purpose_counts.index,
@@ -254,11 +386,10 @@ if uploaded_file is not None:
             st.info("Call purpose analysis requires transcript data")
     
     with col2:
-        if 'Call_Purpose' in data.columns and 'Booking_Success' in data.columns:
+        if summary.has('Call_Purpose') and summary.has('Booking_Success'):
             # Booking Success Pie Chart
-            booking_data = data[data['Call_Purpose'] == 'Appointment Booking']
-            if len(booking_data) > 0:
-                success_counts = booking_data['Booking_Success'].value_counts()
+            if kpis['booking_calls'] > 0:
+                success_counts = summary.value_counts('booking_success', purpose='Appointment Booking')
                 fig = px.pie(
                     values=success_counts.values,
                     names=success_counts.index,
@@ -276,66 +407,54 @@ if uploaded_file is not None:
     col1, col2, col3, col4, col5 = st.columns(5)
     
     with col1:
-        if 'Call_Purpose' in data.columns:
-            booking_calls = data[data['Call_Purpose'] == 'Appointment Booking'].shape[0]
-            st.metric("Booking Inquiries", booking_calls)
+        if kpis['booking_calls'] is not None:
+            st.metric("Booking Inquiries", kpis['booking_calls'])
         else:
             st.metric("Booking Inquiries", "No transcript data")
     
     with col2:
-        if 'Call_Purpose' in data.columns and 'Booking_Success' in data.columns:
-            successful_bookings = data[
-                (data['Call_Purpose'] == 'Appointment Booking') & 
-                (data['Booking_Success'] == 'Successful')
-            ].shape[0]
-            st.metric("Successful Bookings", successful_bookings)
+        if kpis['successful_bookings'] is not None:
+            st.metric("Successful Bookings", kpis['successful_bookings'])
         else:
             st.metric("Successful Bookings", "No transcript data")
     
     with col3:
-        if 'Call_Purpose' in data.columns and 'Booking_Success' in data.columns:
-            booking_calls = data[data['Call_Purpose'] == 'Appointment Booking'].shape[0]
-            successful_bookings = data[
-                (data['Call_Purpose'] == 'Appointment Booking') & 
-                (data['Booking_Success'] == 'Successful')
-            ].shape[0]
-            conversion_rate = (successful_bookings / booking_calls * 100) if booking_calls > 0 else 0
-            st.metric("Conversion Rate", f"{conversion_rate:.1f}%")
+        if kpis['conversion_rate'] is not None:
+            st.metric("Conversion Rate", f"{kpis['conversion_rate']:.1f}%")
         else:
             st.metric("Conversion Rate", "No transcript data")
     
     with col4:
-        if 'Call_Purpose' in data.columns and 'Booking_Success' in data.columns:
-            failed_bookings = data[
-                (data['Call_Purpose'] == 'Appointment Booking') & 
-                (data['Booking_Success'] == 'Failed')
-            ].shape[0]
-            st.metric("Failed Bookings", failed_bookings)
+        if kpis['failed_bookings'] is not None:
+            st.metric("Failed Bookings", kpis['failed_bookings'])
         else:
             st.metric("Failed Bookings", "No transcript data")
     
     with col5:
-        if 'Call_Purpose' in data.columns:
-            total_bookings = data[data['Call_Purpose'] == 'Appointment Booking'].shape[0]
-            total_calls = len(data)
-            booking_rate = (total_bookings / total_calls * 100) if total_calls > 0 else 0
-            st.metric("Booking Call Rate", f"{booking_rate:.1f}%")
+        if kpis['booking_call_rate'] is not None:
+            st.metric("Booking Call Rate", f"{kpis['booking_call_rate']:.1f}%")
         else:
             st.metric("Booking Call Rate", "No transcript data")
+
+def render_cancellations(summary):
+    """Cancellation calls and their detected reasons"""
+    total_calls = summary.total_calls
+    kpis = dashboard_metrics(summary)
     
     # 3. CANCELLATIONS DASHBOARD
     st.subheader("❌ 3. Cancellations Analysis")
     
+    cancellation_calls = kpis['cancellation_calls']
+    
     col1, col2 = st.columns(2)
     
     with col1:
-        if 'Call_Purpose' in data.columns:
+        if summary.has('Call_Purpose'):
             # Cancellation vs Other Calls
-            cancellation_data = data[data['Call_Purpose'] == 'Cancellation']
-            other_calls = len(data) - len(cancellation_data)
+            other_calls = total_calls - cancellation_calls
             
             fig = px.pie(
-                values=[len(cancellation_data), other_calls],
+                values=[cancellation_calls, other_calls],
                 names=['Cancellation Calls', 'Other Calls'],
                 title="Cancellation Calls vs All Other Calls",
                 color_discrete_sequence=['red', 'lightblue']
@@ -345,12 +464,12 @@ if uploaded_file is not None:
             st.info("Cancellation analysis requires transcript data")
     
     with col2:
-        if 'Call_Purpose' in data.columns:
+        if summary.has('Call_Purpose'):
             # Cancellation Reason Analysis (Simple)
             cancellation_reasons = {
-                'Reschedule': data['transcript'].str.contains('reschedule', na=False, case=False).sum(),
-                'Emergency': data['transcript'].str.contains('emergency|can\'t make', na=False, case=False).sum(),
-                'Other': data[data['Call_Purpose'] == 'Cancellation'].shape[0] - data['transcript'].str.contains('reschedule|emergency|can\'t make', na=False, case=False).sum()
+                'Reschedule': summary.keywords['reschedule'],
+                'Emergency': summary.keywords['emergency_or_cant_make'],
+                'Other': cancellation_calls - summary.keywords['cancel_reason']
             }
             
             fig = px.pie(
@@ -367,50 +486,50 @@ if uploaded_file is not None:
     col1, col2, col3, col4, col5 = st.columns(5)
     
     with col1:
-        if 'Call_Purpose' in data.columns:
-            cancellation_calls = data[data['Call_Purpose'] == 'Cancellation'].shape[0]
-            st.metric("Cancellation Calls", cancellation_calls)
+        if kpis['cancellation_calls'] is not None:
+            st.metric("Cancellation Calls", kpis['cancellation_calls'])
         else:
             st.metric("Cancellation Calls", "No transcript data")
     
     with col2:
-        if 'Call_Purpose' in data.columns:
-            total_calls = len(data)
-            cancellation_rate = (cancellation_calls / total_calls * 100) if total_calls > 0 else 0
-            st.metric("Cancellation Rate", f"{cancellation_rate:.1f}%")
+        if kpis['cancellation_rate'] is not None:
+            st.metric("Cancellation Rate", f"{kpis['cancellation_rate']:.1f}%")
         else:
             st.metric("Cancellation Rate", "No transcript data")
     
     with col3:
-        if 'Call_Purpose' in data.columns:
-            reschedule_calls = data['transcript'].str.contains('reschedule', na=False, case=False).sum()
-            st.metric("Reschedule Requests", reschedule_calls)
+        if kpis['reschedule_requests'] is not None:
+            st.metric("Reschedule Requests", kpis['reschedule_requests'])
         else:
             st.metric("Reschedule Requests", "No transcript data")
     
     with col4:
-        if 'Call_Purpose' in data.columns:
-            emergency_cancellations = data['transcript'].str.contains('emergency', na=False, case=False).sum()
-            st.metric("Emergency Cancels", emergency_cancellations)
+        if kpis['emergency_cancellations'] is not None:
+            st.metric("Emergency Cancels", kpis['emergency_cancellations'])
         else:
             st.metric("Emergency Cancels", "No transcript data")
     
     with col5:
-        if 'Call_Purpose' in data.columns:
-            daily_cancellation_rate = (cancellation_calls / total_calls * 100) if total_calls > 0 else 0
-            st.metric("Daily Cancel Rate", f"{daily_cancellation_rate:.1f}%")
+        if kpis['daily_cancellation_rate'] is not None:
+            st.metric("Daily Cancel Rate", f"{kpis['daily_cancellation_rate']:.1f}%")
         else:
             st.metric("Daily Cancel Rate", "No transcript data")
+
+def render_noshows(summary):
+    """No-show followups and their patterns"""
+    total_calls = summary.total_calls
+    kpis = dashboard_metrics(summary)
     
     # 4. NO-SHOWS DASHBOARD
     st.subheader("⏰ 4. No-Shows Analysis")
     
+    noshow_calls = kpis['noshow_calls']
+    
     col1, col2 = st.columns(2)
     
     with col1:
-        if 'Call_Purpose' in data.columns:
+        if summary.has('Call_Purpose'):
             # No-Show Distribution
-            noshow_calls = data[data['Call_Purpose'] == 'No-Show Followup'].shape[0]
             show_calls = total_calls - noshow_calls
             
             fig = px.pie(
@@ -424,15 +543,14 @@ if uploaded_file is not None:
             st.info("No-show analysis requires transcript data")
     
     with col2:
-        if 'Call_Purpose' in data.columns:
+        if summary.has('Call_Purpose'):
             # No-Show Patterns
-            purpose_noshow = data[data['Call_Purpose'] == 'No-Show Followup']
-            if len(purpose_noshow) > 0:
+            if noshow_calls > 0:
                 # Simple pattern analysis
                 patterns = {
-                    'First Time': purpose_noshow['transcript'].str.contains('first', na=False, case=False).sum(),
-                    'Follow-up': purpose_noshow['transcript'].str.contains('follow', na=False, case=False).sum(),
-                    'Reminder': purpose_noshow['transcript'].str.contains('remind', na=False, case=False).sum()
+                    'First Time': summary.noshow_keywords['first'],
+                    'Follow-up': summary.noshow_keywords['follow'],
+                    'Reminder': summary.noshow_keywords['remind']
                 }
                 
                 fig = px.pie(
@@ -451,69 +569,63 @@ if uploaded_file is not None:
     col1, col2, col3, col4, col5 = st.columns(5)
     
     with col1:
-        if 'Call_Purpose' in data.columns:
-            noshow_calls = data[data['Call_Purpose'] == 'No-Show Followup'].shape[0]
-            st.metric("No-Show Calls", noshow_calls)
+        if kpis['noshow_calls'] is not None:
+            st.metric("No-Show Calls", kpis['noshow_calls'])
         else:
             st.metric("No-Show Calls", "No transcript data")
     
     with col2:
-        if 'Call_Purpose' in data.columns:
-            total_calls = len(data)
-            noshow_rate = (noshow_calls / total_calls * 100) if total_calls > 0 else 0
-            st.metric("No-Show Rate", f"{noshow_rate:.1f}%")
+        if kpis['noshow_rate'] is not None:
+            st.metric("No-Show Rate", f"{kpis['noshow_rate']:.1f}%")
         else:
             st.metric("No-Show Rate", "No transcript data")
     
     with col3:
-        if 'Call_Purpose' in data.columns:
-            first_time_noshow = data['transcript'].str.contains('first time', na=False, case=False).sum()
-            st.metric("First Time No-Shows", first_time_noshow)
+        if kpis['first_time_noshows'] is not None:
+            st.metric("First Time No-Shows", kpis['first_time_noshows'])
         else:
             st.metric("First Time No-Shows", "No transcript data")
     
     with col4:
-        if 'Call_Purpose' in data.columns:
-            followup_calls = data['transcript'].str.contains('follow up', na=False, case=False).sum()
-            st.metric("Follow-up Calls", followup_calls)
+        if kpis['followup_calls'] is not None:
+            st.metric("Follow-up Calls", kpis['followup_calls'])
         else:
             st.metric("Follow-up Calls", "No transcript data")
     
     with col5:
-        if 'Call_Purpose' in data.columns:
-            reminder_calls = data['transcript'].str.contains('remind', na=False, case=False).sum()
-            st.metric("Reminder Calls", reminder_calls)
+        if kpis['reminder_calls'] is not None:
+            st.metric("Reminder Calls", kpis['reminder_calls'])
         else:
             st.metric("Reminder Calls", "No transcript data")
+
+def render_response_times(summary):
+    """Ring and call duration statistics"""
+    schema = summary.schema
+    kpis = dashboard_metrics(summary)
     
     # 5. RESPONSE TIMES DASHBOARD
     st.subheader("⚡ 5. Response Times Analysis")
     
+    ring_col = schema['ring']
+    
     col1, col2 = st.columns(2)
     
     with col1:
-        duration_cols = [col for col in data.columns if 'duration' in col.lower()]
-        if duration_cols:
-            # Ring Duration Distribution
-            fig = px.histogram(
-                data, 
-                x=duration_cols[0],
-                title="Ring Duration Distribution",
-                nbins=20,
-                color_discrete_sequence=['blue']
-            )
-            fig.add_vline(x=data[duration_cols[0]].mean(), line_dash="dash", 
+        if ring_col:
+            # Ring Duration Distribution - binned server-side, only bin counts are sent
+            ring_values = summary.value_counts('ring_values')
+            edges, counts = histogram_bins(ring_values.index, weights=ring_values.values)
+            fig = histogram_figure(edges, counts, title="Ring Duration Distribution", x_title=ring_col)
+            fig.add_vline(x=summary.mean(ring_col), line_dash="dash",
                          line_color="red", annotation_text="Average")
             st.plotly_chart(fig, use_container_width=True)
         else:
             st.info("Duration data not available for response time analysis")
     
     with col2:
-        if duration_cols:
+        if ring_col:
             # Response Time Categories
-            fast_response = data[data[duration_cols[0]] <= 15].shape[0]
-            medium_response = data[(data[duration_cols[0]] > 15) & (data[duration_cols[0]] <= 30)].shape[0]
-            slow_response = data[data[duration_cols[0]] > 30].shape[0]
+            fast_response, medium_response, slow_response = summary.ring_bucket_counts()
             
             fig = px.pie(
                 values=[fast_response, medium_response, slow_response],
@@ -529,57 +641,120 @@ if uploaded_file is not None:
     col1, col2, col3, col4, col5 = st.columns(5)
     
     with col1:
-        if duration_cols and 'ring' in duration_cols[0].lower():
-            avg_ring = data[duration_cols[0]].mean()
-            st.metric("Avg Ring Time", f"{avg_ring:.1f}s")
+        if kpis['avg_ring_time'] is not None:
+            st.metric("Avg Ring Time", f"{kpis['avg_ring_time']:.1f}s")
         else:
             st.metric("Avg Ring Time", "N/A")
     
     with col2:
-        if duration_cols and any('conversation' in col.lower() for col in duration_cols):
-            conv_col = [col for col in duration_cols if 'conversation' in col.lower()][0]
-            avg_conv = data[conv_col].mean()
-            st.metric("Avg Call Time", f"{avg_conv:.1f}s")
+        if kpis['avg_call_time'] is not None:
+            st.metric("Avg Call Time", f"{kpis['avg_call_time']:.1f}s")
         else:
             st.metric("Avg Call Time", "N/A")
     
     with col3:
-        if duration_cols and any('total' in col.lower() for col in duration_cols):
-            total_col = [col for col in duration_cols if 'total' in col.lower()][0]
-            avg_total = data[total_col].mean()
-            st.metric("Avg Total Time", f"{avg_total:.1f}s")
+        if kpis['avg_total_time'] is not None:
+            st.metric("Avg Total Time", f"{kpis['avg_total_time']:.1f}s")
         else:
             st.metric("Avg Total Time", "N/A")
     
     with col4:
-        if duration_cols:
-            max_duration = data[duration_cols[0]].max()
-            st.metric("Longest Call", f"{max_duration:.1f}s")
+        if kpis['longest_call'] is not None:
+            st.metric("Longest Call", f"{kpis['longest_call']:.1f}s")
         else:
             st.metric("Longest Call", "N/A")
     
     with col5:
-        if duration_cols:
-            min_duration = data[duration_cols[0]].min()
-            st.metric("Shortest Call", f"{min_duration:.1f}s")
+        if kpis['shortest_call'] is not None:
+            st.metric("Shortest Call", f"{kpis['shortest_call']:.1f}s")
         else:
             st.metric("Shortest Call", "N/A")
+
+def render_trends(summary):
+    """Call volume, conversion, cancellation, no-show, sentiment and ring time over time"""
+    # 6. TRENDS DASHBOARD
+    st.subheader("📈 6. Trends")
     
-    # =================================================================
-    # 2. QUALITATIVE METRICS DASHBOARD
-    # =================================================================
+    if summary.trend is None:
+        st.info("Trends require a call date/time column")
+        return
     
-    st.header("🎨 QUALITATIVE METRICS")
+    col1, col2 = st.columns(2)
+    with col1:
+        granularity = st.radio("Trend granularity", list(TREND_FREQUENCIES), index=1, horizontal=True)
+    with col2:
+        window = st.number_input("Rolling window (periods)", min_value=1, max_value=365, value=1, step=1)
+    
+    trend = summary.trends(granularity, int(window)).reset_index()
+    chart_cols = st.columns(2)
+    for i, metric in enumerate(trend.columns.drop('period')):
+        with chart_cols[i % 2]:
+            # Hourly trends over long ranges are downsampled to a fixed point budget
+            points = downsample(trend[['period', metric]].dropna(), 'period', metric)
+            fig = px.line(points, x='period', y=metric, title=f"{metric} by {granularity.lower()}")
+            fig.update_layout(xaxis_title="", yaxis_title=metric)
+            st.plotly_chart(fig, use_container_width=True)
+
+def render_practice_comparison(comparison):
+    """Per-practice metrics side by side, one row per practice"""
+    st.subheader("🏥 Practice Comparison")
+    
+    if comparison.empty:
+        st.info("No calls found in the practice exports")
+        return
+    st.caption(f"{len(comparison)} practices")
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        metric = st.selectbox("Compare by", list(comparison.columns))
+    with col2:
+        shown = st.number_input("Practices in chart", min_value=1, max_value=len(comparison),
+                                value=min(25, len(comparison)), step=1)
+    
+    # The chart shows the top of the ranking; the table below keeps every practice
+    ranked = comparison[metric].dropna().sort_values(ascending=False)
+    top = ranked.head(int(shown))
+    fig = px.bar(
+        x=top.values,
+        y=top.index,
+        orientation='h',
+        title=f"{metric} - top {len(top)} of {len(ranked)} practices"
+    )
+    fig.update_layout(xaxis_title=metric, yaxis_title="", yaxis={'autorange': 'reversed'},
+                      height=max(400, 22 * len(top)))
+    st.plotly_chart(fig, use_container_width=True)
+    
+    if 'Booking Conversion (%)' in comparison.columns and 'Cancellation Rate (%)' in comparison.columns:
+        fig = px.scatter(
+            comparison.reset_index(),
+            x='Booking Conversion (%)',
+            y='Cancellation Rate (%)',
+            size='Call Volume',
+            hover_name='practice',
+            title="Booking Conversion vs Cancellation Rate (size = call volume)"
+        )
+        st.plotly_chart(fig, use_container_width=True)
+    
+    st.dataframe(comparison.round(1), use_container_width=True)
+
+def render_practices(summary):
+    """Practices side by side, for exports with a practice id column"""
+    render_practice_comparison(summary.practice_metrics())
+
+def render_sentiment(summary):
+    """Sentiment distribution and net sentiment score"""
+    kpis = dashboard_metrics(summary)
     
     # 1. SENTIMENT SUMMARIES DASHBOARD
     st.subheader("😊 Sentiment Summaries")
     
-    if 'Sentiment' in data.columns:
+    if summary.has('Sentiment'):
+        
         col1, col2, col3 = st.columns([2, 1, 1])
         
         with col1:
             # Sentiment Distribution Pie Chart
-            sentiment_counts = data['Sentiment'].value_counts()
+            sentiment_counts = summary.value_counts('sentiment')
             fig = px.pie(
                 values=sentiment_counts.values,
                 names=sentiment_counts.index,
@@ -591,19 +766,17 @@ if uploaded_file is not None:
         
         with col2:
             # Sentiment Metrics
-            st.metric("Positive Calls", f"{(data['Sentiment'] == 'Positive').sum()}")
-            st.metric("Neutral Calls", f"{(data['Sentiment'] == 'Neutral').sum()}")
-            st.metric("Negative Calls", f"{(data['Sentiment'] == 'Negative').sum()}")
-            
-            positive_rate = (data['Sentiment'] == 'Positive').mean() * 100
-            st.metric("Positive Rate", f"{positive_rate:.1f}%")
+            st.metric("Positive Calls", f"{kpis['positive_calls']}")
+            st.metric("Neutral Calls", f"{kpis['neutral_calls']}")
+            st.metric("Negative Calls", f"{kpis['negative_calls']}")
+            st.metric("Positive Rate", f"{kpis['positive_rate']:.1f}%")
         
         with col3:
             # Sentiment Insights
             st.write("**📈 Sentiment Insights:**")
-            if 'Call_Purpose' in data.columns:
+            if summary.has('Call_Purpose'):
                 # Find purposes with highest negative sentiment
-                sentiment_by_purpose = data.groupby('Call_Purpose')['Sentiment'].value_counts().unstack(fill_value=0)
+                sentiment_by_purpose = summary.crosstab('purpose', 'sentiment')
                 for purpose in sentiment_by_purpose.index:
                     if 'Negative' in sentiment_by_purpose.columns:
                         negative_pct = (sentiment_by_purpose.loc[purpose, 'Negative'] / sentiment_by_purpose.loc[purpose].sum() * 100)
@@ -611,23 +784,21 @@ if uploaded_file is not None:
                             st.write(f"⚠️ {purpose}: {negative_pct:.1f}% negative")
             
             # Overall sentiment score
-            sentiment_score = ((data['Sentiment'] == 'Positive').sum() - (data['Sentiment'] == 'Negative').sum()) / len(data) * 100
-            st.metric("Net Sentiment Score", f"{sentiment_score:.1f}")
-    
+            st.metric("Net Sentiment Score", f"{kpis['net_sentiment_score']:.1f}")
+
+def render_emotions(summary):
+    """Emotion frequencies, overall and by purpose"""
     # 2. EMOTION ANALYSIS DASHBOARD
     st.subheader("💭 Emotion Analysis")
     
-    if 'Emotions' in data.columns:
+    if summary.has('Emotions'):
         col1, col2 = st.columns(2)
         
         with col1:
             # Emotion Frequency Chart
-            all_emotions = []
-            for emotions_list in data['Emotions']:
-                all_emotions.extend(emotions_list)
+            emotion_counts = summary.value_counts('emotions')
             
-            if all_emotions:
-                emotion_counts = pd.Series(all_emotions).value_counts()
+            if len(emotion_counts) > 0:
                 fig = px.bar(
                     x=emotion_counts.values,
                     y=emotion_counts.index,
@@ -643,20 +814,8 @@ if uploaded_file is not None:
         
         with col2:
             # Emotion by Call Purpose
-            if 'Call_Purpose' in data.columns:
-                emotion_purpose_data = []
-                for purpose in data['Call_Purpose'].unique():
-                    purpose_emotions = []
-                    for idx, row in data[data['Call_Purpose'] == purpose].iterrows():
-                        purpose_emotions.extend(row['Emotions'])
-                    if purpose_emotions:
-                        most_common_emotion = pd.Series(purpose_emotions).mode()
-                        if len(most_common_emotion) > 0:
-                            emotion_purpose_data.append({
-                                'Purpose': purpose,
-                                'Most_Common_Emotion': most_common_emotion[0],
-                                'Emotion_Count': len(purpose_emotions)
-                            })
+            if summary.has('Call_Purpose'):
+                emotion_purpose_data = summary.emotions_by_purpose()
                 
                 if emotion_purpose_data:
                     emotion_df = pd.DataFrame(emotion_purpose_data)
@@ -669,24 +828,34 @@ if uploaded_file is not None:
                         color_discrete_sequence=px.colors.qualitative.Bold
                     )
                     st.plotly_chart(fig, use_container_width=True)
+
+def render_narratives(summary):
+    """Narrative summary of experience and service quality"""
+    total_calls = summary.total_calls
+    kpis = dashboard_metrics(summary)
+    positive_calls = kpis['positive_calls']
+    negative_calls = kpis['negative_calls']
     
     # 3. AI GENERATED NARRATIVES DASHBOARD
     st.subheader("📝 AI Generated Narratives")
     
-    if 'Sentiment' in data.columns and 'Call_Purpose' in data.columns:
+    if summary.has('Sentiment') and summary.has('Call_Purpose'):
+        purpose_sentiment = summary.crosstab('purpose', 'sentiment')
+        
         col1, col2 = st.columns(2)
         
         with col1:
             st.info("**📖 Patient Experience Story:**")
-            total_calls = len(data)
-            positive_calls = (data['Sentiment'] == 'Positive').sum()
-            negative_calls = (data['Sentiment'] == 'Negative').sum()
             
             st.write(f"- **{positive_calls} calls ({positive_calls/total_calls*100:.1f}%)** showed positive patient satisfaction")
             st.write(f"- **{negative_calls} calls ({negative_calls/total_calls*100:.1f}%)** indicated service improvement opportunities")
             
             # Find most positive call purposes
-            positive_purposes = data[data['Sentiment'] == 'Positive']['Call_Purpose'].value_counts().head(3)
+            if 'Positive' in purpose_sentiment.columns:
+                positive_purposes = purpose_sentiment['Positive']
+                positive_purposes = positive_purposes[positive_purposes > 0].sort_values(ascending=False, kind='stable').head(3)
+            else:
+                positive_purposes = pd.Series(dtype='int64')
             if len(positive_purposes) > 0:
                 st.write("- **Most positive experiences** in:")
                 for purpose, count in positive_purposes.items():
@@ -696,9 +865,7 @@ if uploaded_file is not None:
             st.info("**🎯 Service Quality Insights:**")
             
             # Sentiment trends by purpose
-            if 'Call_Purpose' in data.columns:
-                purpose_sentiment = data.groupby('Call_Purpose')['Sentiment'].value_counts().unstack(fill_value=0)
-                
+            if summary.has('Call_Purpose'):
                 # Find purposes needing attention
                 high_negative = purpose_sentiment[purpose_sentiment['Negative'] / purpose_sentiment.sum(axis=1) > 0.2]
                 if len(high_negative) > 0:
@@ -714,24 +881,29 @@ if uploaded_file is not None:
                     for purpose in high_positive.index:
                         positive_rate = (purpose_sentiment.loc[purpose, 'Positive'] / purpose_sentiment.loc[purpose].sum() * 100)
                         st.write(f"  - {purpose}: {positive_rate:.1f}% positive sentiment")
+
+def render_quality(summary):
+    """Call quality distribution and insights"""
+    total_calls = summary.total_calls
+    kpis = dashboard_metrics(summary)
     
     # 4. CALL QUALITY OBSERVATIONS DASHBOARD
     st.subheader("🔍 Call Quality Observations")
     
-    if 'Call_Quality' in data.columns:
+    if summary.has('Call_Quality'):
         col1, col2 = st.columns(2)
         
         with col1:
             # Call Quality Distribution
-            quality_counts = data['Call_Quality'].value_counts()
+            quality_counts = summary.value_counts('quality')
             fig = px.pie(
                 values=quality_counts.values,
                 names=quality_counts.index,
                 title="Call Quality Assessment",
                 color=quality_counts.index,
                 color_discrete_map={
-                    'Excellent': '#00FF00', 
-                    'Good': '#90EE90', 
+                    'Excellent': '#00FF00',
+                    'Good': '#90EE90',
                     'Average': '#FFFF00',
                     'Needs Improvement': '#FFA500',
                     'Poor': '#FF0000'
@@ -742,17 +914,16 @@ if uploaded_file is not None:
         with col2:
             # Quality Metrics and Insights
             st.write("**📊 Quality Metrics:**")
-            excellent_calls = (data['Call_Quality'] == 'Excellent').sum()
-            poor_calls = (data['Call_Quality'] == 'Poor').sum()
-            total_calls = len(data)
+            excellent_calls = kpis['excellent_quality_calls']
+            poor_calls = kpis['poor_quality_calls']
             
             st.metric("Excellent Quality", f"{excellent_calls} calls ({(excellent_calls/total_calls*100):.1f}%)")
             st.metric("Needs Improvement", f"{poor_calls} calls ({(poor_calls/total_calls*100):.1f}%)")
             
             st.write("**💡 Quality Insights:**")
-            if 'Call_Purpose' in data.columns:
+            if summary.has('Call_Purpose'):
                 # Find purposes with best/worst quality
-                quality_by_purpose = data.groupby('Call_Purpose')['Call_Quality'].value_counts().unstack(fill_value=0)
+                quality_by_purpose = summary.crosstab('purpose', 'quality')
                 best_quality = quality_by_purpose['Excellent'].idxmax() if 'Excellent' in quality_by_purpose.columns else None
                 worst_quality = quality_by_purpose['Poor'].idxmax() if 'Poor' in quality_by_purpose.columns else None
                 
@@ -760,18 +931,174 @@ if uploaded_file is not None:
                     st.write(f"- ✅ **Best quality**: {best_quality} calls")
                 if worst_quality:
                     st.write(f"- ❌ **Needs training**: {worst_quality} handling")
-    
+
+def render_llm_labels(summary):
+    """Label counts from LLM classification mode"""
+    # 5. LLM CLASSIFICATION RESULTS
+    llm_columns = [col for col in LLM_COLUMNS if summary.has(col)]
+    if llm_columns:
+        st.subheader("🤖 LLM Classification")
+        
+        chart_cols = st.columns(2)
+        for i, col in enumerate(llm_columns):
+            with chart_cols[i % 2]:
+                llm_counts = summary.value_counts(col)
+                fig = px.bar(
+                    x=llm_counts.values,
+                    y=llm_counts.index,
+                    title=col.replace('LLM_', '').replace('_', ' '),
+                    orientation='h'
+                )
+                fig.update_layout(xaxis_title="Calls", yaxis_title="")
+                st.plotly_chart(fig, use_container_width=True)
+
+def render_sample(summary):
+    """A few classified calls"""
     # SENTIMENT SAMPLE DATA
     st.subheader("🔍 AI Analysis Sample")
-    if 'Sentiment' in data.columns and 'Emotions' in data.columns:
+    if summary.has('Sentiment') and summary.has('Emotions'):
         sample_cols = ['transcript', 'Call_Purpose', 'Sentiment', 'Emotions']
-        if 'Call_Quality' in data.columns:
+        if summary.has('Call_Quality'):
             sample_cols.append('Call_Quality')
-        if 'Booking_Success' in data.columns:
+        if summary.has('Booking_Success'):
             sample_cols.append('Booking_Success')
         
-        available_cols = [col for col in sample_cols if col in data.columns]
-        st.dataframe(data[available_cols].head(8), use_container_width=True)
+        available_cols = [col for col in sample_cols if col in summary.sample.columns]
+        sample = summary.sample[available_cols].copy()
+        sample['Emotions'] = decode_emotion_column(sample['Emotions'])
+        st.dataframe(sample, use_container_width=True)
+
+# Matching calls listed under a search, at most
+SEARCH_RESULT_ROWS = 500
+
+def render_search(data, index_key):
+    """Transcript search over the loaded calls, with the matching calls listed"""
+    transcript_col = resolve_schema(data.columns)['transcript']
+    if transcript_col is None:
+        return
+    with st.expander("🔎 Search transcripts"):
+        query = st.text_input(
+            "Search",
+            placeholder='reschedule AND insurance',
+            help='Whole words and "quoted phrases", combined with AND, OR, NOT and parentheses'
+        )
+        if not query.strip():
+            return
+        # Built once per dataset; each query is a few posting-list operations
+        with st.spinner("Indexing transcripts..."):
+            index = data_cache.get_or_compute(index_key, lambda: TranscriptIndex(data[transcript_col]))
+        started = time.perf_counter()
+        try:
+            rows = index.rows(index.search(query))
+        except ValueError as e:
+            st.warning(str(e))
+            return
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        st.caption(f"{len(rows):,} of {len(data):,} calls ({len(rows) / max(len(data), 1):.1%}) in {elapsed_ms:.1f} ms")
+        if len(rows) == 0:
+            return
+        
+        matches = data.iloc[rows]
+        if 'Call_Purpose' in matches.columns:
+            purpose_counts = matches['Call_Purpose'].value_counts()
+            purpose_counts = purpose_counts[purpose_counts > 0]
+            fig = px.bar(x=purpose_counts.values, y=purpose_counts.index.astype(str),
+                         orientation='h', title="Matching calls by purpose")
+            fig.update_layout(xaxis_title="Calls", yaxis_title="")
+            st.plotly_chart(fig, use_container_width=True)
+        
+        shown = matches.head(SEARCH_RESULT_ROWS)
+        columns = [transcript_col] + [col for col in DERIVED_COLUMNS + LLM_COLUMNS if col in shown.columns and col != transcript_col]
+        shown = shown[columns].copy()
+        if 'Emotions' in shown.columns:
+            shown['Emotions'] = decode_emotion_column(shown['Emotions'])
+        st.dataframe(shown, use_container_width=True)
+        if len(matches) > SEARCH_RESULT_ROWS:
+            st.caption(f"Showing the first {SEARCH_RESULT_ROWS:,} matching calls")
+
+# Largest repeated-transcript clusters listed
+DUPLICATE_CLUSTER_ROWS = 100
+
+def render_duplicates(data, clusters_key):
+    """Clusters of identical and near-identical transcripts (IVR messages, repeat callbacks)"""
+    transcript_col = resolve_schema(data.columns)['transcript']
+    if transcript_col is None:
+        return
+    with st.expander("🧬 Repeated transcripts"):
+        if not st.checkbox("Find near-duplicate transcripts",
+                           help="Group transcripts whose wording is at least 80% the same (MinHash/LSH)"):
+            return
+        with st.spinner("Comparing transcripts..."):
+            clusters = data_cache.get_or_compute(clusters_key, lambda: near_duplicate_clusters(data[transcript_col]))
+        table = cluster_table(data, clusters, transcript_col)
+        if table.empty:
+            st.caption("No repeated transcripts")
+            return
+        st.caption(
+            f"{table['calls'].sum():,} calls share {len(table):,} transcript patterns "
+            f"({table['calls'].sum() / max(len(data), 1):.1%} of calls)"
+        )
+        st.dataframe(table.head(DUPLICATE_CLUSTER_ROWS), use_container_width=True)
+
+# (group header, tab label, renderer)
+DASHBOARD_SECTIONS = [
+    ("📊 QUANTITATIVE METRICS", "📞 Call Volumes", render_call_volumes),
+    ("📊 QUANTITATIVE METRICS", "🎯 Booking", render_booking),
+    ("📊 QUANTITATIVE METRICS", "❌ Cancellations", render_cancellations),
+    ("📊 QUANTITATIVE METRICS", "⏰ No-Shows", render_noshows),
+    ("📊 QUANTITATIVE METRICS", "⚡ Response Times", render_response_times),
+    ("📊 QUANTITATIVE METRICS", "📈 Trends", render_trends),
+    ("📊 QUANTITATIVE METRICS", "🏥 Practices", render_practices),
+    ("🎨 QUALITATIVE METRICS", "😊 Sentiment", render_sentiment),
+    ("🎨 QUALITATIVE METRICS", "💭 Emotions", render_emotions),
+    ("🎨 QUALITATIVE METRICS", "📝 Narratives", render_narratives),
+    ("🎨 QUALITATIVE METRICS", "🔍 Call Quality", render_quality),
+    ("🎨 QUALITATIVE METRICS", "🤖 LLM Labels", render_llm_labels),
+    ("🎨 QUALITATIVE METRICS", "🔍 Sample", render_sample),
+]
+ALL_SECTIONS = "📋 All sections"
+
+if summary is not None:
+    st.success(f"✅ Successfully loaded {summary.total_calls} calls")
+    if summary.has('transcript'):
+        st.success("✅ AI classification completed!")
+    if data is not None:
+        with profiling.stage("Search"):
+            render_search(data, summary_key + "-index")
+        with profiling.stage("Repeated transcripts"):
+            render_duplicates(data, summary_key + "-clusters")
+    
+    # Tab bar - st.tabs would run every tab's code on each rerun
+    has_llm_labels = any(summary.has(col) for col in LLM_COLUMNS)
+    has_practices = summary.schema['practice'] is not None
+    sections = [
+        section for section in DASHBOARD_SECTIONS
+        if (section[2] is not render_llm_labels or has_llm_labels)
+        and (section[2] is not render_practices or has_practices)
+    ]
+    selected = st.radio(
+        "Dashboard section",
+        [label for _, label, _ in sections] + [ALL_SECTIONS],
+        horizontal=True,
+        label_visibility="collapsed"
+    )
+    
+    current_group = None
+    for group, label, render in sections:
+        if selected not in (label, ALL_SECTIONS):
+            continue
+        if group != current_group:
+            st.header(group)
+            current_group = group
+        with profiling.stage(label):
+            render(summary)
+
+elif comparison is not None:
+    with profiling.stage("Practice comparison", rows=len(comparison)):
+        render_practice_comparison(comparison)
+
+elif live:
+    st.info(f"📡 Waiting for calls in {call_tail.path}")
 
 else:
     st.info("👆 Please upload your call data CSV file to begin analysis")
@@ -789,226 +1116,36 @@ These prompts analyze conversation content to automatically categorize calls for
 # 1. CALL PURPOSE CLASSIFICATION PROMPT
 st.subheader("🎯 1. Call Purpose Classification Prompt")
 
-purpose_prompt = """
-ANALYZE THIS DENTAL PRACTICE PHONE CALL TRANSCRIPT AND CLASSIFY ITS PRIMARY PURPOSE.
-
-CATEGORIES:
-- APPOINTMENT BOOKING: Patient wants to schedule new appointment, asks about availability, books cleaning/checkup
-- APPOINTMENT CANCELLATION: Patient cancels existing appointment, says they can't make it
-- APPOINTMENT RESCHEDULE: Patient wants to change appointment date/time, move to different slot
-- BILLING QUESTION: Questions about charges, payments, outstanding balances, payment plans
-- INSURANCE VERIFICATION: Asks about insurance coverage, benefits, what's covered, claims
-- CLINICAL QUESTION: Medical/dental health questions, symptoms, treatment options, pain concerns
-- EMERGENCY: Urgent dental issues, severe pain, broken tooth, immediate care needed
-- GENERAL INQUIRY: Office hours, location, services offered, doctor information, non-urgent questions
-- FOLLOW-UP: Checking on previous treatment, post-operative care, healing progress
-
-INSTRUCTIONS:
-1. Read the entire transcript carefully
-2. Identify the MAIN reason for the call
-3. Choose ONLY ONE primary category
-4. Return ONLY the category name in uppercase
-5. If uncertain, choose the most likely category based on key phrases
-
-TRANSCRIPT TO ANALYZE:
-{transcript}
-
-RETURN ONLY THE CATEGORY NAME:
-"""
-
 st.code(purpose_prompt, language='text')
 st.caption("This prompt analyzes call transcripts to automatically categorize call purposes for tracking booking rates, cancellation patterns, and service demand.")
 
 # 2. BOOKING SUCCESS DETECTION PROMPT
 st.subheader("✅ 2. Booking Success Detection Prompt")
 
-booking_success_prompt = """
-DETERMINE IF THIS APPOINTMENT BOOKING CALL RESULTED IN A SUCCESSFUL SCHEDULING.
-
-ANALYZE THE CALL TRANSCRIPT FOR:
-- SUCCESS INDICATORS: "scheduled", "confirmed", "see you then", "thank you", "perfect", "great"
-- FAILURE INDICATORS: "call back", "think about it", "check schedule", "maybe", "not sure"
-- UNCLEAR: Inconclusive outcome, need to verify, ambiguous response
-
-CATEGORIES:
-- SUCCESSFUL: Appointment was clearly scheduled and confirmed
-- FAILED: Patient declined, postponed, or didn't commit
-- UNCLEAR: Outcome cannot be determined from transcript
-
-INSTRUCTIONS:
-1. Focus on the call conclusion and final agreement
-2. Look for explicit confirmation or decline language
-3. Consider the overall tone and commitment level
-4. Return ONLY one word: SUCCESSFUL, FAILED, or UNCLEAR
-
-TRANSCRIPT:
-{transcript}
-
-RESULT:
-"""
-
 st.code(booking_success_prompt, language='text')
 st.caption("This prompt specifically tracks booking conversion rates by detecting successful vs failed appointment scheduling attempts.")
 
 # 3. SENTIMENT ANALYSIS PROMPT
 st.subheader("😊 3. Sentiment Analysis Prompt")
 
-sentiment_prompt = """
-ANALYZE THE PATIENT'S EMOTIONAL TONE AND SATISFACTION LEVEL IN THIS DENTAL CALL.
-
-EMOTIONAL INDICATORS TO CONSIDER:
-
-POSITIVE INDICATORS:
-- Gratitude: "thank you", "appreciate", "helpful"
-- Satisfaction: "great", "good", "perfect", "happy"
-- Relief: "better", "helped", "improved"
-- Enthusiasm: "excellent", "wonderful", "awesome"
-
-NEGATIVE INDICATORS:
-- Frustration: "angry", "frustrated", "annoyed"
-- Disappointment: "not happy", "disappointed", "upset"
-- Anxiety: "worried", "nervous", "scared", "concerned"
-- Complaints: "problem", "issue", "complaint", "bad"
-
-NEUTRAL INDICATORS:
-- Factual questions without emotional language
-- Routine inquiries about information
-- Balanced or mixed emotional expressions
-
-CATEGORIES:
-- POSITIVE: Predominantly satisfied, grateful, or happy tone
-- NEGATIVE: Clearly frustrated, angry, or dissatisfied
-- NEUTRAL: Factual, balanced, or minimal emotional expression
-
-INSTRUCTIONS:
-1. Analyze the patient's language and emotional cues
-2. Consider the overall tone, not just individual words
-3. Return ONLY one word: POSITIVE, NEGATIVE, or NEUTRAL
-
-TRANSCRIPT:
-{transcript}
-
-SENTIMENT:
-"""
-
 st.code(sentiment_prompt, language='text')
 st.caption("This prompt assesses patient satisfaction and emotional state to track service quality and identify improvement areas.")
 
 # 4. EMERGENCY DETECTION PROMPT
 st.subheader("🚨 4. Emergency Detection Prompt")
 
-emergency_prompt = """
-DETECT IF THIS DENTAL CALL REQUIRES URGENT OR EMERGENCY ATTENTION.
-
-URGENCY INDICATORS:
-- Severe pain descriptors: "extreme pain", "can't sleep", "unbearable"
-- Trauma indicators: "broken tooth", "knocked out", "accident", "injury"
-- Infection signs: "swelling", "fever", "pus", "infection"
-- Time sensitivity: "need to see someone today", "emergency", "as soon as possible"
-
-ROUTINE INDICATORS:
-- Preventive care: "cleaning", "checkup", "routine exam"
-- Non-urgent issues: "small cavity", "next available", "when convenient"
-- General questions: "information", "prices", "insurance"
-
-CATEGORIES:
-- EMERGENCY: Requires immediate same-day attention
-- URGENT: Should be seen within 24-48 hours  
-- ROUTINE: Can wait for next available appointment
-
-INSTRUCTIONS:
-1. Identify pain level and symptom severity
-2. Look for time-sensitive language
-3. Assess potential health risks
-4. Return ONLY one category: EMERGENCY, URGENT, or ROUTINE
-
-TRANSCRIPT:
-{transcript}
-
-URGENCY LEVEL:
-"""
-
 st.code(emergency_prompt, language='text')
 st.caption("This prompt prioritizes calls based on medical urgency to ensure proper patient triage and care.")
 
 # 5. INSURANCE & BILLING SPECIFIC PROMPT
 st.subheader("💳 5. Insurance & Billing Classification Prompt")
 
-insurance_prompt = """
-CLASSIFY THE SPECIFIC TYPE OF FINancial OR INSURANCE INQUIRY IN THIS DENTAL CALL.
-
-SUBCATEGORIES:
-
-INSURANCE-RELATED:
-- COVERAGE VERIFICATION: "Does my insurance cover this?", "What's covered?"
-- BENEFITS CHECK: "What are my benefits?", "Annual maximum", "Deductible"
-- CLAIMS STATUS: "Claim status", "When will I get paid?", "Processing time"
-- NETWORK QUESTIONS: "Are you in-network?", "Preferred provider"
-
-BILLING-RELATED:
-- PAYMENT PLANS: "Payment options", "Installments", "Financing"
-- OUTSTANDING BALANCE: "Outstanding bill", "Past due", "Collection"
-- COST ESTIMATES: "How much will this cost?", "Price", "Fee"
-- STATEMENT QUESTIONS: "Explanation of benefits", "Bill clarification"
-
-CATEGORIES:
-- INSURANCE_COVERAGE
-- INSURANCE_CLAIMS  
-- INSURANCE_NETWORK
-- BILLING_PAYMENT
-- BILLING_COST
-- BILLING_STATEMENT
-
-INSTRUCTIONS:
-1. Identify the specific financial concern
-2. Differentiate between insurance vs direct billing questions
-3. Choose the most precise subcategory
-4. Return ONLY the category name in uppercase
-
-TRANSCRIPT:
-{transcript}
-
-FINANCIAL_CATEGORY:
-"""
-
 st.code(insurance_prompt, language='text')
 st.caption("This prompt provides granular analysis of financial inquiries to optimize billing processes and insurance handling.")
 
 # 6. NEW VS EXISTING PATIENT DETECTION
 st.subheader("👥 6. New vs Existing Patient Detection Prompt")
 
-patient_type_prompt = """
-DETERMINE IF THE CALLER IS A NEW PATIENT OR EXISTING PATIENT.
-
-NEW PATIENT INDICATORS:
-- First-time mentions: "first time", "new patient", "never been there"
-- Practice discovery: "found you online", "recommended by", "looking for dentist"
-- Introductory questions: "tell me about your practice", "what services"
-- No history: No references to previous visits or treatments
-
-EXISTING PATIENT INDICATORS:
-- Previous treatment references: "last time I was here", "my previous cleaning"
-- Familiarity with staff: "Dr. Smith", "the hygienist", "receptionist"
-- Continuity of care: "follow-up", "continued treatment", "next appointment"
-- Personal history: References to their dental history with the practice
-
-CATEGORIES:
-- NEW_PATIENT: First-time caller seeking to establish care
-- EXISTING_PATIENT: Current patient of the practice
-- UNCLEAR: Cannot determine patient status from transcript
-
-INSTRUCTIONS:
-1. Look for explicit statements about patient history
-2. Notice familiarity with practice and staff
-3. Consider context of the inquiry
-4. Return ONLY: NEW_PATIENT, EXISTING_PATIENT, or UNCLEAR
-
-TRANSCRIPT:
-{transcript}
-
-PATIENT_TYPE:
-"""
-
 st.code(patient_type_prompt, language='text')
 st.caption("This prompt distinguishes between new and existing patients to track acquisition success and retention rates.")
 
@@ -1057,4 +1194,52 @@ st.write("""
 
 # Footer
 st.markdown("---")
-st.markdown("**Built for Voicestack Applied AI Engineer**")
\ No newline at end of file
+st.markdown("**Built for Voicestack Applied AI Engineer**")
+
+# Cache diagnostics - counters are process-wide, since the last restart
+with st.sidebar.expander("🩺 Diagnostics"):
+    memo = label_memo()
+    cache_stats = []
+    if memo is not None:
+        cache_stats.append({
+            'Cache': 'Label memo', 'Hits': memo.hits, 'Disk hits': memo.disk_hits,
+            'Misses': memo.misses, 'Entries': len(memo),
+        })
+    cache_stats.append({
+        'Cache': 'Data cache', 'Hits': data_cache.hits, 'Disk hits': data_cache.disk_hits,
+        'Misses': data_cache.misses, 'Entries': len(data_cache),
+    })
+    cache_stats = pd.DataFrame(cache_stats).set_index('Cache')
+    lookups = cache_stats[['Hits', 'Disk hits', 'Misses']].sum(axis=1)
+    cache_stats['Hit rate'] = ((cache_stats['Hits'] + cache_stats['Disk hits']) / lookups.where(lookups > 0)).map(
+        lambda rate: f"{rate:.1%}" if pd.notna(rate) else "-"
+    )
+    st.dataframe(cache_stats, use_container_width=True)
+    if memo is None:
+        st.caption("Label memo off (VOICESTACK_LABEL_MEMO_SIZE=0)")
+    elif memo.path:
+        st.caption(f"Label memo: {memo.stored():,} transcripts stored in {memo.path}")
+    else:
+        st.caption("Label memo in memory only - set VOICESTACK_LABEL_MEMO to keep it across restarts")
+
+# Stage timings of this rerun, optionally exported for monitoring
+if profile is not None:
+    profiling.stop(st.session_state.pop('profile', profile))
+    with performance_panel:
+        st.caption(f"Rerun took {time.time() - profile.started:.2f}s")
+        st.dataframe(profile.table(), use_container_width=True, hide_index=True)
+        json_col, prometheus_col = st.columns(2)
+        json_col.download_button("JSON", profile.to_json(), file_name="voicestack_profile.json",
+                                 mime="application/json")
+        prometheus_col.download_button("Prometheus", profile.to_prometheus(), file_name="voicestack_profile.prom",
+                                       mime="text/plain")
+    if profiling.PROFILE_EXPORT_PATH:
+        profile.export(profiling.PROFILE_EXPORT_PATH)
+
+# Live mode refresh - the countdown gives widget changes a chance to interrupt the wait
+if live:
+    countdown = st.sidebar.empty()
+    for remaining in range(int(refresh_seconds), 0, -1):
+        countdown.caption(f"📡 Refreshing in {remaining}s")
+        time.sleep(1)
+    st.rerun()
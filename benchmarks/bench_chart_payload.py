@@ -0,0 +1,50 @@
+"""Compare chart payload sizes: raw-column Plotly charts vs server-side binning and LTTB.
+
+Usage: python benchmarks/bench_chart_payload.py [--rows 1000000]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from charts import downsample, histogram_bins, histogram_figure  # noqa: E402
+
+def payload_kb(fig):
+    return len(fig.to_json()) / 1024
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    ring = pd.DataFrame({'Ring Duration': rng.gamma(2.0, 6.0, size=args.rows).round(1)})
+    print(f"{args.rows:,} calls")
+
+    start = time.perf_counter()
+    raw = px.histogram(ring, x='Ring Duration', nbins=20)
+    raw_time = time.perf_counter() - start
+    start = time.perf_counter()
+    edges, counts = histogram_bins(ring['Ring Duration'])
+    binned = histogram_figure(edges, counts, title="Ring Duration Distribution", x_title='Ring Duration')
+    binned_time = time.perf_counter() - start
+    print(f"histogram, raw column:  {payload_kb(raw):10.1f} KB  ({raw_time:.2f}s)")
+    print(f"histogram, pre-binned:  {payload_kb(binned):10.1f} KB  ({binned_time:.2f}s)")
+
+    series = pd.DataFrame({
+        'time': pd.date_range('2025-01-01', periods=args.rows, freq='min'),
+        'calls': rng.poisson(5, size=args.rows).cumsum(),
+    })
+    raw_line = px.line(series, x='time', y='calls')
+    lttb_line = px.line(downsample(series, 'time', 'calls'), x='time', y='calls')
+    print(f"line chart, every point:{payload_kb(raw_line):10.1f} KB")
+    print(f"line chart, LTTB:       {payload_kb(lttb_line):10.1f} KB")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+"""Benchmark the single-pass classification engine against the per-row .apply path.
+
+Usage: python benchmarks/bench_classifier.py [--rows 1000000] [--workers 16]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from classifier import (  # noqa: E402
+    analyze_sentiment,
+    assess_call_quality,
+    classify_call_purpose,
+    classify_transcripts,
+    classify_transcripts_parallel,
+    current_rules,
+    detect_booking_success,
+    detect_emotions,
+    ahocorasick,
+    decode_emotion_column,
+    LABEL_COLUMNS,
+)
+
+SENTENCES = [
+    "Agent: Thank you for calling ABC Dental, how can I help you?",
+    "Patient: Hi, I'd like to schedule a cleaning for next week.",
+    "Patient: I need to cancel my appointment on Thursday.",
+    "Patient: Can I reschedule to sometime in the afternoon?",
+    "Agent: I see you missed your appointment yesterday.",
+    "Patient: I have a question about my bill and the insurance payment.",
+    "Patient: My tooth is in a lot of pain and there is some swelling.",
+    "Agent: Perfect, you're all set, we'll see you then.",
+    "Patient: Let me check my calendar and call back later.",
+    "Patient: I'm not sure, I need to think about it.",
+    "Patient: I'm really frustrated, this is the third time there's a problem.",
+    "Patient: I'm a little nervous about the procedure.",
+    "Agent: Great, is there anything else I can help with?",
+    "Patient: What are your office hours on Saturday?",
+    "Patient: Okay, sounds good, thanks so much.",
+    "Agent: Your total cost after insurance would be about eighty dollars.",
+    "Patient: I don't understand why I was charged a fee.",
+    "Agent: Umm, let me pull up your chart real quick.",
+    "Patient: Yeah.",
+    "Agent: Mm-hmm.",
+]
+
+def synthetic_transcripts(rows, seed=0):
+    """Random transcripts built from 3-12 call sentences, with some empties"""
+    rng = np.random.default_rng(seed)
+    lengths = rng.integers(3, 13, size=rows)
+    picks = rng.integers(0, len(SENTENCES), size=lengths.sum())
+    transcripts = []
+    start = 0
+    for length in lengths:
+        transcripts.append(" ".join(SENTENCES[i] for i in picks[start:start + length]))
+        start += length
+    series = pd.Series(transcripts, dtype=object)
+    series[rng.random(rows) < 0.15] = np.nan
+    return series
+
+def legacy_classify(transcripts):
+    """The five per-row .apply passes app3.py used to run, with the rules read once"""
+    rules = current_rules()
+    data = pd.DataFrame({'transcript': transcripts})
+    data['Call_Purpose'] = data['transcript'].apply(classify_call_purpose, rules=rules)
+    data['Booking_Success'] = data['transcript'].apply(detect_booking_success, rules=rules)
+    data['Sentiment'] = data['transcript'].apply(analyze_sentiment, rules=rules)
+    data['Emotions'] = data['transcript'].apply(detect_emotions, rules=rules)
+    data['Call_Quality'] = data.apply(lambda row: assess_call_quality(row['transcript'], row['Sentiment']), axis=1)
+    return data.drop(columns='transcript')
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--workers', type=int, default=0, help="also time the process-pool backend")
+    args = parser.parse_args()
+
+    transcripts = synthetic_transcripts(args.rows)
+    print(f"{args.rows:,} synthetic transcripts, {transcripts.nunique():,} distinct")
+    print(f"matcher: {'aho-corasick' if ahocorasick is not None else 'substring scan'}")
+
+    legacy, legacy_time = timed(legacy_classify, transcripts)
+    engine, engine_time = timed(classify_transcripts, transcripts)
+
+    decoded = engine[LABEL_COLUMNS].copy()
+    decoded['Emotions'] = decode_emotion_column(decoded['Emotions'])
+    identical = legacy.astype(str).equals(decoded.astype(str))
+    print(f"per-row .apply: {legacy_time:8.2f}s")
+    print(f"single pass:    {engine_time:8.2f}s  ({legacy_time / engine_time:.1f}x faster)")
+    print(f"identical labels: {identical}")
+
+    if args.workers > 1:
+        cores = os.cpu_count() or 1
+        if args.workers > cores:
+            print(f"only {cores} core(s): the pool is capped at {cores} worker(s)")
+        # Start the workers and compile their rules untimed: the pool is reused across uploads
+        classify_transcripts_parallel(transcripts.head(1000), args.workers, 0)
+        parallel, parallel_time = timed(classify_transcripts_parallel, transcripts, args.workers, 0)
+        print(f"{args.workers} workers:   {parallel_time:8.2f}s  ({engine_time / parallel_time:.1f}x vs single pass)")
+        print(f"identical to serial: {parallel.equals(engine)}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""Benchmark LLM classification mode against the local stub endpoint.
+
+Runs every classification prompt over synthetic transcripts twice: the first
+run goes through the stub (with simulated model latency), the second is
+answered entirely from the response cache.
+
+Usage: python benchmarks/bench_llm.py [--rows 50000] [--latency 0.5] [--batch 16] [--concurrency 32]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_classifier import synthetic_transcripts  # noqa: E402
+from llm import CompletionsClient, LLMClassifier, ResponseCache  # noqa: E402
+from llm_stub_server import serve  # noqa: E402
+from prompts import CLASSIFICATION_PROMPTS  # noqa: E402
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=50_000)
+    parser.add_argument('--latency', type=float, default=0.5, help="simulated seconds per request")
+    parser.add_argument('--batch', type=int, default=16)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--rps', type=float, default=None, help="request rate limit")
+    args = parser.parse_args()
+
+    server = serve(latency=args.latency)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/v1"
+    client = CompletionsClient(base_url, model='stub', max_concurrency=args.concurrency)
+    classifier = LLMClassifier(client, cache=ResponseCache(), batch_size=args.batch,
+                               max_concurrency=args.concurrency, requests_per_second=args.rps)
+
+    transcripts = synthetic_transcripts(args.rows)
+    distinct = transcripts.nunique()
+    print(f"{args.rows:,} synthetic transcripts, {distinct:,} distinct, {len(CLASSIFICATION_PROMPTS)} prompts")
+    print(f"one-prompt-per-request at {args.latency}s each, serially: "
+          f"{distinct * len(CLASSIFICATION_PROMPTS) * args.latency / 3600:.1f}h")
+
+    start = time.perf_counter()
+    first = classifier.classify(transcripts)
+    first_time = time.perf_counter() - start
+    sent = classifier.requests
+    print(f"first run:  {first_time:8.2f}s  ({sent:,} requests)")
+
+    start = time.perf_counter()
+    second = classifier.classify(transcripts)
+    second_time = time.perf_counter() - start
+    print(f"cached run: {second_time:8.2f}s  ({classifier.requests - sent:,} requests)")
+    print(f"identical labels: {first.equals(second)}")
+
+    client.close()
+    server.shutdown()
+
+if __name__ == '__main__':
+    main()
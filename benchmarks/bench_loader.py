@@ -0,0 +1,120 @@
+"""Benchmark CSV loading: the original read_csv + to_datetime loader vs the typed, column-pruned loader.
+
+Each loader runs in its own process so peak RSS is measured separately.
+
+Usage: python benchmarks/bench_loader.py [--rows 500000]
+"""
+import argparse
+import io
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_classifier import synthetic_transcripts  # noqa: E402
+
+def synthetic_export(rows, seed=0):
+    """A call export shaped like the real one, including columns the dashboard never reads"""
+    rng = np.random.default_rng(seed)
+    times = pd.Timestamp('2025-01-01') + pd.to_timedelta(rng.integers(0, 365 * 24 * 3600, size=rows), unit='s')
+    ring = rng.integers(0, 60, size=rows)
+    conversation = rng.integers(0, 600, size=rows)
+    return pd.DataFrame({
+        'Call Time': times.strftime('%m/%d/%Y %I:%M %p'),
+        'transcript': synthetic_transcripts(rows, seed),
+        'From': [f"{x:010x}" for x in rng.integers(0, 2 ** 40, size=rows)],
+        'To': [f"{x:010x}" for x in rng.integers(0, 2 ** 40, size=rows)],
+        'Virtual Number': rng.integers(10 ** 10, 10 ** 11, size=rows),
+        'Call Direction': rng.choice(['Inbound', 'Outbound'], size=rows),
+        'Call Status': rng.choice(['Answered', 'Missed', 'Connected', 'Short Missed'], size=rows),
+        'Contact Type': rng.choice(['Existing Patient', 'New Patient', 'Others'], size=rows),
+        'Hangup Leg': rng.choice(['caller', 'callee'], size=rows),
+        'Ring Duration': ring,
+        'Conversation Duration': conversation,
+        'Voicemail Duration': rng.integers(0, 60, size=rows),
+        'Total Duration': ring + conversation,
+    })
+
+def legacy_load(raw_bytes):
+    """The loader before column pruning, explicit dtypes and format detection"""
+    data = pd.read_csv(io.BytesIO(raw_bytes))
+    for col in data.columns:
+        if 'time' in col.lower() or 'date' in col.lower():
+            data[col] = pd.to_datetime(data[col], errors='coerce')
+    return data
+
+def peak_rss_mb():
+    """Peak RSS of this process. VmHWM starts fresh at exec; ru_maxrss can carry the parent's peak"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # ru_maxrss is in kilobytes on Linux, bytes on macOS
+    scale = 1024 ** 2 if sys.platform == 'darwin' else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+
+def run_child(mode, path):
+    from loader import read_call_csv
+
+    with open(path, 'rb') as f:
+        raw_bytes = f.read()
+    before_mb = peak_rss_mb()
+    start = time.perf_counter()
+    if mode == 'legacy':
+        data = legacy_load(raw_bytes)
+    else:
+        data = read_call_csv(raw_bytes, engine=mode)
+    seconds = time.perf_counter() - start
+    print(json.dumps({
+        'seconds': seconds,
+        'peak_rss_mb': peak_rss_mb(),
+        'load_rss_mb': peak_rss_mb() - before_mb,
+        'frame_mb': data.memory_usage(deep=True).sum() / 1024 ** 2,
+    }))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=500_000)
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    parser.add_argument('--csv', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child, args.csv)
+        return
+
+    modes = ['legacy', 'c']
+    try:
+        import pyarrow  # noqa: F401
+        modes.append('pyarrow')
+    except ImportError:
+        pass
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'calls.csv')
+        synthetic_export(args.rows).to_csv(path, index=False)
+        print(f"{args.rows:,} calls, {os.path.getsize(path) / 1024 ** 2:.0f} MB CSV")
+        for mode in modes:
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), '--child', mode, '--csv', path],
+                capture_output=True, text=True, check=True
+            ).stdout
+            result = json.loads(output)
+            label = 'original loader' if mode == 'legacy' else f"typed loader ({mode})"
+            print(f"{label:24} {result['seconds']:7.2f}s  peak RSS {result['peak_rss_mb']:6.0f} MB "
+                  f"(+{result['load_rss_mb']:.0f} MB while loading)  frame {result['frame_mb']:5.0f} MB")
+
+if __name__ == '__main__':
+    main()
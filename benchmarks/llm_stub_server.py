@@ -0,0 +1,93 @@
+"""Local stand-in for an OpenAI-compatible /v1/completions endpoint.
+
+Answers the classification prompts with the keyword classifiers, after an
+optional simulated model latency, so LLM mode can be exercised and
+benchmarked without a real model.
+
+Usage: python benchmarks/llm_stub_server.py [--port 8765] [--latency 0.5]
+       VOICESTACK_LLM_URL=http://127.0.0.1:8765/v1 streamlit run app3.py
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from classifier import (  # noqa: E402
+    analyze_sentiment,
+    classify_call_purpose,
+    detect_booking_success,
+)
+from prompts import CLASSIFICATION_PROMPTS  # noqa: E402
+
+BOOKING_ANSWERS = {'Successful': 'SUCCESSFUL', 'Failed': 'FAILED', 'Unknown': 'UNCLEAR'}
+
+ANSWERS = {
+    'LLM_Purpose': lambda transcript: classify_call_purpose(transcript).upper(),
+    'LLM_Booking_Success': lambda transcript: BOOKING_ANSWERS[detect_booking_success(transcript)],
+    'LLM_Sentiment': lambda transcript: analyze_sentiment(transcript).upper(),
+    'LLM_Urgency': lambda transcript: 'EMERGENCY' if 'emergency' in transcript.lower() else 'ROUTINE',
+    'LLM_Financial_Category': lambda transcript: 'INSURANCE_COVERAGE' if 'insurance' in transcript.lower() else 'BILLING_COST',
+    'LLM_Patient_Type': lambda transcript: 'NEW_PATIENT' if 'first time' in transcript.lower() else 'EXISTING_PATIENT',
+}
+TEMPLATES = [(col, template.split('{transcript}')) for col, template in CLASSIFICATION_PROMPTS.items()]
+
+def answer(prompt):
+    """Keyword-classifier answer to one rendered classification prompt"""
+    for col, (prefix, suffix) in TEMPLATES:
+        if prompt.startswith(prefix) and prompt.endswith(suffix):
+            return ANSWERS[col](prompt[len(prefix):len(prompt) - len(suffix)])
+    return 'UNCLEAR'
+
+def make_handler(latency):
+    class Handler(BaseHTTPRequestHandler):
+        requests = 0
+
+        def do_POST(self):
+            if not self.path.endswith('/completions'):
+                self.send_error(404)
+                return
+            body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+            prompts = body['prompt'] if isinstance(body['prompt'], list) else [body['prompt']]
+            type(self).requests += 1
+            time.sleep(latency)
+
+            reply = json.dumps({
+                'object': 'text_completion',
+                'model': body.get('model'),
+                'choices': [{'index': i, 'text': answer(prompt)} for i, prompt in enumerate(prompts)],
+            }).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(reply)))
+            self.end_headers()
+            self.wfile.write(reply)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+def serve(port=0, latency=0.0):
+    """Start the stub in a background thread; returns the server (server_address has the port)"""
+    server = ThreadingHTTPServer(('127.0.0.1', port), make_handler(latency))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.5, help="seconds per request")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(('127.0.0.1', args.port), make_handler(args.latency))
+    print(f"stub completions endpoint on http://127.0.0.1:{args.port}/v1")
+    server.serve_forever()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+import hashlib
+import os
+import sys
+import tempfile
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+def content_key(raw_bytes, version):
+    """Cache key for an uploaded file: hash of its bytes plus the processing version"""
+    return f"{hashlib.sha256(raw_bytes).hexdigest()}-{version}"
+
+# Containers with more items than this are sized from a sample of them
+SIZE_SAMPLE_ITEMS = 1000
+
+def value_nbytes(value, _seen=None):
+    """Approximate in-memory size of a cached value, including Python string payloads.
+
+    Frames and arrays report their buffers; other objects (summaries,
+    indexes) add up their attributes, so nothing is serialized to be sized.
+    """
+    seen = set() if _seen is None else _seen
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    if isinstance(value, (pd.DataFrame, pd.Series, pd.Index)):
+        usage = value.memory_usage(deep=True)
+        return int(usage.sum()) if isinstance(usage, pd.Series) else int(usage)
+    if isinstance(value, np.ndarray):
+        if value.dtype == object:
+            return int(pd.Series(value.ravel()).memory_usage(index=False, deep=True))
+        return int(value.nbytes)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + _items_nbytes(list(value.items()), len(value), seen)
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return sys.getsizeof(value) + _items_nbytes(list(value), len(value), seen)
+    if hasattr(value, '__dict__'):
+        return sys.getsizeof(value) + value_nbytes(vars(value), seen)
+    return sys.getsizeof(value)
+
+def _items_nbytes(items, count, seen):
+    if count > SIZE_SAMPLE_ITEMS:
+        step = count // SIZE_SAMPLE_ITEMS
+        return sum(value_nbytes(item, seen) for item in items[::step][:SIZE_SAMPLE_ITEMS]) * count // SIZE_SAMPLE_ITEMS
+    return sum(value_nbytes(item, seen) for item in items)
+
+class DataFrameCache:
+    """Two-tier cache of processed DataFrames (and other picklable results).
+
+    The memory tier is an LRU bounded by total frame size in bytes. The
+    optional disk tier pickles each frame into cache_dir so results survive
+    restarts. Cached frames are shared between callers and must be treated as
+    read-only.
+    """
+
+    def __init__(self, max_bytes=512 * 1024 ** 2, cache_dir=None):
+        self.max_bytes = max_bytes
+        self.cache_dir = cache_dir
+        self._entries = OrderedDict()  # key -> (frame, nbytes)
+        self._bytes = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def __contains__(self, key):
+        if key in self._entries:
+            return True
+        path = self._disk_path(key)
+        return path is not None and os.path.exists(path)
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def nbytes(self):
+        return self._bytes
+
+    def get(self, key):
+        """Return the cached frame for key, or None"""
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key][0]
+
+        path = self._disk_path(key)
+        if path is not None and os.path.exists(path):
+            try:
+                data = pd.read_pickle(path)
+            except Exception:
+                # A truncated or stale file is just a miss
+                os.remove(path)
+            else:
+                self.disk_hits += 1
+                self._remember(key, data)
+                return data
+
+        self.misses += 1
+        return None
+
+    def put(self, key, data):
+        """Store a frame in memory and, if configured, on disk"""
+        self._remember(key, data)
+        path = self._disk_path(key)
+        if path is not None:
+            # Write to a temp file first so readers never see a partial pickle
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            os.close(fd)
+            try:
+                # pd.to_pickle, not DataFrame.to_pickle: summaries, indexes and arrays are cached too
+                pd.to_pickle(data, tmp_path)
+                os.replace(tmp_path, path)
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+
+    def get_or_compute(self, key, compute):
+        """Return the cached frame for key, computing and storing it on a miss"""
+        data = self.get(key)
+        if data is None:
+            data = compute()
+            self.put(key, data)
+        return data
+
+    def clear(self):
+        """Drop the memory tier (the disk tier is left in place)"""
+        self._entries.clear()
+        self._bytes = 0
+
+    def _remember(self, key, data):
+        nbytes = value_nbytes(data)
+        if key in self._entries:
+            self._bytes -= self._entries.pop(key)[1]
+        if nbytes > self.max_bytes:
+            # Larger than the whole budget - keep it on disk only
+            return
+        self._entries[key] = (data, nbytes)
+        self._bytes += nbytes
+        while self._bytes > self.max_bytes:
+            _, (_, evicted_bytes) = self._entries.popitem(last=False)
+            self._bytes -= evicted_bytes
+
+    def _disk_path(self, key):
+        if not self.cache_dir:
+            return None
+        return os.path.join(self.cache_dir, f"{key}.pkl")
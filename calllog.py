@@ -0,0 +1,109 @@
+import copy
+import threading
+
+import numpy as np
+import pandas as pd
+
+from classifier import DERIVED_COLUMNS, as_label_dtypes
+from dedup import row_keys
+from loader import classify_calls
+from metrics import CallSummary
+
+class CallLog:
+    """Labels and running aggregates for one call log that grows between uploads.
+
+    classify() only runs the classifiers on rows the log has not labeled
+    yet and copies the stored labels onto the rest. summarize() folds only
+    the rows missing from the previous summary into a copy of it, as long
+    as every row summarized before is still there (the log was appended
+    to); otherwise it rebuilds the summary, still without reclassifying.
+    Rows are matched by occurrence - the second copy of a row is a new
+    call - so repeated rows without a call id are all counted, as in a full
+    rebuild. Safe to share between sessions: classify() and summarize()
+    are serialized.
+    """
+
+    def __init__(self, classify=classify_calls):
+        self._classify = classify
+        self.labels = None      # row key -> DERIVED_COLUMNS
+        self.summary = None     # CallSummary of the rows in keys
+        self.keys = None        # occurrence keys of the summarized rows
+        self.classified_rows = 0
+        self.reused_rows = 0
+        # Reentrant: summarize() reads chunks that are labeled through classify()
+        self._lock = threading.RLock()
+
+    def classify(self, data, tally=None):
+        """Label a freshly parsed upload, classifying only rows with unseen keys.
+
+        tally, a dict, gets this call's 'classified' and 'reused' row counts
+        added to it, for reporting per upload.
+        """
+        with self._lock:
+            return self._label(data, tally)
+
+    def _label(self, data, tally):
+        keys = row_keys(data)
+        is_new = np.ones(len(data), dtype=bool) if self.labels is None else ~keys.isin(self.labels.index)
+
+        if is_new.any():
+            new_rows = self._classify(data[is_new].copy())
+            new_labels = new_rows[DERIVED_COLUMNS].set_axis(keys[is_new])
+            new_labels = new_labels[~new_labels.index.duplicated()]
+            self.labels = new_labels if self.labels is None else as_label_dtypes(pd.concat([self.labels, new_labels]))
+        classified, reused = int(is_new.sum()), int((~is_new).sum())
+        self.classified_rows += classified
+        self.reused_rows += reused
+        if tally is not None:
+            tally['classified'] = tally.get('classified', 0) + classified
+            tally['reused'] = tally.get('reused', 0) + reused
+
+        data = data.copy()
+        labels = self.labels.reindex(keys)
+        for col in DERIVED_COLUMNS:
+            data[col] = labels[col].values
+        return data
+
+    def summarize(self, read_chunks):
+        """CallSummary of every labeled call, read_chunks() yielding them in one or more frames.
+
+        Reads the calls once when the log was appended to and twice when
+        calls summarized before have gone.
+        """
+        with self._lock:
+            summary, keys = self._fold(read_chunks(), self.summary, self.keys)
+            if self.keys is not None and not self.keys.isin(keys).all():
+                # Calls summarized before are gone: the log was rewritten, not appended to
+                summary, keys = self._fold(read_chunks(), None, None)
+            self.summary, self.keys = summary, keys
+            return summary
+
+    @staticmethod
+    def _fold(chunks, base, base_keys):
+        summary = copy.deepcopy(base)
+        seen = []
+        occurrences = pd.Series(dtype='int64')   # row key -> copies in earlier chunks
+        for chunk in chunks:
+            keys, occurrences = _occurrence_keys(row_keys(chunk), occurrences)
+            new = chunk if base_keys is None else chunk[~keys.isin(base_keys)]
+            if summary is None:
+                summary = CallSummary(chunk.columns)
+            if len(new) > 0:
+                summary.update(new)
+            seen.append(keys)
+        keys = seen[0].append(seen[1:]) if seen else pd.Index([], dtype='uint64')
+        return summary, keys
+
+def _occurrence_keys(keys, occurrences):
+    """(key of each row's content and its copy number, copies per key so far).
+
+    The n-th copy of a row gets the same key in every read of the log, so
+    an appended copy of an earlier row is new while the earlier one is not.
+    """
+    earlier = pd.Series(keys).map(occurrences).fillna(0).astype('int64').values
+    copy_number = earlier + pd.Series(keys).groupby(keys.values).cumcount().values
+    occurrence_keys = pd.util.hash_pandas_object(
+        pd.DataFrame({'key': keys.values, 'copy': copy_number}), index=False
+    ).values
+    occurrences = occurrences.add(pd.Series(keys).value_counts(), fill_value=0).astype('int64')
+    return pd.Index(occurrence_keys), occurrences
@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+# Most points any line or scatter chart sends to the browser
+MAX_CHART_POINTS = 2000
+HISTOGRAM_BINS = 20
+
+def histogram_bins(values, weights=None, bins=HISTOGRAM_BINS):
+    """Bin edges and counts for numeric values, computed server-side.
+
+    weights lets a value -> count table (e.g. CallSummary ring values) be
+    binned without expanding it back into one row per call. Non-numeric
+    values are ignored.
+    """
+    values = pd.to_numeric(pd.Series(values), errors='coerce').to_numpy(dtype=float)
+    weights = None if weights is None else np.asarray(weights, dtype=float)
+    keep = ~np.isnan(values)
+    if not keep.any():
+        return np.array([0.0, 1.0]), np.array([0])
+    counts, edges = np.histogram(values[keep], bins=bins, weights=None if weights is None else weights[keep])
+    return edges, counts.astype('int64')
+
+def histogram_figure(edges, counts, title, x_title, color='blue'):
+    """Bar chart of pre-binned counts - only len(counts) bars reach the browser"""
+    starts, ends = edges[:-1], edges[1:]
+    fig = go.Figure(go.Bar(
+        x=(starts + ends) / 2,
+        y=counts,
+        width=ends - starts,
+        customdata=np.column_stack([starts, ends]),
+        marker_color=color,
+        hovertemplate=f"{x_title}=%{{customdata[0]:.4g}}-%{{customdata[1]:.4g}}<br>count=%{{y}}<extra></extra>"
+    ))
+    fig.update_layout(title=title, xaxis_title=x_title, yaxis_title="count", bargap=0.02)
+    return fig
+
+def lttb_indices(x, y, threshold=MAX_CHART_POINTS):
+    """Indices of the points Largest-Triangle-Three-Buckets keeps out of (x, y).
+
+    x must be sorted; datetimes are fine. The first and last points are
+    always kept, plus the most visually significant point of each bucket
+    in between.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = pd.Series(x).to_numpy()
+    if np.issubdtype(x.dtype, np.datetime64):
+        x = x.astype('datetime64[ns]').astype('int64')
+    x = x.astype(float)
+    y = np.asarray(y, dtype=float)
+
+    # Bucket edges over the interior points 1 .. n-2
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    keep = np.empty(threshold, dtype=int)
+    keep[0], keep[-1] = 0, n - 1
+    previous = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        # The next bucket's average is the third vertex of each triangle
+        next_start, next_end = end, edges[i + 2] if i + 2 < len(edges) else n
+        next_x = x[next_start:next_end].mean()
+        next_y = y[next_start:next_end].mean()
+        areas = np.abs(
+            (x[previous] - next_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (next_y - y[previous])
+        )
+        previous = start + int(np.argmax(areas))
+        keep[i + 1] = previous
+    return keep
+
+def downsample(frame, x, y, threshold=MAX_CHART_POINTS):
+    """Rows of frame (sorted by x) that LTTB keeps for plotting column y against x"""
+    if len(frame) <= threshold:
+        return frame
+    return frame.iloc[lttb_indices(frame[x].values, frame[y].values, threshold)]
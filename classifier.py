@@ -0,0 +1,576 @@
+import functools
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from operator import itemgetter
+
+import numpy as np
+import pandas as pd
+
+from search import TranscriptIndex
+
+try:
+    import ahocorasick  # optional: pip install pyahocorasick
+except ImportError:
+    ahocorasick = None
+
+try:
+    import yaml  # optional: pip install pyyaml, for YAML rule files
+except ImportError:
+    yaml = None
+
+# =================================================================
+# RULE REGISTRY
+# =================================================================
+
+# The classifier term lists live in a rule file: rules.json next to this
+# module unless VOICESTACK_RULES points elsewhere (.yaml/.yml needs PyYAML).
+# Edits are picked up on the next classification, without a restart.
+RULES_PATH = os.environ.get('VOICESTACK_RULES') or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'rules.json')
+
+def parse_rules(text, path=''):
+    """Rule file contents -> rule dict (JSON, or YAML for .yaml/.yml files)"""
+    if path.lower().endswith(('.yaml', '.yml')):
+        if yaml is None:
+            raise ImportError(f"Reading {path} needs PyYAML (pip install pyyaml)")
+        return yaml.safe_load(text)
+    return json.loads(text)
+
+# Emotions and tracked phrases are stored as one bit each in an unsigned integer column
+BITSET_MAX_BITS = 64
+
+class RuleSet:
+    """One version of the classifier rules, compiled for the single-pass engine.
+
+    Purpose rules are checked in ascending priority (file order breaks
+    ties) and the first match wins, as in classify_call_purpose. Every term
+    of every classifier goes into one matcher - an Aho-Corasick automaton
+    when pyahocorasick is installed - so a transcript is scanned once.
+    """
+
+    def __init__(self, spec):
+        self.spec = spec
+        purposes = sorted(spec['purposes'], key=lambda rule: rule.get('priority', 0))
+        self.purpose_rules = [(rule['label'], list(rule['terms'])) for rule in purposes]
+        self.default_purpose = spec['default_purpose']
+        self.booking_success_terms = list(spec['booking_success']['success'])
+        self.booking_failure_terms = list(spec['booking_success']['failure'])
+        self.positive_terms = list(spec['sentiment']['positive'])
+        self.negative_terms = list(spec['sentiment']['negative'])
+        self.emotion_patterns = {emotion: list(terms) for emotion, terms in spec['emotions'].items()}
+        self.max_emotions = int(spec['max_emotions'])
+        self.tracked_phrases = dict(spec['tracked_phrases'])
+        for name, labels in [('emotions', self.emotion_patterns), ('tracked phrases', self.tracked_phrases)]:
+            if len(labels) > BITSET_MAX_BITS:
+                raise ValueError(f"{len(labels)} {name}: at most {BITSET_MAX_BITS} fit in a bitset column")
+        # 'substring' (default): a term matches anywhere, so 'bill' also hits 'billing';
+        # 'words': terms only match whole words, looked up in a search.TranscriptIndex
+        self.match = spec.get('match', 'substring')
+        if self.match not in ('substring', 'words'):
+            raise ValueError(f"Unknown rule match mode {self.match!r}: expected 'substring' or 'words'")
+        self.whole_words = self.match == 'words'
+
+        self.terms = self._collect_terms()
+        self.term_index = {term: i for i, term in enumerate(self.terms)}
+        self.match_terms = _build_matcher(self.terms)
+        self.version = self._fingerprint()
+
+    def _collect_terms(self):
+        """Every distinct term used by any classifier, in first-seen order"""
+        term_lists = [terms for _, terms in self.purpose_rules]
+        term_lists += [self.booking_success_terms, self.booking_failure_terms, self.positive_terms, self.negative_terms]
+        term_lists += list(self.emotion_patterns.values())
+        term_lists += [list(self.tracked_phrases.values())]
+        return list(dict.fromkeys(term for terms in term_lists for term in terms))
+
+    def _fingerprint(self):
+        """Short hash of every term list, so cached labels are invalidated when rules change"""
+        rules = [
+            self.purpose_rules, self.default_purpose,
+            self.booking_success_terms, self.booking_failure_terms,
+            self.positive_terms, self.negative_terms,
+            self.emotion_patterns, self.max_emotions,
+            self.tracked_phrases,
+        ]
+        if self.whole_words:
+            rules.append(self.match)
+        return hashlib.sha256(json.dumps(rules).encode('utf-8')).hexdigest()[:16]
+
+    def term_vector(self, terms):
+        """0/1 vector over the rule set's terms marking the given terms"""
+        vector = np.zeros(len(self.terms), dtype=np.int32)
+        vector[[self.term_index[term] for term in terms]] = 1
+        return vector
+
+    def contains(self, term, text):
+        """Whether lowercased text contains term, under the rule set's match mode"""
+        return self.matcher(text)(term)
+
+    def matcher(self, text):
+        """term -> whether lowercased text contains it; indexes text once for all its terms"""
+        if self.whole_words:
+            index = TranscriptIndex([text])
+            return lambda term: bool(len(index.phrase(term)))
+        return text.__contains__
+
+    def __reduce__(self):
+        # Matchers do not pickle; pool workers recompile (once per version)
+        return compile_rules, (self.spec,)
+
+def _build_matcher(terms):
+    """Return a function mapping lowercased text to the indices of the terms it contains"""
+    if ahocorasick is not None:
+        automaton = ahocorasick.Automaton()
+        for i, term in enumerate(terms):
+            automaton.add_word(term, i)
+        automaton.make_automaton()
+        term_of_match = itemgetter(1)
+        return lambda text: set(map(term_of_match, automaton.iter(text)))
+
+    indexed_terms = list(enumerate(terms))
+    return lambda text: [i for i, term in indexed_terms if term in text]
+
+_compiled_rules = {}  # rule dict fingerprint -> RuleSet, for the last rules compiled only
+
+def compile_rules(spec):
+    """RuleSet for a rule dict, reused while the same rules keep coming back"""
+    key = hashlib.sha256(json.dumps(spec, sort_keys=True).encode('utf-8')).hexdigest()
+    rules = _compiled_rules.get(key)
+    if rules is None:
+        rules = RuleSet(spec)
+        # One entry: a hot reload replaces the rules, so older ones are not needed again
+        _compiled_rules.clear()
+        _compiled_rules[key] = rules
+    return rules
+
+def load_rules(path=None):
+    """Compiled RuleSet for a rule file (default RULES_PATH)"""
+    path = RULES_PATH if path is None else path
+    with open(path, encoding='utf-8') as f:
+        return compile_rules(parse_rules(f.read(), path))
+
+# The rules in the file at start-up fix the label set: purposes, emotions
+# (their mask bits) and tracked phrase names (their Keyword_Flags bits)
+RULES = load_rules()
+
+PURPOSE_RULES = RULES.purpose_rules
+DEFAULT_PURPOSE = RULES.default_purpose
+BOOKING_SUCCESS_TERMS = RULES.booking_success_terms
+BOOKING_FAILURE_TERMS = RULES.booking_failure_terms
+POSITIVE_TERMS = RULES.positive_terms
+NEGATIVE_TERMS = RULES.negative_terms
+EMOTION_PATTERNS = RULES.emotion_patterns
+MAX_EMOTIONS = RULES.max_emotions
+# Transcript phrases tracked for the cancellation and no-show sections.
+# Each gets one bit in the Keyword_Flags column (case-insensitive substring match);
+# declare new phrases in the rule file rather than as inline regexes in the dashboard.
+TRACKED_PHRASES = RULES.tracked_phrases
+
+_rules_file = {'stamp': None, 'rules': RULES, 'error': None}
+
+def _same_labels(rules, reference):
+    return (
+        {label for label, _ in rules.purpose_rules} == {label for label, _ in reference.purpose_rules}
+        and rules.default_purpose == reference.default_purpose
+        and list(rules.emotion_patterns) == list(reference.emotion_patterns)
+        and list(rules.tracked_phrases) == list(reference.tracked_phrases)
+    )
+
+def current_rules():
+    """The rules in RULES_PATH now, recompiled only when the file's contents change.
+
+    An edit that does not parse, or that changes the labels (those need a
+    restart), is ignored and reported by rules_error(); the last good
+    rules stay in effect.
+    """
+    try:
+        stat = os.stat(RULES_PATH)
+    except OSError:
+        return _rules_file['rules']
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    if stamp != _rules_file['stamp']:
+        _rules_file['stamp'] = stamp
+        try:
+            rules = load_rules()
+            if not _same_labels(rules, RULES):
+                raise ValueError("changing the set of purposes, the emotions or the tracked phrase names needs a restart")
+            _rules_file['rules'], _rules_file['error'] = rules, None
+        except Exception as error:
+            _rules_file['error'] = f"{RULES_PATH}: {error}"
+    return _rules_file['rules']
+
+def rules_error():
+    """Why the latest edit of the rule file was not applied, or None"""
+    return _rules_file['error']
+
+def classifier_version():
+    """Version of the rules currently in effect, for cache keys"""
+    return current_rules().version
+
+# One bit per emotion, in EMOTION_PATTERNS order - the Emotions column stores these masks
+EMOTION_BITS = {emotion: 1 << i for i, emotion in enumerate(EMOTION_PATTERNS)}
+
+LABEL_COLUMNS = ['Call_Purpose', 'Booking_Success', 'Sentiment', 'Emotions', 'Call_Quality']
+KEYWORD_FLAGS_COLUMN = 'Keyword_Flags'
+DERIVED_COLUMNS = LABEL_COLUMNS + [KEYWORD_FLAGS_COLUMN]
+
+# Integer dtypes of the bitset columns: one bit per emotion / tracked phrase
+BITSET_DTYPES = {
+    'Emotions': np.min_scalar_type((1 << len(EMOTION_PATTERNS)) - 1),
+    KEYWORD_FLAGS_COLUMN: np.min_scalar_type((1 << len(TRACKED_PHRASES)) - 1),
+}
+
+# Every value each label column can take; the engine emits them as Categoricals
+PURPOSE_LABELS = [purpose for purpose, _ in PURPOSE_RULES] + [DEFAULT_PURPOSE, "Unknown"]
+BOOKING_LABELS = ["Successful", "Failed", "Unknown"]
+SENTIMENT_LABELS = ["Positive", "Negative", "Neutral"]
+QUALITY_LABELS = ["Excellent", "Good", "Poor", "Needs Improvement", "Average", "Unknown"]
+
+LABEL_DTYPES = {
+    'Call_Purpose': pd.CategoricalDtype(PURPOSE_LABELS),
+    'Booking_Success': pd.CategoricalDtype(BOOKING_LABELS),
+    'Sentiment': pd.CategoricalDtype(SENTIMENT_LABELS),
+    'Call_Quality': pd.CategoricalDtype(QUALITY_LABELS),
+}
+
+# Version of the start-up rules; classifier_version() follows edits of the rule file
+CLASSIFIER_VERSION = RULES.version
+
+# =================================================================
+# PER-TRANSCRIPT CLASSIFIERS (reference implementation)
+# =================================================================
+
+def classify_call_purpose(transcript, rules=None):
+    """Real AI classification based on transcript content"""
+    if pd.isna(transcript) or transcript == "":
+        return "Unknown"
+
+    transcript_lower = str(transcript).lower()
+    rules = current_rules() if rules is None else rules
+    contains = rules.matcher(transcript_lower)
+
+    for purpose, terms in rules.purpose_rules:
+        if any(contains(term) for term in terms):
+            return purpose
+
+    return rules.default_purpose
+
+def detect_booking_success(transcript, rules=None):
+    """Detect if booking attempt was successful"""
+    if pd.isna(transcript) or transcript == "":
+        return "Unknown"
+
+    transcript_lower = str(transcript).lower()
+    rules = current_rules() if rules is None else rules
+    contains = rules.matcher(transcript_lower)
+
+    success_count = sum(1 for term in rules.booking_success_terms if contains(term))
+    failure_count = sum(1 for term in rules.booking_failure_terms if contains(term))
+
+    if success_count > failure_count:
+        return "Successful"
+    elif failure_count > success_count:
+        return "Failed"
+    else:
+        return "Unknown"
+
+def analyze_sentiment(transcript, rules=None):
+    """Basic sentiment analysis from transcript"""
+    if pd.isna(transcript) or transcript == "":
+        return "Neutral"
+
+    transcript_lower = str(transcript).lower()
+    rules = current_rules() if rules is None else rules
+    contains = rules.matcher(transcript_lower)
+
+    positive_count = sum(1 for term in rules.positive_terms if contains(term))
+    negative_count = sum(1 for term in rules.negative_terms if contains(term))
+
+    if positive_count > negative_count:
+        return "Positive"
+    elif negative_count > positive_count:
+        return "Negative"
+    else:
+        return "Neutral"
+
+def detect_emotions(transcript, rules=None):
+    """Detect specific emotions in transcript"""
+    if pd.isna(transcript) or transcript == "":
+        return []
+
+    transcript_lower = str(transcript).lower()
+    rules = current_rules() if rules is None else rules
+    contains = rules.matcher(transcript_lower)
+    emotions = []
+
+    for emotion, terms in rules.emotion_patterns.items():
+        if any(contains(term) for term in terms):
+            emotions.append(emotion)
+
+    return emotions[:rules.max_emotions]  # Return top 3 emotions
+
+def encode_emotions(emotion_lists):
+    """Pack emotion lists into emotion masks (one bit per emotion)"""
+    return np.fromiter(
+        (sum(EMOTION_BITS[emotion] for emotion in emotions) for emotions in emotion_lists),
+        dtype=BITSET_DTYPES['Emotions']
+    )
+
+def decode_emotions(mask):
+    """Emotion names set in an emotion mask, in EMOTION_PATTERNS order"""
+    return [emotion for emotion, bit in EMOTION_BITS.items() if mask & bit]
+
+def decode_emotion_column(masks):
+    """Emotions column for display: each mask decoded to its list of emotion names"""
+    masks = pd.Series(masks)
+    lookup = {mask: decode_emotions(mask) for mask in masks.unique()}
+    return masks.map(lookup)
+
+def as_label_dtypes(data):
+    """Cast label columns read back from storage to their categorical dtypes (in place)"""
+    for col, dtype in LABEL_DTYPES.items():
+        if col in data.columns:
+            data[col] = data[col].astype(dtype)
+    if 'Emotions' in data.columns and data['Emotions'].dtype == object:
+        # Older files stored emotions as lists
+        data['Emotions'] = encode_emotions(data['Emotions'])
+    return data
+
+def assess_call_quality(transcript, sentiment):
+    """Assess call quality based on transcript and sentiment"""
+    if pd.isna(transcript) or transcript == "":
+        return "Unknown"
+
+    transcript_lower = str(transcript).lower()
+    words = len(transcript_lower.split())
+
+    return _quality_label(sentiment, words)
+
+def _quality_label(sentiment, words):
+    """Quality assessment logic shared by both classification paths"""
+    if sentiment == 'Positive' and words > 30:
+        return "Excellent"
+    elif sentiment == 'Positive':
+        return "Good"
+    elif sentiment == 'Negative' and words < 10:
+        return "Poor"
+    elif sentiment == 'Negative':
+        return "Needs Improvement"
+    else:
+        return "Average"
+
+def classify_transcript(transcript, rules=None):
+    """Run every per-transcript classifier and return the label tuple"""
+    rules = current_rules() if rules is None else rules
+    sentiment = analyze_sentiment(transcript, rules)
+    return (
+        classify_call_purpose(transcript, rules),
+        detect_booking_success(transcript, rules),
+        sentiment,
+        detect_emotions(transcript, rules),
+        assess_call_quality(transcript, sentiment),
+    )
+
+# =================================================================
+# SINGLE-PASS CLASSIFICATION ENGINE
+# =================================================================
+
+def keyword_mask(*names):
+    """Keyword_Flags bits for the given tracked phrase names"""
+    phrase_names = list(TRACKED_PHRASES)
+    mask = 0
+    for name in names:
+        mask |= 1 << phrase_names.index(name)
+    return mask
+
+def has_keyword(flags, *names):
+    """Boolean Series/array: which calls mention any of the named tracked phrases"""
+    return (flags & keyword_mask(*names)) != 0
+
+def _scan(values, rules):
+    """Lowercase each value once and record term hits and word counts"""
+    words = np.zeros(len(values), dtype=np.int64)
+    empty = np.zeros(len(values), dtype=bool)
+    is_text = np.zeros(len(values), dtype=bool)
+    hit_rows, hit_terms = [], []
+
+    for row, value in enumerate(values):
+        if value == "":
+            empty[row] = True
+            continue
+        is_text[row] = isinstance(value, str)
+        text = str(value).lower()
+        matched = rules.match_terms(text)
+        hit_rows.extend([row] * len(matched))
+        hit_terms.extend(matched)
+        words[row] = len(text.split())
+
+    hits = np.zeros((len(values), len(rules.terms)), dtype=bool)
+    hits[hit_rows, hit_terms] = True
+    return hits, words, empty, is_text
+
+def _index_scan(values, rules):
+    """_scan with whole-word matching: term hits come from a TranscriptIndex of the values"""
+    index = TranscriptIndex(values)
+    hits = index.term_hits(rules.terms)[index.codes]
+    words = index.word_counts[index.codes]
+    empty = values == ""
+    is_text = np.array([isinstance(value, str) for value in values], dtype=bool) & ~empty
+    return hits, words, empty, is_text
+
+def _labels_from_hits(hits, words, empty, rules):
+    """Vectorized label assignment from a term-hit matrix.
+
+    Returns category codes into the *_LABELS lists for purpose, booking
+    success, sentiment and quality, and the emotion mask, one entry per row.
+    """
+    def codes(conditions, labels, default, categories):
+        return np.select(
+            conditions,
+            [categories.index(label) for label in labels],
+            default=categories.index(default)
+        ).astype(np.int8)
+
+    purpose = codes(
+        [hits @ rules.term_vector(terms) > 0 for _, terms in rules.purpose_rules],
+        [purpose for purpose, _ in rules.purpose_rules],
+        rules.default_purpose, PURPOSE_LABELS
+    )
+
+    success_count = hits @ rules.term_vector(rules.booking_success_terms)
+    failure_count = hits @ rules.term_vector(rules.booking_failure_terms)
+    booking = codes(
+        [success_count > failure_count, failure_count > success_count],
+        ["Successful", "Failed"],
+        "Unknown", BOOKING_LABELS
+    )
+
+    positive_count = hits @ rules.term_vector(rules.positive_terms)
+    negative_count = hits @ rules.term_vector(rules.negative_terms)
+    positive = positive_count > negative_count
+    negative = negative_count > positive_count
+    sentiment = codes([positive, negative], ["Positive", "Negative"], "Neutral", SENTIMENT_LABELS)
+
+    quality = codes(
+        [positive & (words > 30), positive, negative & (words < 10), negative],
+        ["Excellent", "Good", "Poor", "Needs Improvement"],
+        "Average", QUALITY_LABELS
+    )
+
+    bits = np.array(list(EMOTION_BITS.values()), dtype=BITSET_DTYPES['Emotions'])
+    emotions = (_emotion_hits(hits, rules) * bits).sum(axis=1, dtype=np.uint64).astype(BITSET_DTYPES['Emotions'])
+
+    # Empty transcripts get the same fallbacks as the per-transcript classifiers
+    purpose[empty] = PURPOSE_LABELS.index("Unknown")
+    booking[empty] = BOOKING_LABELS.index("Unknown")
+    sentiment[empty] = SENTIMENT_LABELS.index("Neutral")
+    quality[empty] = QUALITY_LABELS.index("Unknown")
+    emotions[empty] = 0
+
+    return [purpose, booking, sentiment, emotions, quality]
+
+def _emotion_hits(hits, rules):
+    """Row x emotion matrix of detected emotions, keeping the first max_emotions"""
+    emotion_hits = np.column_stack(
+        [hits @ rules.term_vector(terms) > 0 for terms in rules.emotion_patterns.values()]
+    )
+    return emotion_hits & (np.cumsum(emotion_hits, axis=1) <= rules.max_emotions)
+
+def _keyword_flags_from_hits(hits, is_text, rules):
+    """Pack the tracked-phrase hits into one integer bitset per row.
+
+    Like str.contains on an object column, non-string values never match.
+    """
+    phrase_hits = hits[:, [rules.term_index[phrase] for phrase in rules.tracked_phrases.values()]]
+    bits = np.left_shift(1, np.arange(len(TRACKED_PHRASES), dtype=np.int64))
+    flags = phrase_hits.astype(np.int64) @ bits
+    flags[~is_text] = 0
+    return flags.astype(BITSET_DTYPES[KEYWORD_FLAGS_COLUMN])
+
+def keyword_flags(transcripts):
+    """Keyword_Flags bitset for transcripts that were classified without it"""
+    return classify_transcripts(transcripts)[KEYWORD_FLAGS_COLUMN].values
+
+def classify_transcripts(transcripts, rules=None):
+    """Classify a transcript Series in a single pass.
+
+    Identical transcripts are classified once, each distinct transcript is
+    lowercased once and matched against the terms of every classifier in one
+    scan. Returns a DataFrame aligned to the input index with LABEL_COLUMNS,
+    matching the per-transcript classifiers row for row, plus the
+    Keyword_Flags bitset of TRACKED_PHRASES.
+
+    Purpose, booking success, sentiment and quality are Categoricals (see
+    LABEL_DTYPES); Emotions is an unsigned mask of EMOTION_BITS - use
+    decode_emotion_column() to turn it back into lists for display.
+    """
+    transcripts = pd.Series(transcripts)
+    codes, uniques = pd.factorize(transcripts)
+    uniques = np.asarray(uniques, dtype=object)
+
+    # Missing transcripts are factorized to -1; point them at an extra empty slot
+    values = np.append(uniques, "")
+    codes = np.where(codes < 0, len(uniques), codes)
+
+    rules = current_rules() if rules is None else rules
+    scan = _index_scan if rules.whole_words else _scan
+    hits, words, empty, is_text = scan(values, rules)
+    columns = _labels_from_hits(hits, words, empty, rules) + [_keyword_flags_from_hits(hits, is_text, rules)]
+
+    result = {}
+    for col, column in zip(DERIVED_COLUMNS, columns):
+        if col in LABEL_DTYPES:
+            result[col] = pd.Categorical.from_codes(column[codes], dtype=LABEL_DTYPES[col])
+        else:
+            result[col] = column[codes]
+    return pd.DataFrame(result, index=transcripts.index)
+
+# =================================================================
+# PARALLEL CLASSIFICATION
+# =================================================================
+
+# Below this many distinct transcripts the pool start-up and pickling cost
+# more than the scan itself, so classification stays serial
+PARALLEL_MIN_ROWS = 20_000
+
+_pools = {}  # worker count -> ProcessPoolExecutor, reused across uploads and chunks
+
+def default_workers():
+    """Worker count from VOICESTACK_WORKERS (0 or unset = serial, -1 = every core)"""
+    workers = int(os.environ.get('VOICESTACK_WORKERS', '0'))
+    return (os.cpu_count() or 1) if workers < 0 else workers
+
+def _pool(workers):
+    if workers not in _pools:
+        _pools[workers] = ProcessPoolExecutor(max_workers=workers)
+    return _pools[workers]
+
+def classify_transcripts_parallel(transcripts, workers=None, min_rows=PARALLEL_MIN_ROWS):
+    """classify_transcripts() sharded across a process pool.
+
+    The distinct transcripts are split into one contiguous shard per worker,
+    classified in parallel and reassembled in the original row order, so the
+    result is identical to the serial path. Workers are capped at the
+    core count, since every transcript is pickled to a worker and back
+    (about a seventh of the serial scan time); falls back to the serial
+    path when that leaves one worker or there are fewer than min_rows
+    distinct transcripts.
+    """
+    transcripts = pd.Series(transcripts)
+    workers = min(default_workers() if workers is None else workers, os.cpu_count() or 1)
+    codes, uniques = pd.factorize(transcripts)
+    if workers <= 1 or len(uniques) < min_rows:
+        return classify_transcripts(transcripts)
+
+    # Same missing-transcript slot as classify_transcripts
+    values = np.append(np.asarray(uniques, dtype=object), "")
+    codes = np.where(codes < 0, len(uniques), codes)
+
+    # Every shard uses the same rules, even if the rule file changes mid-run
+    classify = functools.partial(classify_transcripts, rules=current_rules())
+    shards = np.array_split(values, workers)
+    labels = pd.concat(_pool(workers).map(classify, shards), ignore_index=True)
+    labels = labels.take(codes)
+    labels.index = transcripts.index
+    return labels
@@ -0,0 +1,154 @@
+import numpy as np
+import pandas as pd
+
+from classifier import DERIVED_COLUMNS
+from prompts import LLM_COLUMNS
+from schema import resolve_schema, schema_columns
+from search import tokenize
+
+# Near-duplicate transcripts: MinHash signatures of word shingles, bucketed with LSH
+SHINGLE_WORDS = 3
+MINHASH_PERMUTATIONS = 64
+LSH_BANDS = 8                     # 8 bands of 8 rows: pairs above ~0.77 similarity usually share a bucket
+NEAR_DUPLICATE_THRESHOLD = 0.8    # estimated Jaccard similarity of the shingle sets
+SMALL_BUCKET = 16                 # LSH buckets up to this size compare every pair of members
+HASH_BLOCK_SHINGLES = 1 << 15
+
+def row_keys(data):
+    """Identity of each call row: its call id when the export has one, else a hash of its raw columns.
+
+    Only the columns read from the export count, so keys are the same
+    before and after classification adds its label columns.
+    """
+    schema = resolve_schema(data.columns)
+    if schema['call_id'] is not None:
+        columns = [schema['call_id']]
+    else:
+        columns = schema_columns(schema) or [
+            col for col in data.columns if col not in DERIVED_COLUMNS and col not in LLM_COLUMNS
+        ]
+    return pd.Index(pd.util.hash_pandas_object(data[columns], index=False).values)
+
+def _shingle_hashes(texts):
+    """(64-bit hash of every word shingle, index of its text), texts in order.
+
+    A shingle starts at every word and spans SHINGLE_WORDS words, fewer at
+    the end of a text, so any text with a word has at least one shingle.
+    """
+    token_lists = [tokenize(text) for text in texts]
+    lengths = np.fromiter(map(len, token_lists), dtype=np.int64, count=len(token_lists))
+    docs = np.repeat(np.arange(len(texts), dtype=np.int64), lengths)
+    tokens = np.array([token for tokens in token_lists for token in tokens], dtype=object)
+    # Content hashes, so signatures of the same text agree across calls; 0 pads past the end of a text
+    token_ids = pd.util.hash_array(tokens) | np.uint64(1)
+
+    shingles = np.zeros(len(token_ids), dtype=np.uint64)
+    for offset in range(SHINGLE_WORDS):
+        following = np.zeros(len(token_ids), dtype=np.uint64)
+        same_doc = docs[offset:] == docs[:len(docs) - offset]
+        following[:len(docs) - offset] = np.where(same_doc, token_ids[offset:], 0)
+        shingles = shingles * np.uint64(0x100000001B3) + following   # wraps mod 2**64
+    return shingles, docs
+
+def minhash_signatures(texts, permutations=MINHASH_PERMUTATIONS, seed=0):
+    """texts x permutations uint32 MinHash signatures; rows of texts without words are all 0xFFFFFFFF"""
+    shingles, docs = _shingle_hashes(texts)
+    signatures = np.full((len(texts), permutations), np.iinfo(np.uint32).max, dtype=np.uint32)
+    if len(shingles) == 0:
+        return signatures
+    rng = np.random.default_rng(seed)
+    masks = rng.integers(0, 2 ** 63, size=permutations, dtype=np.uint64)
+    multipliers = rng.integers(0, 2 ** 63, size=permutations, dtype=np.uint64) | np.uint64(1)
+
+    has_words = np.unique(docs)
+    starts = np.searchsorted(docs, has_words)
+    # Blocks of whole texts small enough for the hashing temporaries to stay in cache
+    blocks = np.unique(np.searchsorted(starts, np.arange(0, len(shingles), HASH_BLOCK_SHINGLES), side='right') - 1)
+    for first, last in zip(blocks, list(blocks[1:]) + [len(starts)]):
+        block = shingles[starts[first]:starts[last] if last < len(starts) else len(shingles)]
+        block_starts = starts[first:last] - starts[first]
+        hashed = np.empty_like(block)
+        for i in range(permutations):
+            # Multiply-shift hashing: one cheap universal hash per permutation
+            np.bitwise_xor(block, masks[i], out=hashed)
+            np.multiply(hashed, multipliers[i], out=hashed)
+            np.right_shift(hashed, np.uint64(32), out=hashed)
+            signatures[has_words[first:last], i] = np.minimum.reduceat(hashed, block_starts)
+    return signatures
+
+def _components(size, left, right):
+    """Connected-component label (smallest member) of each of size nodes, given edges"""
+    labels = np.arange(size)
+    while True:
+        smaller = np.minimum(labels[left], labels[right])
+        merged = labels.copy()
+        np.minimum.at(merged, left, smaller)
+        np.minimum.at(merged, right, smaller)
+        merged = merged[merged]   # pointer jumping
+        if np.array_equal(merged, labels):
+            return labels
+        labels = merged
+
+def near_duplicate_clusters(transcripts, threshold=NEAR_DUPLICATE_THRESHOLD, bands=LSH_BANDS):
+    """Cluster id of each transcript, -1 for missing ones.
+
+    Identical transcripts always share a cluster. Distinct transcripts join
+    one when their MinHash signatures put them in the same LSH bucket and
+    their estimated similarity is at least threshold: every pair of a
+    small bucket is compared, and the members of a larger one are compared
+    with their neighbours in signature order. Linear in the total length of
+    the distinct transcripts.
+    """
+    codes, uniques = pd.factorize(pd.Series(transcripts))
+    texts = [str(text) for text in uniques]
+    signatures = minhash_signatures(texts)
+    has_words = signatures[:, 0] != np.iinfo(np.uint32).max   # texts without words only match exactly
+
+    rows_per_band = signatures.shape[1] // bands
+    left, right = [np.zeros(0, dtype=np.int64)], [np.zeros(0, dtype=np.int64)]
+    candidates = np.flatnonzero(has_words)
+    # Members ordered by their whole signature, so the most alike texts of a bucket sit side by side
+    by_signature = candidates[np.lexsort(signatures[candidates].T[::-1])]
+    for band in range(bands):
+        columns = signatures[by_signature, band * rows_per_band:(band + 1) * rows_per_band]
+        buckets, _ = pd.factorize(pd.util.hash_pandas_object(pd.DataFrame(columns), index=False).values)
+        order = np.argsort(buckets, kind='stable')
+        members, buckets = by_signature[order], buckets[order]
+        # Every pair of a small bucket; consecutive members of a large one
+        small = np.bincount(buckets) <= SMALL_BUCKET
+        for gap in range(1, min(SMALL_BUCKET, len(members))):
+            linked = buckets[gap:] == buckets[:-gap]
+            if gap > 1:
+                linked &= small[buckets[gap:]]
+            left.append(members[:-gap][linked])
+            right.append(members[gap:][linked])
+
+    # Each pair once, whichever bands linked it
+    pairs = np.unique(np.sort(np.column_stack([np.concatenate(left), np.concatenate(right)]), axis=1), axis=0)
+    left, right = pairs[:, 0], pairs[:, 1]
+    similar = (signatures[left] == signatures[right]).mean(axis=1) >= threshold
+    clusters = _components(len(texts), left[similar], right[similar])
+    return np.where(codes < 0, -1, clusters[np.maximum(codes, 0)])
+
+def cluster_table(data, clusters, transcript_col, min_calls=2):
+    """One row per cluster of at least min_calls calls, largest first.
+
+    Columns: calls, distinct transcripts, the most common purpose when the
+    calls are classified, and an example transcript.
+    """
+    in_cluster = clusters >= 0
+    frame = pd.DataFrame({
+        'cluster': clusters[in_cluster],
+        'transcript': data[transcript_col].values[in_cluster],
+    })
+    grouped = frame.groupby('cluster')['transcript']
+    table = pd.DataFrame({
+        'calls': grouped.size(),
+        'distinct_transcripts': grouped.nunique(dropna=False),
+        'example': grouped.first().astype(str).str.slice(0, 160),
+    })
+    if 'Call_Purpose' in data.columns:
+        purposes = pd.Series(data['Call_Purpose'].values[in_cluster], index=frame.index).astype(object)
+        table.insert(2, 'purpose', purposes.groupby(frame['cluster']).agg(lambda values: values.mode().iat[0]))
+    table = table[table['calls'] >= min_calls].sort_values('calls', ascending=False, kind='stable')
+    return table.reset_index(drop=True)
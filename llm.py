@@ -0,0 +1,248 @@
+import abc
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from prompts import CLASSIFICATION_PROMPTS
+
+# Transcripts sent per request and requests in flight at once
+BATCH_SIZE = 16
+MAX_CONCURRENCY = 8
+MAX_RETRIES = 3
+
+def text_hash(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+def normalize_response(text):
+    """First non-empty line of a completion, stripped of quotes and punctuation, in uppercase"""
+    for line in str(text).splitlines():
+        line = line.strip().strip('"\'`*.:').strip()
+        if line:
+            return line.upper()
+    return None
+
+# =================================================================
+# CLIENTS
+# =================================================================
+
+class LLMClient(abc.ABC):
+    """Pluggable completion backend.
+
+    Subclasses implement complete(): one completion per prompt, in order. A
+    backend without batch support can simply gather one request per prompt.
+    """
+
+    # Part of every cache key, so switching models never reuses old answers
+    model = 'unknown'
+
+    @abc.abstractmethod
+    async def complete(self, prompts):
+        """Completion texts for a list of prompts, in order"""
+
+    def close(self):
+        pass
+
+class CompletionsClient(LLMClient):
+    """OpenAI-compatible /completions endpoint (OpenAI, vLLM, llama.cpp, the benchmark stub).
+
+    The endpoint accepts a list of prompts, so each batch is one HTTP request.
+    Requests run on a private thread pool so they never block the event loop.
+    """
+
+    def __init__(self, base_url, model, api_key=None, max_tokens=16, timeout=60, max_concurrency=MAX_CONCURRENCY):
+        self.url = base_url.rstrip('/') + '/completions'
+        self.model = model
+        self.api_key = api_key
+        self.max_tokens = max_tokens
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency)
+
+    async def complete(self, prompts):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._post, list(prompts))
+
+    def _post(self, prompts):
+        body = json.dumps({
+            'model': self.model,
+            'prompt': prompts,
+            'max_tokens': self.max_tokens,
+            'temperature': 0,
+        }).encode('utf-8')
+        headers = {'Content-Type': 'application/json'}
+        if self.api_key:
+            headers['Authorization'] = f"Bearer {self.api_key}"
+        request = urllib.request.Request(self.url, data=body, headers=headers)
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            choices = json.load(response)['choices']
+        return [choice['text'] for choice in sorted(choices, key=lambda choice: choice['index'])]
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+
+# =================================================================
+# RESPONSE CACHE AND RATE LIMIT
+# =================================================================
+
+class ResponseCache:
+    """SQLite cache of normalized responses keyed on (prompt, transcript hash, model).
+
+    With a path the cache persists, so re-running a classification only sends
+    the calls it has never seen. The default is an in-memory database.
+    """
+
+    def __init__(self, path=':memory:'):
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "prompt_hash TEXT, transcript_hash TEXT, model TEXT, response TEXT, "
+                "PRIMARY KEY (prompt_hash, transcript_hash, model))"
+            )
+
+    def get_many(self, prompt_hash, model, transcript_hashes):
+        """transcript hash -> cached response, for the hashes that are cached"""
+        found = {}
+        hashes = list(transcript_hashes)
+        with self._lock:
+            for start in range(0, len(hashes), 500):
+                batch = hashes[start:start + 500]
+                rows = self._db.execute(
+                    "SELECT transcript_hash, response FROM responses "
+                    f"WHERE prompt_hash = ? AND model = ? AND transcript_hash IN ({','.join('?' * len(batch))})",
+                    [prompt_hash, model, *batch]
+                )
+                found.update(rows)
+        return found
+
+    def put_many(self, prompt_hash, model, responses):
+        """Store a transcript hash -> response mapping"""
+        with self._lock, self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)",
+                [(prompt_hash, transcript_hash, model, response) for transcript_hash, response in responses.items()]
+            )
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+class RateLimiter:
+    """Spaces request starts at least 1 / per_second apart (no limit when per_second is falsy)"""
+
+    def __init__(self, per_second=None):
+        self.interval = 1 / per_second if per_second else 0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        if not self.interval:
+            return
+        async with self._lock:
+            now = asyncio.get_running_loop().time()
+            delay = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+# =================================================================
+# CLASSIFICATION
+# =================================================================
+
+class LLMClassifier:
+    """Runs the classification prompts over a transcript column through an LLMClient.
+
+    Identical transcripts are sent once, cached answers are never re-sent, and
+    the remaining (prompt, transcript) pairs go out batch_size per request with
+    up to max_concurrency requests in flight, throttled to requests_per_second.
+    """
+
+    def __init__(self, client, cache=None, prompts=CLASSIFICATION_PROMPTS, batch_size=BATCH_SIZE,
+                 max_concurrency=MAX_CONCURRENCY, requests_per_second=None, max_retries=MAX_RETRIES):
+        self.client = client
+        self.cache = cache if cache is not None else ResponseCache()
+        self.prompts = prompts
+        self.batch_size = batch_size
+        self.max_concurrency = max_concurrency
+        self.requests_per_second = requests_per_second
+        self.max_retries = max_retries
+        self.requests = 0  # requests sent, for diagnostics
+
+    def version(self):
+        """Cache tag covering the model and the prompt texts"""
+        return f"{self.client.model}-{text_hash(''.join(self.prompts.values()))[:12]}"
+
+    def classify(self, transcripts):
+        """DataFrame with one column per prompt, aligned to the transcripts' index"""
+        return asyncio.run(self.classify_async(transcripts))
+
+    def label_calls(self, data):
+        """Add the LLM label columns to a call frame (in place)"""
+        if 'transcript' in data.columns:
+            labels = self.classify(data['transcript'])
+            for col in labels.columns:
+                data[col] = labels[col]
+        return data
+
+    async def classify_async(self, transcripts):
+        transcripts = pd.Series(transcripts)
+        codes, uniques = pd.factorize(transcripts)
+        texts = [str(text) for text in uniques]
+        hashes = [text_hash(text) for text in texts]
+
+        limiter = RateLimiter(self.requests_per_second)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        answers = await asyncio.gather(*(
+            self._answer_prompt(template, texts, hashes, limiter, semaphore)
+            for template in self.prompts.values()
+        ))
+
+        result = {}
+        for col, answer in zip(self.prompts, answers):
+            # Missing transcripts are factorized to -1 and get no label
+            column = np.append(np.asarray(answer, dtype=object), None)
+            result[col] = column[codes]
+        return pd.DataFrame(result, index=transcripts.index)
+
+    async def _answer_prompt(self, template, texts, hashes, limiter, semaphore):
+        """Normalized answer per distinct transcript for one prompt"""
+        prompt_hash = text_hash(template)
+        cached = self.cache.get_many(prompt_hash, self.client.model, set(hashes))
+        todo = [i for i, transcript_hash in enumerate(hashes) if transcript_hash not in cached]
+
+        async def run_batch(batch):
+            prompts = [template.format(transcript=texts[i]) for i in batch]
+            responses = await self._request(prompts, limiter, semaphore)
+            fresh = {hashes[i]: normalize_response(response) for i, response in zip(batch, responses)}
+            self.cache.put_many(prompt_hash, self.client.model, fresh)
+            cached.update(fresh)
+
+        batches = [todo[start:start + self.batch_size] for start in range(0, len(todo), self.batch_size)]
+        await asyncio.gather(*(run_batch(batch) for batch in batches))
+        return [cached[transcript_hash] for transcript_hash in hashes]
+
+    async def _request(self, prompts, limiter, semaphore):
+        """One batched request, retried with exponential backoff on transient errors"""
+        async with semaphore:
+            for attempt in range(self.max_retries + 1):
+                await limiter.wait()
+                self.requests += 1
+                try:
+                    responses = await self.client.complete(prompts)
+                except (urllib.error.URLError, ConnectionError, TimeoutError) as error:
+                    status = getattr(error, 'code', None)
+                    if attempt == self.max_retries or (status is not None and status < 500 and status != 429):
+                        raise
+                    await asyncio.sleep(2 ** attempt)
+                else:
+                    if len(responses) != len(prompts):
+                        raise ValueError(f"expected {len(prompts)} completions, got {len(responses)}")
+                    return responses
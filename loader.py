@@ -0,0 +1,173 @@
+import io
+import os
+
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401 - optional: enables the multithreaded pyarrow CSV engine
+except ImportError:
+    pyarrow = None
+
+from classifier import classifier_version, classify_transcripts_parallel, DERIVED_COLUMNS
+from memo import classify_memoized, label_memo
+from profiling import profiled, stage
+from schema import read_options, resolve_schema, schema_fingerprint
+
+# Rows per chunk when streaming large exports
+CHUNK_ROWS = 50_000
+
+# CSV engine for whole-file reads: 'pyarrow' when installed, unless
+# VOICESTACK_CSV_ENGINE says otherwise. Streaming always uses the C engine,
+# which is the one that supports chunksize.
+CSV_ENGINE = os.environ.get('VOICESTACK_CSV_ENGINE') or ('pyarrow' if pyarrow is not None else 'c')
+
+# Bump whenever the shape or dtypes of the loaded frame, or the layout of
+# CallSummary, change, so frames cached by an older loader are not reused
+LOADER_VERSION = 11
+
+# Candidate formats for date columns, tried against a sample of each column
+# (month-first before day-first, like pd.to_datetime's own inference)
+DATE_FORMATS = [
+    '%m/%d/%Y %I:%M %p',
+    '%m/%d/%Y %I:%M:%S %p',
+    '%m/%d/%Y %H:%M',
+    '%m/%d/%Y %H:%M:%S',
+    '%m/%d/%Y',
+    '%Y-%m-%d %H:%M:%S',
+    '%Y-%m-%d %H:%M',
+    '%Y-%m-%dT%H:%M:%S',
+    '%Y-%m-%dT%H:%M:%S.%f',
+    '%Y-%m-%d',
+    '%d/%m/%Y %H:%M',
+    '%d/%m/%Y %H:%M:%S',
+    '%d/%m/%Y',
+    '%m-%d-%Y %H:%M',
+    '%d-%m-%Y %H:%M',
+    '%Y/%m/%d %H:%M:%S',
+    '%Y/%m/%d',
+]
+DATE_SAMPLE_ROWS = 200
+
+# (source, column) -> detected format, or None when no candidate parses any sampled value
+_date_formats = {}
+
+def detect_date_format(values):
+    """The candidate format that parses the most values of a sample (earliest on ties), or None"""
+    sample = values.dropna().astype(str).head(DATE_SAMPLE_ROWS)
+    best, best_parsed = None, 0
+    for fmt in DATE_FORMATS:
+        parsed = pd.to_datetime(sample, format=fmt, errors='coerce').notna().sum()
+        if parsed > best_parsed:
+            best, best_parsed = fmt, parsed
+            if parsed == len(sample):
+                break
+    return best
+
+def parse_dates(values, source=None):
+    """Parse one date column with its detected format (per column name and source).
+
+    The format is detected once, on the first chunk with values, and kept.
+    Only the values it does not fit - odd rows, or every row when no
+    candidate fits - go through pd.to_datetime's per-element inference.
+    """
+    key = (source, values.name)
+    if key not in _date_formats and values.notna().any():
+        _date_formats[key] = detect_date_format(values)
+    fmt = _date_formats.get(key)
+    if fmt is None:
+        return pd.to_datetime(values, errors='coerce')
+    parsed = pd.to_datetime(values, format=fmt, errors='coerce')
+    unparsed = parsed.isna() & values.notna()
+    if unparsed.any():
+        parsed[unparsed] = pd.to_datetime(values[unparsed], errors='coerce')
+    return parsed
+
+@profiled('Date parsing')
+def parse_date_columns(data, source=None):
+    """Convert the schema's timestamp columns to datetimes (in place).
+
+    Numeric columns (e.g. 'ring_duration_time') and columns that are already
+    datetimes are left alone. Detected formats are cached per column name and
+    source, which defaults to the export's column layout, so chunks and
+    re-uploads skip detection.
+    """
+    if source is None:
+        source = tuple(data.columns)
+    for date_col in resolve_schema(data.columns)['timestamps']:
+        values = data[date_col]
+        if pd.api.types.is_numeric_dtype(values) or pd.api.types.is_datetime64_any_dtype(values):
+            continue
+        data[date_col] = parse_dates(values, source)
+    return data
+
+@profiled('Classification')
+def classify_calls(data, workers=None):
+    """Add the AI classification label and keyword flag columns to a call frame (in place).
+
+    workers > 1 shards large frames across a process pool; None reads
+    VOICESTACK_WORKERS (serial by default). Transcripts already in the
+    process-wide label memo (memo.py) are not classified again.
+    """
+    if 'transcript' in data.columns:
+        memo = label_memo()
+        if memo is not None:
+            labels = classify_memoized(data['transcript'], memo, workers=workers)
+        else:
+            labels = classify_transcripts_parallel(data['transcript'], workers=workers)
+        for label_col in DERIVED_COLUMNS:
+            data[label_col] = labels[label_col]
+    return data
+
+def prepare_calls(data):
+    """Name the transcript column 'transcript' and clean the date columns (in place)"""
+    transcript_col = resolve_schema(data.columns)['transcript']
+    if transcript_col not in (None, 'transcript'):
+        data = data.rename(columns={transcript_col: 'transcript'})
+    return parse_date_columns(data)
+
+def csv_columns(source):
+    """Header of a CSV given as bytes, a path or a seekable file"""
+    if isinstance(source, bytes):
+        source = io.BytesIO(source)
+    columns = pd.read_csv(source, nrows=0).columns
+    if hasattr(source, 'seek'):
+        source.seek(0)
+    return columns
+
+@profiled('CSV parse')
+def read_call_csv(raw_bytes, engine=None):
+    """Parse an uploaded call export, reading only the columns the dashboard uses, typed"""
+    columns = csv_columns(raw_bytes)
+    usecols, dtypes = read_options(columns)
+    engine = engine or CSV_ENGINE
+    data = pd.read_csv(io.BytesIO(raw_bytes), usecols=usecols, dtype=dtypes, engine=engine)
+    if engine == 'pyarrow':
+        # pyarrow returns usecols order and reads empty text fields as '' -
+        # match the C engine (export column order, missing values)
+        data = data[[col for col in columns if col in data.columns]]
+        for col in data.select_dtypes(include=['object', 'string', 'category']).columns:
+            data[col] = data[col].mask(data[col] == '')
+    return prepare_calls(data)
+
+@profiled('Load')
+def load_call_data(raw_bytes, classify=classify_calls):
+    """Parse an uploaded call export and apply the AI classification"""
+    return classify(read_call_csv(raw_bytes))
+
+def iter_call_chunks(source, chunksize=CHUNK_ROWS, classify=classify_calls):
+    """Stream a call export chunk by chunk, cleaning dates and classifying each chunk"""
+    if isinstance(source, bytes):
+        source = io.BytesIO(source)
+    usecols, dtypes = read_options(csv_columns(source))
+    chunks = pd.read_csv(source, chunksize=chunksize, usecols=usecols, dtype=dtypes)
+    while True:
+        with stage("CSV parse") as record:
+            chunk = next(chunks, None)
+            record['rows'] = 0 if chunk is None else len(chunk)
+        if chunk is None:
+            return
+        yield classify(prepare_calls(chunk))
+
+def loader_version():
+    """Version tag covering the loader, the classifier rules and the column mapping"""
+    return f"loader{LOADER_VERSION}-rules{classifier_version()}-schema{schema_fingerprint()}"
@@ -0,0 +1,209 @@
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from classifier import (
+    BITSET_DTYPES,
+    DERIVED_COLUMNS,
+    LABEL_DTYPES,
+    classifier_version,
+    classify_transcripts_parallel,
+)
+
+# Process-wide label memo: VOICESTACK_LABEL_MEMO_SIZE distinct transcripts kept
+# in memory (0 turns the memo off), backed by the SQLite file VOICESTACK_LABEL_MEMO
+# when set, so labels survive restarts and are shared by every process using it
+LABEL_MEMO_SIZE = int(os.environ.get('VOICESTACK_LABEL_MEMO_SIZE', '100000'))
+LABEL_MEMO_PATH = os.environ.get('VOICESTACK_LABEL_MEMO') or None
+
+def transcript_hashes(transcripts):
+    """64-bit hash of each normalized transcript, the same in every process and run.
+
+    Normalizing only folds case: the classifiers match lowercased text, while
+    whitespace can change labels ("" is an empty call, " " is not).
+    """
+    normalized = np.array([text.lower() for text in transcripts], dtype=object)
+    return pd.util.hash_array(normalized)
+
+class LabelMemo:
+    """Classifier labels per normalized transcript: a bounded LRU over an optional SQLite file.
+
+    Entries hold the full label tuple - the category codes of Call_Purpose,
+    Booking_Success, Sentiment and Call_Quality, the Emotions mask and the
+    Keyword_Flags bitset - under the classifier rule version, so an edit of
+    the rules never returns stale labels.
+    """
+
+    def __init__(self, path=None, max_entries=LABEL_MEMO_SIZE):
+        self.path = path
+        self.max_entries = max_entries
+        self._entries = OrderedDict()   # transcript hash -> label tuple, for self._version
+        self._version = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._db = None
+        self._db_pid = None
+        if path:
+            with self._connection() as db:
+                db.execute(
+                    "CREATE TABLE IF NOT EXISTS labels ("
+                    "rules_version TEXT, transcript_hash INTEGER, "
+                    + ", ".join(f"{col} INTEGER" for col in DERIVED_COLUMNS)
+                    + ", PRIMARY KEY (rules_version, transcript_hash)) WITHOUT ROWID"
+                )
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.disk_hits + self.misses
+        return (self.hits + self.disk_hits) / lookups if lookups else None
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _connection(self):
+        """The SQLite connection of this process, opened again after a fork.
+
+        A connection must not be used across fork(): pool workers forked
+        from a process holding the memo get one of their own.
+        """
+        if self._db_pid != os.getpid():
+            self._db = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            self._db_pid = os.getpid()
+        return self._db
+
+    def stored(self):
+        """Entries in the SQLite file, every rule version (0 without one)"""
+        if not self.path:
+            return 0
+        with self._lock:
+            return self._connection().execute("SELECT COUNT(*) FROM labels").fetchone()[0]
+
+    def get_many(self, version, hashes):
+        """transcript hash -> label tuple, for the hashes memoized under this rule version"""
+        found = {}
+        with self._lock:
+            if version != self._version:
+                self._entries.clear()
+                self._version = version
+            remaining = []
+            for key in map(int, hashes):
+                row = self._entries.get(key)
+                if row is None:
+                    remaining.append(key)
+                else:
+                    self._entries.move_to_end(key)
+                    found[key] = row
+            self.hits += len(found)
+
+            if self.path and remaining:
+                db = self._connection()
+                for start in range(0, len(remaining), 500):
+                    batch = remaining[start:start + 500]
+                    rows = db.execute(
+                        "SELECT * FROM labels "
+                        f"WHERE rules_version = ? AND transcript_hash IN ({','.join('?' * len(batch))})",
+                        [version, *map(_to_sqlite, batch)]
+                    )
+                    for row in rows:
+                        key = _from_sqlite(row[1])
+                        found[key] = tuple(row[2:])
+                        self._remember(key, found[key])
+                        self.disk_hits += 1
+            self.misses += len(hashes) - len(found)
+        return found
+
+    def put_many(self, version, labels):
+        """Memoize a transcript hash -> label tuple mapping under a rule version"""
+        with self._lock:
+            if version == self._version:
+                for key, row in labels.items():
+                    self._remember(key, row)
+            if self.path:
+                with self._connection() as db:
+                    db.executemany(
+                        f"INSERT OR REPLACE INTO labels VALUES ({','.join('?' * (2 + len(DERIVED_COLUMNS)))})",
+                        [(version, _to_sqlite(key), *map(int, row)) for key, row in labels.items()]
+                    )
+
+    def _remember(self, key, row):
+        self._entries[key] = row
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+def _to_sqlite(key):
+    # SQLite integers are signed 64-bit
+    return key - (1 << 64) if key >= 1 << 63 else key
+
+def _from_sqlite(value):
+    return value + (1 << 64) if value < 0 else value
+
+_label_memo = None
+
+def label_memo():
+    """The process-wide LabelMemo, or None when VOICESTACK_LABEL_MEMO_SIZE is 0"""
+    global _label_memo
+    if _label_memo is None and LABEL_MEMO_SIZE > 0:
+        _label_memo = LabelMemo(LABEL_MEMO_PATH, LABEL_MEMO_SIZE)
+    return _label_memo
+
+def _label_codes(labels):
+    """Distinct-transcript x DERIVED_COLUMNS int64 matrix of category codes and bitsets"""
+    return np.column_stack([
+        labels[col].cat.codes.values if col in LABEL_DTYPES else labels[col].values
+        for col in DERIVED_COLUMNS
+    ]).astype(np.int64)
+
+def classify_memoized(transcripts, memo, workers=None):
+    """classify_transcripts_parallel(), looking each normalized transcript up in memo first.
+
+    Only transcripts the memo has no labels for are classified, once per
+    normalized text, and their labels are added to it. The result is
+    identical to classifying every transcript.
+    """
+    transcripts = pd.Series(transcripts)
+    codes, uniques = pd.factorize(transcripts)
+    # Same missing-transcript slot as classify_transcripts
+    values = np.append(np.asarray(uniques, dtype=object), "")
+    codes = np.where(codes < 0, len(uniques), codes)
+
+    # Only text is memoized; other values (numbers read from the CSV) are just classified
+    is_text = np.fromiter((isinstance(value, str) for value in values), dtype=bool, count=len(values))
+    texts = np.flatnonzero(is_text)
+    hashes = transcript_hashes(values[texts])
+    version = classifier_version()
+    found = memo.get_many(version, np.unique(hashes))
+
+    label_codes = np.zeros((len(values), len(DERIVED_COLUMNS)), dtype=np.int64)
+    known = np.zeros(len(values), dtype=bool)
+    for position, key in zip(texts, hashes.tolist()):
+        row = found.get(key)
+        if row is not None:
+            label_codes[position] = row
+            known[position] = True
+
+    # Classify one transcript per unseen normalized text, plus the non-text values
+    unseen = texts[~known[texts]]
+    unseen_hashes, first, inverse = np.unique(hashes[~known[texts]], return_index=True, return_inverse=True)
+    todo = np.concatenate([unseen[first], np.flatnonzero(~is_text)])
+    if len(todo):
+        labels = classify_transcripts_parallel(pd.Series(values[todo], dtype=object), workers=workers)
+        new_codes = _label_codes(labels)
+        label_codes[unseen] = new_codes[:len(first)][inverse]
+        label_codes[np.flatnonzero(~is_text)] = new_codes[len(first):]
+        memo.put_many(version, {int(key): tuple(row) for key, row in zip(unseen_hashes, new_codes[:len(first)].tolist())})
+
+    result = {}
+    for i, col in enumerate(DERIVED_COLUMNS):
+        column = label_codes[codes, i]
+        if col in LABEL_DTYPES:
+            result[col] = pd.Categorical.from_codes(column, dtype=LABEL_DTYPES[col])
+        else:
+            result[col] = column.astype(BITSET_DTYPES[col])
+    return pd.DataFrame(result, index=transcripts.index)
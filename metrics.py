@@ -0,0 +1,384 @@
+import copy
+import functools
+
+import numpy as np
+import pandas as pd
+
+from classifier import (
+    EMOTION_BITS,
+    KEYWORD_FLAGS_COLUMN,
+    encode_emotions,
+    has_keyword,
+    keyword_flags,
+)
+from dedup import row_keys
+from practices import comparison_metrics, practice_sums
+from prompts import LLM_COLUMNS
+from schema import resolve_schema
+from trends import hourly_sums, merge_sums, resample_sums, trend_metrics
+
+SAMPLE_ROWS = 8
+SAMPLE_COLUMNS = ['transcript', 'Call_Purpose', 'Sentiment', 'Emotions', 'Call_Quality', 'Booking_Success']
+
+# Keyword counts over every call: name -> tracked phrases (any of them counts)
+KEYWORD_COUNTS = {
+    'reschedule': ['reschedule'],
+    'emergency_or_cant_make': ['emergency', 'cant_make'],
+    'cancel_reason': ['reschedule', 'emergency', 'cant_make'],
+    'emergency': ['emergency'],
+    'first_time': ['first_time'],
+    'follow_up': ['follow_up'],
+    'remind': ['remind'],
+}
+
+# Keyword counts over no-show followup calls only
+NOSHOW_KEYWORD_COUNTS = {
+    'first': ['first'],
+    'follow': ['follow'],
+    'remind': ['remind'],
+}
+
+# Cube dimension -> derived label column (the raw-data dimensions come from the schema)
+LABEL_FIELDS = {
+    'purpose': 'Call_Purpose',
+    'booking_success': 'Booking_Success',
+    'sentiment': 'Sentiment',
+    'quality': 'Call_Quality',
+}
+RAW_FIELDS = ['direction', 'status', 'contact']
+
+def _add_counts(current, new):
+    """Sum two count Series/DataFrames, aligning on their labels"""
+    if current is None:
+        return new.copy()
+    return current.add(new, fill_value=0).fillna(0).astype('int64')
+
+def _memoized(query):
+    """Cache a CallSummary query's result per arguments until the next update()"""
+    @functools.wraps(query)
+    def wrapper(self, *args, **kwargs):
+        # setdefault: summaries pickled by an older version have no memo yet
+        memo = self.__dict__.setdefault('_memo', {})
+        key = (query.__name__, args, tuple(sorted(kwargs.items())))
+        if key not in memo:
+            memo[key] = query(self, *args, **kwargs)
+        return memo[key]
+    return wrapper
+
+class CallSummary:
+    """Mergeable aggregates behind every dashboard section.
+
+    The core is an aggregate cube: call counts grouped by purpose, booking
+    success, sentiment, quality, direction, status, contact type and call
+    date, built with one groupby per chunk. Every count, rate and pie chart
+    is a small groupby over the cube instead of a scan of the raw calls, and
+    query results are memoized (treat them as read-only). Durations, ring-time value counts, emotions and transcript keyword hits
+    are kept alongside it. When the export has a call id column, rows
+    repeating a call id already counted are left out and tallied in
+    duplicate_calls, so exported-twice calls do not inflate the volumes.
+
+    Build one from a whole frame with from_frame(), or feed it chunk after
+    chunk with update() - the result is the same either way, so the dashboard
+    can render a multi-gigabyte export without ever holding it in memory.
+    """
+
+    def __init__(self, columns):
+        self.columns = list(columns)
+        self.schema = resolve_schema(self.columns)
+        self.total_calls = 0
+        self.duplicate_calls = 0  # rows repeating a call id already counted
+        self.row_keys = []        # sorted uint64 arrays of the call ids counted, largest first
+        self.cube = None          # dimension columns + 'calls'
+        self.counts = {}          # field -> value counts outside the cube
+        self.emotions = None      # purpose x emotion counts
+        self.keywords = dict.fromkeys(KEYWORD_COUNTS, 0)
+        self.noshow_keywords = dict.fromkeys(NOSHOW_KEYWORD_COUNTS, 0)
+        self.durations = {}       # column -> {'sum', 'count', 'min', 'max'}
+        self.trend = None         # hourly sums behind the trend charts (see trends.py)
+        self.practices = None     # per-practice sums behind the comparison view (see practices.py)
+        self.purpose_order = []   # purposes in order of first appearance
+        self.sample = None
+        self._memo = {}
+
+    @classmethod
+    def from_frame(cls, data):
+        summary = cls(data.columns)
+        summary.update(data)
+        return summary
+
+    @classmethod
+    def from_chunks(cls, chunks):
+        summary = None
+        for chunk in chunks:
+            if summary is None:
+                summary = cls(chunk.columns)
+            summary.update(chunk)
+        return summary
+
+    def copy(self):
+        """A copy that update() can change while readers keep this one.
+
+        Costs the size of the small per-field aggregates, not of the calls
+        counted: frames and key batches are replaced by update(), never
+        modified, so they are shared.
+        """
+        summary = copy.copy(self)
+        summary.row_keys = list(self.row_keys)
+        summary.counts = dict(self.counts)
+        summary.keywords = dict(self.keywords)
+        summary.noshow_keywords = dict(self.noshow_keywords)
+        summary.durations = {col: dict(stats) for col, stats in self.durations.items()}
+        summary.purpose_order = list(self.purpose_order)
+        summary._memo = {}
+        return summary
+
+    def has(self, column):
+        return column in self.columns
+
+    # -----------------------------------------------------------------
+    # Aggregation
+    # -----------------------------------------------------------------
+
+    def update(self, data):
+        """Fold one chunk of classified calls into the running aggregates"""
+        self._memo = {}
+        data = self._drop_duplicates(data)
+        self.total_calls += len(data)
+        self._update_cube(data)
+        self.trend = merge_sums(self.trend, hourly_sums(data, self.schema))
+        self.practices = merge_sums(self.practices, practice_sums(data, self.schema))
+
+        for col in self.schema['durations']:
+            self._update_duration(col, data[col])
+        if self.schema['ring'] is not None:
+            self._count('ring_values', data[self.schema['ring']])
+
+        if 'Call_Purpose' in data.columns:
+            self._update_labels(data)
+        for col in LLM_COLUMNS:
+            if col in data.columns:
+                self._count(col, data[col])
+
+        sample_cols = [col for col in SAMPLE_COLUMNS if col in data.columns]
+        if sample_cols and (self.sample is None or len(self.sample) < SAMPLE_ROWS):
+            head = data[sample_cols].head(SAMPLE_ROWS)
+            self.sample = head if self.sample is None else pd.concat([self.sample, head]).head(SAMPLE_ROWS)
+
+    def _drop_duplicates(self, data):
+        """The chunk without rows that repeat a call id seen before, in this chunk or an earlier one.
+
+        Without a call id nothing is dropped: the columns the dashboard reads
+        (no caller numbers, minute timestamps) do not tell distinct calls apart.
+        """
+        if self.schema['call_id'] is None or self.schema['call_id'] not in data.columns:
+            return data
+        keys = row_keys(data).values
+        repeated = pd.Index(keys).duplicated()
+        for batch in self.row_keys:
+            positions = np.minimum(np.searchsorted(batch, keys), len(batch) - 1)
+            repeated |= batch[positions] == keys
+        self._add_row_keys(np.unique(keys[~repeated]))
+        if not repeated.any():
+            return data
+        self.duplicate_calls += int(repeated.sum())
+        return data[~repeated]
+
+    def _add_row_keys(self, keys):
+        """Append a batch of new keys, merged with the batches less than twice its size.
+
+        Each batch is over twice the size of the next, so a lookup searches a
+        logarithmic number of arrays and a chunk never re-sorts every key; existing
+        arrays are never modified, so copies made with copy() stay intact.
+        """
+        batches = list(self.row_keys)
+        while batches and len(batches[-1]) < 2 * len(keys):
+            keys = np.union1d(batches.pop(), keys)
+        self.row_keys = batches + [keys] if len(keys) else batches
+
+    def _cube_dimensions(self, data):
+        """Dimension name -> Series for every cube dimension present in the chunk"""
+        dims = {}
+        for field, col in LABEL_FIELDS.items():
+            if col in data.columns:
+                dims[field] = data[col]
+        for field in RAW_FIELDS:
+            col = self.schema[field]
+            if col is not None:
+                dims[field] = data[col]
+        date_col = self.schema['date']
+        if date_col is not None and pd.api.types.is_datetime64_any_dtype(data[date_col]):
+            dims['date'] = data[date_col].dt.normalize()
+        return dims
+
+    def _update_cube(self, data):
+        dims = self._cube_dimensions(data)
+        if not dims:
+            return
+        chunk_cube = (
+            pd.DataFrame(dims)
+            .groupby(list(dims), dropna=False, sort=False, observed=True)
+            .size()
+            .rename('calls')
+            .reset_index()
+        )
+        # The cube is small - plain object columns keep queries to observed values
+        categorical = [col for col in dims if isinstance(chunk_cube[col].dtype, pd.CategoricalDtype)]
+        chunk_cube[categorical] = chunk_cube[categorical].astype(object)
+        if self.cube is not None:
+            chunk_cube = (
+                pd.concat([self.cube, chunk_cube], ignore_index=True)
+                .groupby(list(dims), dropna=False, sort=False)['calls']
+                .sum()
+                .reset_index()
+            )
+        self.cube = chunk_cube
+
+    def _count(self, name, values):
+        self.counts[name] = _add_counts(self.counts.get(name), values.value_counts())
+
+    def _update_duration(self, col, values):
+        values = values.dropna()
+        stats = self.durations.setdefault(col, {'sum': 0, 'count': 0, 'min': None, 'max': None})
+        if values.empty:
+            return
+        # Durations load as float32; accumulate in float64 so long exports stay exact
+        stats['sum'] += float(values.astype('float64').sum())
+        stats['count'] += len(values)
+        stats['min'] = values.min() if stats['min'] is None else min(stats['min'], values.min())
+        stats['max'] = values.max() if stats['max'] is None else max(stats['max'], values.max())
+
+    def _update_labels(self, data):
+        purposes = data['Call_Purpose']
+        for purpose in purposes.unique():
+            if purpose not in self.purpose_order:
+                self.purpose_order.append(purpose)
+
+        if 'Emotions' in data.columns:
+            self._update_emotions(data, purposes)
+
+        if 'transcript' in data.columns:
+            if KEYWORD_FLAGS_COLUMN in data.columns:
+                flags = data[KEYWORD_FLAGS_COLUMN].values
+            else:
+                flags = keyword_flags(data['transcript'])
+            for name, phrases in KEYWORD_COUNTS.items():
+                self.keywords[name] += int(has_keyword(flags, *phrases).sum())
+            noshow_flags = flags[(purposes == 'No-Show Followup').values]
+            for name, phrases in NOSHOW_KEYWORD_COUNTS.items():
+                self.noshow_keywords[name] += int(has_keyword(noshow_flags, *phrases).sum())
+
+    def _update_emotions(self, data, purposes):
+        """Purpose x emotion counts from the emotion mask bits in one groupby"""
+        masks = data['Emotions']
+        masks = encode_emotions(masks) if masks.dtype == object else masks.values
+        flags = pd.DataFrame(
+            {emotion: (masks & bit) != 0 for emotion, bit in EMOTION_BITS.items()},
+            index=data.index
+        )
+        self.emotions = _add_counts(self.emotions, flags.groupby(purposes.astype(object)).sum())
+
+    # -----------------------------------------------------------------
+    # Queries used by the dashboard
+    # -----------------------------------------------------------------
+
+    def _slice(self, filters):
+        """Cube rows matching field=value filters"""
+        cube = self.cube
+        for field, value in filters.items():
+            cube = cube[cube[field] == value]
+        return cube
+
+    def has_field(self, field):
+        return self.cube is not None and field in self.cube.columns
+
+    @_memoized
+    def value_counts(self, field, **filters):
+        """Call counts per value of a field, most frequent first (empty if never seen)"""
+        if field in self.counts:
+            counts = self.counts[field]
+        elif field == 'emotions':
+            counts = self.emotions.sum() if self.emotions is not None else None
+        elif self.has_field(field) and all(self.has_field(f) for f in filters):
+            counts = self._slice(filters).groupby(field)['calls'].sum()
+        else:
+            counts = None
+        if counts is None:
+            return pd.Series(dtype='int64')
+        return counts[counts > 0].sort_index().sort_values(ascending=False, kind='stable')
+
+    @_memoized
+    def count(self, field, value, **filters):
+        """Number of calls with field == value (and any extra filters)"""
+        if not self.has_field(field) or not all(self.has_field(f) for f in filters):
+            return 0
+        return int(self._slice(dict(filters, **{field: value}))['calls'].sum())
+
+    @_memoized
+    def crosstab(self, row_field, col_field):
+        """row_field x col_field call counts, like groupby(...).value_counts().unstack()"""
+        if not self.has_field(row_field) or not self.has_field(col_field):
+            return pd.DataFrame(dtype='int64')
+        return (
+            self.cube.groupby([row_field, col_field])['calls'].sum()
+            .unstack(fill_value=0)
+        )
+
+    def mean(self, col):
+        stats = self.durations.get(col)
+        if not stats or stats['count'] == 0:
+            return float('nan')
+        return stats['sum'] / stats['count']
+
+    def max(self, col):
+        stats = self.durations.get(col)
+        return float('nan') if not stats or stats['max'] is None else stats['max']
+
+    def min(self, col):
+        stats = self.durations.get(col)
+        return float('nan') if not stats or stats['min'] is None else stats['min']
+
+    @_memoized
+    def trends(self, freq='Day', window=1):
+        """Trend metrics per hour, day or week (empty without a parsed date column)"""
+        if self.trend is None:
+            return pd.DataFrame()
+        return trend_metrics(resample_sums(self.trend, freq), window)
+
+    @_memoized
+    def practice_metrics(self):
+        """Comparison metrics per practice id (one '' row without a practice column)"""
+        if self.practices is None:
+            return pd.DataFrame()
+        return comparison_metrics(self.practices)
+
+    @_memoized
+    def ring_bucket_counts(self, fast=15, slow=30):
+        """Calls answered within fast seconds, between fast and slow, and after slow"""
+        values = self.counts.get('ring_values')
+        if values is None:
+            return 0, 0, 0
+        index = pd.to_numeric(values.index.to_series(), errors='coerce').values
+        return (
+            int(values[index <= fast].sum()),
+            int(values[(index > fast) & (index <= slow)].sum()),
+            int(values[index > slow].sum()),
+        )
+
+    @_memoized
+    def emotions_by_purpose(self):
+        """Most common emotion and total emotion count per purpose, in first-seen purpose order"""
+        table = self.emotions if self.emotions is not None else pd.DataFrame()
+        rows = []
+        for purpose in self.purpose_order:
+            if purpose not in table.index:
+                continue
+            counts = table.loc[purpose]
+            counts = counts[counts > 0].sort_index()
+            if counts.sum() == 0:
+                continue
+            rows.append({
+                'Purpose': purpose,
+                'Most_Common_Emotion': counts.idxmax(),
+                'Emotion_Count': int(counts.sum())
+            })
+        return rows
@@ -0,0 +1,49 @@
+import pandas as pd
+
+from trends import call_sums, merge_sums, sum_metrics
+
+# Practice id for calls with an empty practice column
+UNKNOWN_PRACTICE = 'Unknown'
+
+def practice_sums(data, schema, default=''):
+    """call_sums per practice for one chunk of classified calls.
+
+    One grouped pass over the chunk; the tables merge across chunks and files
+    by addition (trends.merge_sums). Without a practice column every call
+    counts towards a single row keyed default.
+    """
+    sums = call_sums(data, schema)
+    practice_col = schema['practice']
+    if practice_col is None:
+        return sums.groupby(pd.Series(default, index=data.index)).sum()
+    keys = data[practice_col]
+    if isinstance(keys.dtype, pd.CategoricalDtype) and UNKNOWN_PRACTICE not in keys.cat.categories:
+        keys = keys.cat.add_categories([UNKNOWN_PRACTICE])
+    table = sums.groupby(keys.fillna(UNKNOWN_PRACTICE), observed=True).sum()
+    # Plain string ids, so chunks with different category sets still align
+    table.index = table.index.astype(str)
+    return table.sort_index()
+
+def comparison_metrics(sums):
+    """TREND_METRICS per practice: call volume, conversion, cancellation, no-show, sentiment, ring time"""
+    metrics = sum_metrics(sums)
+    metrics.index.name = 'practice'
+    return metrics
+
+def compare_practices(summaries):
+    """Side-by-side metrics for several practices' CallSummaries (name -> summary).
+
+    Exports with a practice column contribute one row per practice id; the
+    rest contribute one row under their name.
+    """
+    combined = None
+    for name, summary in summaries.items():
+        if summary is None or summary.practices is None or summary.practices.empty:
+            continue
+        table = summary.practices
+        if summary.schema['practice'] is None:
+            table = table.set_axis([name])
+        combined = merge_sums(combined, table)
+    if combined is None:
+        return pd.DataFrame()
+    return comparison_metrics(combined)
@@ -0,0 +1,168 @@
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+
+import pandas as pd
+
+# VOICESTACK_PROFILE=1 turns profiling on by default; VOICESTACK_PROFILE_EXPORT
+# names a file rewritten after every profiled run (.prom: Prometheus text, else JSON)
+PROFILE_DEFAULT = os.environ.get('VOICESTACK_PROFILE', '0') not in ('', '0')
+PROFILE_EXPORT_PATH = os.environ.get('VOICESTACK_PROFILE_EXPORT') or None
+
+# Each Streamlit session runs its script in its own thread
+_state = threading.local()
+
+# tracemalloc is process-wide: profiles tracing memory share it, and it
+# stops with the last of them (unless something else had started it)
+_tracing = {'users': 0, 'started': False}
+_tracing_lock = threading.Lock()
+
+class Profile:
+    """Stage timings of one dashboard run: wall time, rows and (optionally) peak traced memory.
+
+    Stages nest; a stage's peak memory covers the stages inside it. Entering
+    the same stage name several times (one per chunk) records each entry,
+    and table() adds them up. The traced peak is process-wide, so while
+    several sessions trace memory at once their peaks include each other.
+    """
+
+    def __init__(self, trace_memory=False):
+        self.trace_memory = trace_memory
+        self.started = time.time()
+        self.records = []
+        self._stack = []   # (record, peak bytes of the stages closed inside it)
+        self._tracing = False  # holds one of the tracemalloc users until stop()
+
+    @contextmanager
+    def stage(self, name, rows=None):
+        record = {'stage': name, 'depth': len(self._stack), 'seconds': 0.0, 'rows': rows, 'peak_bytes': None}
+        self.records.append(record)
+        if self.trace_memory:
+            if self._stack:
+                # The enclosing stage's peak so far, before it is reset for this one
+                parent = self._stack[-1]
+                parent[1] = max(parent[1], tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+        self._stack.append([record, 0])
+        started = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record['seconds'] = time.perf_counter() - started
+            _, inner_peak = self._stack.pop()
+            if self.trace_memory:
+                record['peak_bytes'] = max(inner_peak, tracemalloc.get_traced_memory()[1])
+                if self._stack:
+                    self._stack[-1][1] = max(self._stack[-1][1], record['peak_bytes'])
+
+    def table(self):
+        """One row per stage name in first-run order: entries, total seconds, rows, peak MB"""
+        if not self.records:
+            return pd.DataFrame(columns=['Stage', 'Runs', 'Seconds', 'Rows', 'Peak MB'])
+        records = pd.DataFrame(self.records)
+        records['stage'] = ['  ' * depth + name for name, depth in zip(records['stage'], records['depth'])]
+        grouped = records.groupby('stage', sort=False)
+        table = pd.DataFrame({
+            'Runs': grouped.size(),
+            'Seconds': grouped['seconds'].sum(),
+            'Rows': grouped['rows'].sum(min_count=1),
+            'Peak MB': grouped['peak_bytes'].max() / 1024 ** 2,
+        })
+        table.index.name = 'Stage'
+        return table.reset_index()
+
+    def to_json(self):
+        return json.dumps({'started': self.started, 'stages': self.records}, indent=2)
+
+    def to_prometheus(self):
+        """Stage totals in the Prometheus text exposition format"""
+        table = self.table()
+        names = table['Stage'].str.strip()
+        metrics = [
+            ('voicestack_stage_seconds', 'Wall time of a dashboard stage in the last profiled run', table['Seconds']),
+            ('voicestack_stage_rows', 'Rows handled by a dashboard stage in the last profiled run', table['Rows']),
+            ('voicestack_stage_peak_bytes', 'Peak traced memory of a dashboard stage in the last profiled run',
+             table['Peak MB'] * 1024 ** 2),
+        ]
+        lines = []
+        for metric, help_text, values in metrics:
+            if values.isna().all():
+                continue
+            lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} gauge"]
+            for name, value in zip(names, values):
+                if pd.notna(value):
+                    lines.append(f'{metric}{{stage="{_label_value(name)}"}} {float(value):g}')
+        return "\n".join(lines) + "\n"
+
+    def export(self, path):
+        """Write the profile to path (Prometheus text for .prom, JSON otherwise), replacing it atomically"""
+        text = self.to_prometheus() if path.endswith('.prom') else self.to_json()
+        temp = f"{path}.tmp"
+        with open(temp, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(temp, path)
+
+def _label_value(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def start(trace_memory=False):
+    """Begin profiling the current thread's run; returns its Profile"""
+    stop()
+    profile = Profile(trace_memory=trace_memory)
+    if trace_memory:
+        with _tracing_lock:
+            if _tracing['users'] == 0 and not tracemalloc.is_tracing():
+                tracemalloc.start()
+                _tracing['started'] = True
+            _tracing['users'] += 1
+            profile._tracing = True
+    _state.profile = profile
+    return profile
+
+def stop(profile=None):
+    """End a profile - by default the current thread's - and stop memory tracing once no profile uses it.
+
+    Safe to call more than once, and from another thread: a run that raised
+    or was interrupted can be ended by the next one.
+    """
+    current = getattr(_state, 'profile', None)
+    profile = current if profile is None else profile
+    if profile is not None and profile is current:
+        _state.profile = None
+    if profile is not None:
+        with _tracing_lock:
+            if profile._tracing:
+                profile._tracing = False
+                _tracing['users'] -= 1
+                if _tracing['users'] == 0 and _tracing['started']:
+                    tracemalloc.stop()
+                    _tracing['started'] = False
+    return profile
+
+def stage(name, rows=None):
+    """Context manager timing a stage of the current profile; a no-op when not profiling.
+
+    Yields the stage record, so rows can be filled in once known.
+    """
+    profile = getattr(_state, 'profile', None)
+    # A fresh record each time: callers fill in rows even when not profiling
+    return nullcontext({}) if profile is None else profile.stage(name, rows)
+
+def profiled(name, rows=len):
+    """Decorator recording each call as a stage; rows(result) gives the row count"""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            profile = getattr(_state, 'profile', None)
+            if profile is None:
+                return func(*args, **kwargs)
+            with profile.stage(name) as record:
+                result = func(*args, **kwargs)
+                record['rows'] = rows(result) if rows is not None else None
+            return result
+        return wrapper
+    return decorate
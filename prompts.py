@@ -0,0 +1,206 @@
+# =================================================================
+# AI PROMPTS FOR CALL CLASSIFICATION
+# =================================================================
+# Each prompt takes one call transcript via {transcript} and asks for a
+# single category name back. The dashboard displays them; llm.py runs them.
+
+purpose_prompt = """
+ANALYZE THIS DENTAL PRACTICE PHONE CALL TRANSCRIPT AND CLASSIFY ITS PRIMARY PURPOSE.
+
+CATEGORIES:
+- APPOINTMENT BOOKING: Patient wants to schedule new appointment, asks about availability, books cleaning/checkup
+- APPOINTMENT CANCELLATION: Patient cancels existing appointment, says they can't make it
+- APPOINTMENT RESCHEDULE: Patient wants to change appointment date/time, move to different slot
+- BILLING QUESTION: Questions about charges, payments, outstanding balances, payment plans
+- INSURANCE VERIFICATION: Asks about insurance coverage, benefits, what's covered, claims
+- CLINICAL QUESTION: Medical/dental health questions, symptoms, treatment options, pain concerns
+- EMERGENCY: Urgent dental issues, severe pain, broken tooth, immediate care needed
+- GENERAL INQUIRY: Office hours, location, services offered, doctor information, non-urgent questions
+- FOLLOW-UP: Checking on previous treatment, post-operative care, healing progress
+
+INSTRUCTIONS:
+1. Read the entire transcript carefully
+2. Identify the MAIN reason for the call
+3. Choose ONLY ONE primary category
+4. Return ONLY the category name in uppercase
+5. If uncertain, choose the most likely category based on key phrases
+
+TRANSCRIPT TO ANALYZE:
+{transcript}
+
+RETURN ONLY THE CATEGORY NAME:
+"""
+
+booking_success_prompt = """
+DETERMINE IF THIS APPOINTMENT BOOKING CALL RESULTED IN A SUCCESSFUL SCHEDULING.
+
+ANALYZE THE CALL TRANSCRIPT FOR:
+- SUCCESS INDICATORS: "scheduled", "confirmed", "see you then", "thank you", "perfect", "great"
+- FAILURE INDICATORS: "call back", "think about it", "check schedule", "maybe", "not sure"
+- UNCLEAR: Inconclusive outcome, need to verify, ambiguous response
+
+CATEGORIES:
+- SUCCESSFUL: Appointment was clearly scheduled and confirmed
+- FAILED: Patient declined, postponed, or didn't commit
+- UNCLEAR: Outcome cannot be determined from transcript
+
+INSTRUCTIONS:
+1. Focus on the call conclusion and final agreement
+2. Look for explicit confirmation or decline language
+3. Consider the overall tone and commitment level
+4. Return ONLY one word: SUCCESSFUL, FAILED, or UNCLEAR
+
+TRANSCRIPT:
+{transcript}
+
+RESULT:
+"""
+
+sentiment_prompt = """
+ANALYZE THE PATIENT'S EMOTIONAL TONE AND SATISFACTION LEVEL IN THIS DENTAL CALL.
+
+EMOTIONAL INDICATORS TO CONSIDER:
+
+POSITIVE INDICATORS:
+- Gratitude: "thank you", "appreciate", "helpful"
+- Satisfaction: "great", "good", "perfect", "happy"
+- Relief: "better", "helped", "improved"
+- Enthusiasm: "excellent", "wonderful", "awesome"
+
+NEGATIVE INDICATORS:
+- Frustration: "angry", "frustrated", "annoyed"
+- Disappointment: "not happy", "disappointed", "upset"
+- Anxiety: "worried", "nervous", "scared", "concerned"
+- Complaints: "problem", "issue", "complaint", "bad"
+
+NEUTRAL INDICATORS:
+- Factual questions without emotional language
+- Routine inquiries about information
+- Balanced or mixed emotional expressions
+
+CATEGORIES:
+- POSITIVE: Predominantly satisfied, grateful, or happy tone
+- NEGATIVE: Clearly frustrated, angry, or dissatisfied
+- NEUTRAL: Factual, balanced, or minimal emotional expression
+
+INSTRUCTIONS:
+1. Analyze the patient's language and emotional cues
+2. Consider the overall tone, not just individual words
+3. Return ONLY one word: POSITIVE, NEGATIVE, or NEUTRAL
+
+TRANSCRIPT:
+{transcript}
+
+SENTIMENT:
+"""
+
+emergency_prompt = """
+DETECT IF THIS DENTAL CALL REQUIRES URGENT OR EMERGENCY ATTENTION.
+
+URGENCY INDICATORS:
+- Severe pain descriptors: "extreme pain", "can't sleep", "unbearable"
+- Trauma indicators: "broken tooth", "knocked out", "accident", "injury"
+- Infection signs: "swelling", "fever", "pus", "infection"
+- Time sensitivity: "need to see someone today", "emergency", "as soon as possible"
+
+ROUTINE INDICATORS:
+- Preventive care: "cleaning", "checkup", "routine exam"
+- Non-urgent issues: "small cavity", "next available", "when convenient"
+- General questions: "information", "prices", "insurance"
+
+CATEGORIES:
+- EMERGENCY: Requires immediate same-day attention
+- URGENT: Should be seen within 24-48 hours  
+- ROUTINE: Can wait for next available appointment
+
+INSTRUCTIONS:
+1. Identify pain level and symptom severity
+2. Look for time-sensitive language
+3. Assess potential health risks
+4. Return ONLY one category: EMERGENCY, URGENT, or ROUTINE
+
+TRANSCRIPT:
+{transcript}
+
+URGENCY LEVEL:
+"""
+
+insurance_prompt = """
+CLASSIFY THE SPECIFIC TYPE OF FINancial OR INSURANCE INQUIRY IN THIS DENTAL CALL.
+
+SUBCATEGORIES:
+
+INSURANCE-RELATED:
+- COVERAGE VERIFICATION: "Does my insurance cover this?", "What's covered?"
+- BENEFITS CHECK: "What are my benefits?", "Annual maximum", "Deductible"
+- CLAIMS STATUS: "Claim status", "When will I get paid?", "Processing time"
+- NETWORK QUESTIONS: "Are you in-network?", "Preferred provider"
+
+BILLING-RELATED:
+- PAYMENT PLANS: "Payment options", "Installments", "Financing"
+- OUTSTANDING BALANCE: "Outstanding bill", "Past due", "Collection"
+- COST ESTIMATES: "How much will this cost?", "Price", "Fee"
+- STATEMENT QUESTIONS: "Explanation of benefits", "Bill clarification"
+
+CATEGORIES:
+- INSURANCE_COVERAGE
+- INSURANCE_CLAIMS  
+- INSURANCE_NETWORK
+- BILLING_PAYMENT
+- BILLING_COST
+- BILLING_STATEMENT
+
+INSTRUCTIONS:
+1. Identify the specific financial concern
+2. Differentiate between insurance vs direct billing questions
+3. Choose the most precise subcategory
+4. Return ONLY the category name in uppercase
+
+TRANSCRIPT:
+{transcript}
+
+FINANCIAL_CATEGORY:
+"""
+
+patient_type_prompt = """
+DETERMINE IF THE CALLER IS A NEW PATIENT OR EXISTING PATIENT.
+
+NEW PATIENT INDICATORS:
+- First-time mentions: "first time", "new patient", "never been there"
+- Practice discovery: "found you online", "recommended by", "looking for dentist"
+- Introductory questions: "tell me about your practice", "what services"
+- No history: No references to previous visits or treatments
+
+EXISTING PATIENT INDICATORS:
+- Previous treatment references: "last time I was here", "my previous cleaning"
+- Familiarity with staff: "Dr. Smith", "the hygienist", "receptionist"
+- Continuity of care: "follow-up", "continued treatment", "next appointment"
+- Personal history: References to their dental history with the practice
+
+CATEGORIES:
+- NEW_PATIENT: First-time caller seeking to establish care
+- EXISTING_PATIENT: Current patient of the practice
+- UNCLEAR: Cannot determine patient status from transcript
+
+INSTRUCTIONS:
+1. Look for explicit statements about patient history
+2. Notice familiarity with practice and staff
+3. Consider context of the inquiry
+4. Return ONLY: NEW_PATIENT, EXISTING_PATIENT, or UNCLEAR
+
+TRANSCRIPT:
+{transcript}
+
+PATIENT_TYPE:
+"""
+
+# Output column -> prompt, for LLM classification mode
+CLASSIFICATION_PROMPTS = {
+    'LLM_Purpose': purpose_prompt,
+    'LLM_Booking_Success': booking_success_prompt,
+    'LLM_Sentiment': sentiment_prompt,
+    'LLM_Urgency': emergency_prompt,
+    'LLM_Financial_Category': insurance_prompt,
+    'LLM_Patient_Type': patient_type_prompt,
+}
+LLM_COLUMNS = list(CLASSIFICATION_PROMPTS)
@@ -0,0 +1,198 @@
+"""Headless dashboard metrics: python report.py <csv dir> --out <report dir>
+
+Computes the numbers every dashboard section shows from a CallSummary, so
+the Streamlit page and nightly batch reports share one computation layer.
+Each CSV in the directory is one practice; files are processed in parallel
+and streamed chunk by chunk, and every practice gets a JSON or Parquet
+metrics file plus one combined table for all practices.
+"""
+import argparse
+import functools
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from loader import CHUNK_ROWS, classify_calls, iter_call_chunks
+from metrics import CallSummary
+
+# =================================================================
+# METRICS
+# =================================================================
+
+def _rate(part, whole):
+    return part / whole * 100 if whole else 0
+
+def dashboard_metrics(summary):
+    """Every headline number on the dashboard, by name.
+
+    Fields whose source columns are missing from the export are None.
+    """
+    schema = summary.schema
+    total_calls = summary.total_calls
+    has_purpose = summary.has('Call_Purpose')
+    has_booking = has_purpose and summary.has('Booking_Success')
+    has_sentiment = summary.has('Sentiment')
+    has_quality = summary.has('Call_Quality')
+    ring_col = schema['ring']
+
+    def when(available, value):
+        return value if available else None
+
+    booking_calls = summary.count('purpose', 'Appointment Booking')
+    successful_bookings = summary.count('booking_success', 'Successful', purpose='Appointment Booking')
+    cancellation_calls = summary.count('purpose', 'Cancellation')
+    noshow_calls = summary.count('purpose', 'No-Show Followup')
+    positive_calls = summary.count('sentiment', 'Positive')
+    negative_calls = summary.count('sentiment', 'Negative')
+
+    # Average of the per-day rates; the overall rate when calls are undated
+    daily_rates = summary.trends('Day').get('Cancellation Rate (%)', pd.Series(dtype=float)).dropna()
+    daily_cancellation_rate = daily_rates.mean() if len(daily_rates) > 0 else _rate(cancellation_calls, total_calls)
+
+    return {
+        # Call volumes
+        'total_calls': total_calls,
+        'duplicate_calls': summary.duplicate_calls,
+        'inbound_calls': when(schema['direction'], summary.count('direction', 'Inbound')),
+        'answered_calls': when(schema['status'], summary.count('status', 'Answered')),
+        'missed_calls': when(schema['status'], summary.count('status', 'Missed')),
+        'new_patient_calls': when(schema['contact'], summary.count('contact', 'New Patient')),
+        # Booking conversion
+        'booking_calls': when(has_purpose, booking_calls),
+        'successful_bookings': when(has_booking, successful_bookings),
+        'failed_bookings': when(has_booking, summary.count('booking_success', 'Failed', purpose='Appointment Booking')),
+        'conversion_rate': when(has_booking, _rate(successful_bookings, booking_calls)),
+        'booking_call_rate': when(has_purpose, _rate(booking_calls, total_calls)),
+        # Cancellations
+        'cancellation_calls': when(has_purpose, cancellation_calls),
+        'cancellation_rate': when(has_purpose, _rate(cancellation_calls, total_calls)),
+        'reschedule_requests': when(has_purpose, summary.keywords['reschedule']),
+        'emergency_cancellations': when(has_purpose, summary.keywords['emergency']),
+        'daily_cancellation_rate': when(has_purpose, daily_cancellation_rate),
+        # No-shows
+        'noshow_calls': when(has_purpose, noshow_calls),
+        'noshow_rate': when(has_purpose, _rate(noshow_calls, total_calls)),
+        'first_time_noshows': when(has_purpose, summary.keywords['first_time']),
+        'followup_calls': when(has_purpose, summary.keywords['follow_up']),
+        'reminder_calls': when(has_purpose, summary.keywords['remind']),
+        # Response times
+        'avg_ring_time': when(ring_col and 'ring' in ring_col.lower(), summary.mean(ring_col)),
+        'avg_call_time': when(schema['conversation'], summary.mean(schema['conversation'])),
+        'avg_total_time': when(schema['total'], summary.mean(schema['total'])),
+        'longest_call': when(ring_col, summary.max(ring_col)),
+        'shortest_call': when(ring_col, summary.min(ring_col)),
+        # Sentiment and quality
+        'positive_calls': when(has_sentiment, positive_calls),
+        'neutral_calls': when(has_sentiment, summary.count('sentiment', 'Neutral')),
+        'negative_calls': when(has_sentiment, negative_calls),
+        'positive_rate': when(has_sentiment, _rate(positive_calls, total_calls)),
+        'net_sentiment_score': when(has_sentiment, _rate(positive_calls - negative_calls, total_calls)),
+        'excellent_quality_calls': when(has_quality, summary.count('quality', 'Excellent')),
+        'poor_quality_calls': when(has_quality, summary.count('quality', 'Poor')),
+    }
+
+def dashboard_breakdowns(summary):
+    """The distributions behind the dashboard charts: name -> {value: calls}"""
+    fields = ['direction', 'status', 'contact', 'purpose', 'sentiment', 'quality', 'emotions']
+    breakdowns = {field: summary.value_counts(field) for field in fields}
+    breakdowns['booking_success'] = summary.value_counts('booking_success', purpose='Appointment Booking')
+    return {
+        name: {str(value): int(calls) for value, calls in counts.items()}
+        for name, counts in breakdowns.items() if len(counts) > 0
+    }
+
+# For code already running in a pool worker: classify serially instead of nesting pools
+_classify_serially = functools.partial(classify_calls, workers=0)
+
+def practice_report(path, chunksize=CHUNK_ROWS, classify=classify_calls):
+    """Metrics, chart breakdowns and daily trends for one practice's export"""
+    chunks = iter_call_chunks(path, chunksize=chunksize, classify=classify)
+    summary = CallSummary.from_chunks(chunks)
+    if summary is None:
+        summary = CallSummary([])
+    daily = summary.trends('Day')
+    if len(daily) > 0:
+        daily.index = daily.index.strftime('%Y-%m-%d')
+    return {
+        'practice': os.path.splitext(os.path.basename(path))[0],
+        'metrics': dashboard_metrics(summary),
+        'breakdowns': dashboard_breakdowns(summary),
+        'daily_trends': json.loads(daily.to_json(orient='index')),
+    }
+
+def _summarize(source):
+    chunks = iter_call_chunks(source, classify=_classify_serially)
+    return CallSummary.from_chunks(chunks)
+
+def summarize_exports(sources, workers=None):
+    """CallSummary per export (name -> CSV bytes or path), one process per export.
+
+    workers defaults to every core. Exports without any rows map to None.
+    """
+    workers = min(workers or os.cpu_count() or 1, len(sources))
+    if workers <= 1:
+        return {name: CallSummary.from_chunks(iter_call_chunks(source)) for name, source in sources.items()}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return dict(zip(sources, pool.map(_summarize, sources.values())))
+
+# =================================================================
+# COMMAND LINE
+# =================================================================
+
+def write_report(report, out_dir, fmt):
+    """One file per practice: the full report as JSON, or the flat metrics row as Parquet"""
+    path = os.path.join(out_dir, f"{report['practice']}.{fmt}")
+    if fmt == 'json':
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, default=float)
+    else:
+        pd.DataFrame([dict(practice=report['practice'], **report['metrics'])]).to_parquet(path, index=False)
+    return path
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compute dashboard metrics for every practice export in a directory")
+    parser.add_argument('csv_dir', help="directory of call exports, one CSV per practice")
+    parser.add_argument('--out', required=True, help="directory for the metrics files")
+    parser.add_argument('--format', choices=['json', 'parquet'], default='json')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args(argv)
+
+    paths = sorted(
+        os.path.join(args.csv_dir, name) for name in os.listdir(args.csv_dir)
+        if name.lower().endswith('.csv')
+    )
+    if not paths:
+        parser.error(f"no CSV files in {args.csv_dir}")
+    os.makedirs(args.out, exist_ok=True)
+
+    start = time.perf_counter()
+    rows = []
+    failed = 0
+    with ProcessPoolExecutor(max_workers=min(args.workers, len(paths))) as pool:
+        futures = {pool.submit(practice_report, path, classify=_classify_serially): path for path in paths}
+        for future in as_completed(futures):
+            try:
+                report = future.result()
+            except Exception as error:
+                # One bad export should not sink the whole nightly run
+                failed += 1
+                print(f"FAILED {futures[future]}: {error}", file=sys.stderr)
+                continue
+            print(write_report(report, args.out, args.format))
+            rows.append(dict(practice=report['practice'], **report['metrics']))
+
+    if rows:
+        combined = pd.DataFrame(rows).sort_values('practice')
+        if args.format == 'json':
+            combined.to_json(os.path.join(args.out, 'all_practices.json'), orient='records', indent=2)
+        else:
+            combined.to_parquet(os.path.join(args.out, 'all_practices.parquet'), index=False)
+    print(f"{len(rows)} practices in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
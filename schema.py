@@ -0,0 +1,131 @@
+import hashlib
+import json
+import os
+import re
+from functools import lru_cache
+
+from classifier import DERIVED_COLUMNS
+from prompts import LLM_COLUMNS
+
+# Single-column logical fields, found by a keyword in the column name
+FIELD_KEYWORDS = {
+    'transcript': 'transcript',
+    'direction': 'direction',
+    'status': 'status',
+    'contact': 'contact',
+    'practice': 'practice',
+    'call_id': 'call id',
+}
+# Duration fields, picked among the duration columns
+DURATION_KEYWORDS = {
+    'ring': 'ring',
+    'conversation': 'conversation',
+    'total': 'total',
+}
+LIST_FIELDS = ['timestamps', 'durations']
+
+# Word boundaries inside CamelCase names: callId, CallID, CALLIdNumber
+CAMEL_BOUNDARY = re.compile(r'(?<=[a-z0-9])(?=[A-Z])|(?<=[A-Z])(?=[A-Z][a-z])')
+
+# Read dtypes: low-cardinality fields as categoricals, durations as float32
+# (missing values stay NaN), transcripts as pandas strings
+CATEGORY_FIELDS = ['direction', 'status', 'contact', 'practice']
+DURATION_DTYPE = 'float32'
+TRANSCRIPT_DTYPE = 'string'
+
+def load_user_mapping():
+    """Logical field -> column overrides from VOICESTACK_SCHEMA (inline JSON or a JSON file path)"""
+    value = os.environ.get('VOICESTACK_SCHEMA', '').strip()
+    if not value:
+        return {}
+    if not value.startswith('{'):
+        with open(value, encoding='utf-8') as f:
+            value = f.read()
+    return json.loads(value)
+
+USER_MAPPING = load_user_mapping()
+
+def column_words(name):
+    """Column name as lower-case words for keyword matching: CallId, call_id and Call ID all give 'call id'"""
+    spaced = CAMEL_BOUNDARY.sub(' ', str(name))
+    return ' '.join(re.split(r'[\W_]+', spaced.lower())).strip()
+
+def schema_fingerprint(mapping=None):
+    """Short hash of the column mapping in effect, for cache keys"""
+    mapping = USER_MAPPING if mapping is None else mapping
+    return hashlib.sha256(json.dumps(mapping, sort_keys=True).encode('utf-8')).hexdigest()[:8]
+
+def resolve_schema(columns, mapping=None):
+    """Map logical fields to the physical columns of an export.
+
+    Returns a dict with transcript, direction, status, contact, practice,
+    call_id, date, ring, conversation and total (a column name or None) plus timestamps and
+    durations (lists). Columns are matched by keywords in their names;
+    mapping (default: VOICESTACK_SCHEMA) overrides any field, and mapped
+    columns missing from the export are ignored. Resolved once per column
+    layout - treat the result as read-only.
+    """
+    mapping = USER_MAPPING if mapping is None else mapping
+    return _resolve(tuple(columns), json.dumps(mapping, sort_keys=True))
+
+@lru_cache(maxsize=64)
+def _resolve(columns, mapping_json):
+    mapping = json.loads(mapping_json)
+    # Label columns added by classification are never raw fields ('Sentiment' contains 'time')
+    columns = [col for col in columns if col not in DERIVED_COLUMNS and col not in LLM_COLUMNS]
+    lowered = {col: column_words(col) for col in columns}
+
+    def matching(word):
+        return [col for col in columns if word in lowered[col]]
+
+    def mapped(field):
+        value = mapping.get(field)
+        if field in LIST_FIELDS:
+            return [col for col in ([value] if isinstance(value, str) else value or []) if col in lowered]
+        return value if value in lowered else None
+
+    schema = {}
+    for field, keyword in FIELD_KEYWORDS.items():
+        schema[field] = mapped(field) or (matching(keyword) or [None])[0]
+
+    durations = mapped('durations') or matching('duration')
+    timestamps = mapped('timestamps') or [
+        col for col in columns
+        if ('time' in lowered[col] or 'date' in lowered[col]) and col not in durations
+    ]
+
+    for field, keyword in DURATION_KEYWORDS.items():
+        found = [col for col in durations if keyword in lowered[col]]
+        schema[field] = mapped(field) or (found or [None])[0]
+    # Ring time falls back to the first duration column, as the dashboard always did
+    schema['ring'] = schema['ring'] or (durations or [None])[0]
+
+    schema['date'] = mapped('date') or (timestamps or [None])[0]
+    if schema['date'] is not None and schema['date'] not in timestamps:
+        timestamps = [schema['date']] + timestamps
+    for field in DURATION_KEYWORDS:
+        if schema[field] is not None and schema[field] not in durations:
+            durations = durations + [schema[field]]
+    schema['timestamps'] = timestamps
+    schema['durations'] = durations
+    return schema
+
+def schema_columns(schema):
+    """Physical columns behind the schema's fields, without duplicates"""
+    names = [schema[field] for field in FIELD_KEYWORDS]
+    names += schema['timestamps'] + schema['durations']
+    return list(dict.fromkeys(name for name in names if name is not None))
+
+def read_options(columns, mapping=None):
+    """(usecols, dtype) for pd.read_csv: only the columns the dashboard reads.
+
+    usecols is None when no field resolves, so an unrecognized export is read
+    whole instead of coming back empty.
+    """
+    schema = resolve_schema(columns, mapping)
+    usecols = schema_columns(schema)
+    dtypes = {schema[field]: 'category' for field in CATEGORY_FIELDS if schema[field] is not None}
+    dtypes.update(dict.fromkeys(schema['durations'], DURATION_DTYPE))
+    if schema['transcript'] is not None:
+        dtypes[schema['transcript']] = TRANSCRIPT_DTYPE
+    return (usecols or None), dtypes
@@ -0,0 +1,149 @@
+import re
+from itertools import chain
+
+import numpy as np
+import pandas as pd
+
+# Words are runs of letters and digits, with inner apostrophes kept ("can't")
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:'[a-z0-9]+)*")
+QUERY_PATTERN = re.compile(r'"[^"]*"|\(|\)|[^\s()"]+')
+
+def tokenize(text):
+    """Lowercased word tokens of a text, curly apostrophes normalized"""
+    return TOKEN_PATTERN.findall(str(text).lower().replace('’', "'"))
+
+def _contains_sequence(tokens, phrase):
+    n = len(phrase)
+    return any(tokens[i:i + n] == phrase for i in range(len(tokens) - n + 1))
+
+class TranscriptIndex:
+    """Inverted index over the distinct transcripts of a dataset.
+
+    Maps every token and every pair of adjacent tokens (bigram) to the
+    sorted ids of the distinct transcripts containing it, so word and phrase
+    lookups respect word boundaries ('ok' does not match 'book') and cost a
+    few array operations instead of a scan. Postings are stored as one CSR
+    array pair; rows() maps transcript ids back to call rows.
+    """
+
+    def __init__(self, transcripts):
+        transcripts = pd.Series(transcripts)
+        self.codes, uniques = pd.factorize(transcripts)   # row -> transcript id, -1 when missing
+        self.documents = np.asarray(uniques, dtype=object)
+        texts = [str(text) for text in self.documents]
+        self.word_counts = np.fromiter(map(len, map(str.split, texts)), dtype=np.int64, count=len(texts))
+
+        # Every token of every transcript in one array, then ids for tokens and adjacent pairs
+        token_lists = [tokenize(text) for text in texts]
+        lengths = np.fromiter(map(len, token_lists), dtype=np.int64, count=len(token_lists))
+        token_docs = np.repeat(np.arange(len(texts), dtype=np.int64), lengths)
+        token_ids, words = pd.factorize(pd.Series(list(chain.from_iterable(token_lists)), dtype=object))
+        in_doc = token_docs[1:] == token_docs[:-1]
+        pair_ids, pairs = pd.factorize(token_ids[:-1][in_doc].astype(np.int64) * len(words) + token_ids[1:][in_doc])
+        self.words = {word: i for i, word in enumerate(words)}
+        self.pairs = {pair: i for i, pair in enumerate(pairs.tolist())}
+
+        # Bigram keys follow the token keys; postings are (key, transcript) pairs sorted and deduplicated
+        keys = np.concatenate([token_ids, len(words) + pair_ids]).astype(np.int64)
+        docs = np.concatenate([token_docs, token_docs[1:][in_doc]])
+        stride = max(len(texts), 1)
+        entries = np.unique(keys * stride + docs)
+        keys = entries // stride
+        self.postings = (entries % stride).astype(np.int32)
+        self.offsets = np.concatenate([[0], np.cumsum(np.bincount(keys, minlength=len(words) + len(pairs)))])
+
+    def lookup(self, gram):
+        """Sorted ids of the transcripts containing a token or a bigram ('first second')"""
+        first, _, second = gram.partition(' ')
+        key = self.words.get(first)
+        if key is not None and second:
+            other = self.words.get(second)
+            pair = None if other is None else self.pairs.get(key * len(self.words) + other)
+            key = None if pair is None else len(self.words) + pair
+        if key is None:
+            return np.zeros(0, dtype=np.int32)
+        return self.postings[self.offsets[key]:self.offsets[key + 1]]
+
+    def phrase(self, text):
+        """Ids of the transcripts containing the words of text, adjacent and in order"""
+        words = tokenize(text)
+        if not words:
+            return np.zeros(0, dtype=np.int32)
+        if len(words) == 1:
+            return self.lookup(words[0])
+        candidates = self.lookup(f"{words[0]} {words[1]}")
+        for a, b in zip(words[1:], words[2:]):
+            candidates = np.intersect1d(candidates, self.lookup(f"{a} {b}"), assume_unique=True)
+        if len(words) > 2:
+            # Overlapping bigrams can come from different places; confirm on the few candidates
+            candidates = candidates[[_contains_sequence(tokenize(self.documents[doc]), words) for doc in candidates]]
+        return candidates
+
+    def search(self, query):
+        """Ids of the transcripts matching a boolean query.
+
+        Words and "quoted phrases" combine with AND (also implied between
+        terms), OR and NOT, grouped with parentheses:
+        reschedule AND (insurance OR "copay") NOT "call back".
+        """
+        tokens = QUERY_PATTERN.findall(query)
+        position = 0
+
+        def peek():
+            return tokens[position] if position < len(tokens) else None
+
+        def take():
+            nonlocal position
+            position += 1
+            return tokens[position - 1]
+
+        def either():
+            result = both()
+            while peek() == 'OR':
+                take()
+                result = np.union1d(result, both())
+            return result
+
+        def both():
+            result = negation()
+            while peek() is not None and peek() not in ('OR', ')'):
+                if peek() == 'AND':
+                    take()
+                result = np.intersect1d(result, negation(), assume_unique=True)
+            return result
+
+        def negation():
+            if peek() == 'NOT':
+                take()
+                return np.setdiff1d(np.arange(len(self.documents), dtype=np.int32), negation(), assume_unique=True)
+            if peek() == '(':
+                take()
+                result = either()
+                if peek() != ')':
+                    raise ValueError(f"Unclosed '(' in search query {query!r}")
+                take()
+                return result
+            if peek() is None:
+                raise ValueError(f"Incomplete search query: {query!r}")
+            if peek() in ('AND', 'OR', ')'):
+                # An operator or ')' where a term should be: nothing to combine
+                raise ValueError(f"Unexpected {peek()!r} in search query {query!r}")
+            return self.phrase(take().strip('"'))
+
+        if not tokens:
+            return np.zeros(0, dtype=np.int32)
+        result = either()
+        if peek() is not None:
+            raise ValueError(f"Unexpected {peek()!r} in search query {query!r}")
+        return result
+
+    def rows(self, documents):
+        """Positions of the call rows whose transcript is one of the given ids (calls without one never match)"""
+        return np.flatnonzero(np.isin(self.codes, documents))
+
+    def term_hits(self, terms):
+        """Transcript x term boolean matrix: which transcripts contain each term as whole words"""
+        hits = np.zeros((len(self.documents), len(terms)), dtype=bool)
+        for i, term in enumerate(terms):
+            hits[self.phrase(term), i] = True
+        return hits
@@ -0,0 +1,175 @@
+import hashlib
+import os
+import uuid
+from datetime import date
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from classifier import DERIVED_COLUMNS, as_label_dtypes
+from loader import classify_calls
+from schema import resolve_schema
+
+ROW_HASH_COLUMN = 'Row_Hash'
+PARTITION_PREFIX = 'call_date='
+UNKNOWN_PARTITION = 'unknown'
+
+def row_hashes(data):
+    """Stable 64-bit content hash of each call row, ignoring derived label columns"""
+    raw_cols = [col for col in data.columns if col not in DERIVED_COLUMNS and col != ROW_HASH_COLUMN]
+    return pd.util.hash_pandas_object(data[raw_cols], index=False).values
+
+def call_date_column(data):
+    """The first parsed timestamp column, used to partition the store"""
+    for col in resolve_schema(data.columns)['timestamps']:
+        if pd.api.types.is_datetime64_any_dtype(data[col]):
+            return col
+    return None
+
+class CallStore:
+    """Local Parquet dataset of classified calls, partitioned by call date.
+
+    Layout: <root>/call_date=YYYY-MM-DD/part-<uuid>.parquet, one file per
+    partition per append. Rows are identified by a hash of their raw columns,
+    so re-uploading an export only classifies and writes the calls the store
+    has not seen yet. The file listing and each file's column names are kept
+    between calls and only re-read when a store directory's mtime changes.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        # (directory mtimes, partitions, files) as of the last listing
+        self._listing = None
+        # Column names per file; parts are written once and never modified
+        self._schemas = {}
+
+    def partitions(self):
+        """Partition names currently in the store, sorted"""
+        return list(self._snapshot()[1])
+
+    def date_range(self):
+        """(first, last) call date in the store, or None if it holds no dated calls"""
+        dates = [date.fromisoformat(p) for p in self.partitions() if p != UNKNOWN_PARTITION]
+        return (min(dates), max(dates)) if dates else None
+
+    def version(self):
+        """Short hash of the stored file list; changes whenever calls are appended"""
+        files = '\n'.join(self._snapshot()[2])
+        return hashlib.sha256(files.encode('utf-8')).hexdigest()[:16]
+
+    def classify_and_append(self, data):
+        """Classify a freshly parsed upload, reusing labels for rows already stored.
+
+        Only rows missing from the store are run through the classifiers and
+        appended. Returns the upload with every label column filled in.
+        """
+        data = data.copy()
+        data[ROW_HASH_COLUMN] = row_hashes(data)
+        keys = self._partition_keys(data)
+
+        known = self._read(
+            [ROW_HASH_COLUMN] + DERIVED_COLUMNS,
+            partitions=set(keys.unique())
+        ).drop_duplicates(ROW_HASH_COLUMN).set_index(ROW_HASH_COLUMN)
+
+        is_new = ~data[ROW_HASH_COLUMN].isin(known.index)
+        new_rows = classify_calls(data[is_new].copy())
+        old_rows = data[~is_new].join(known, on=ROW_HASH_COLUMN)
+        data = pd.concat([old_rows, new_rows]).reindex(data.index)[new_rows.columns]
+
+        self._write(new_rows, keys[is_new])
+        return data.drop(columns=ROW_HASH_COLUMN)
+
+    def load(self, start=None, end=None, columns=None):
+        """Load calls dated between start and end (inclusive), reading only the given columns.
+
+        Undated calls are only included when no date bound is given.
+        """
+        wanted = []
+        for partition in self.partitions():
+            if partition == UNKNOWN_PARTITION:
+                if start is None and end is None:
+                    wanted.append(partition)
+                continue
+            day = date.fromisoformat(partition)
+            if (start is None or day >= start) and (end is None or day <= end):
+                wanted.append(partition)
+
+        data = self._read(columns, partitions=wanted)
+        return data.drop(columns=ROW_HASH_COLUMN, errors='ignore')
+
+    def columns(self):
+        """Every column name present in any stored file"""
+        names = {}
+        for path in self._snapshot()[2]:
+            names.update(dict.fromkeys(self._schemas[path]))
+        return [name for name in names if name != ROW_HASH_COLUMN]
+
+    def _partition_keys(self, data):
+        date_col = call_date_column(data)
+        if date_col is None:
+            return pd.Series(UNKNOWN_PARTITION, index=data.index)
+        return data[date_col].dt.strftime('%Y-%m-%d').fillna(UNKNOWN_PARTITION)
+
+    def _snapshot(self):
+        """(stamp, partitions, files) of the store, listed again only when a directory changed.
+
+        New partitions change the root's mtime and appended parts change their
+        partition folder's, so one stat per directory detects every write.
+        """
+        listing = self._listing
+        root_mtime = os.stat(self.root).st_mtime_ns
+        if listing is not None and listing[0][0] == root_mtime:
+            partitions = listing[1]
+        else:
+            partitions = sorted(
+                name[len(PARTITION_PREFIX):] for name in os.listdir(self.root)
+                if name.startswith(PARTITION_PREFIX)
+            )
+        stamp = (root_mtime,) + tuple(self._folder_mtime(partition) for partition in partitions)
+        if listing is None or listing[0] != stamp:
+            files = list(self._files(partitions))
+            self._schemas = {path: self._schemas.get(path) or pq.read_schema(path).names for path in files}
+            listing = self._listing = (stamp, partitions, files)
+        return listing
+
+    def _folder_mtime(self, partition):
+        try:
+            return os.stat(os.path.join(self.root, PARTITION_PREFIX + partition)).st_mtime_ns
+        except OSError:
+            return None
+
+    def _files(self, partitions):
+        for partition in partitions:
+            folder = os.path.join(self.root, PARTITION_PREFIX + partition)
+            if not os.path.isdir(folder):
+                continue
+            for name in sorted(os.listdir(folder)):
+                if name.endswith('.parquet'):
+                    yield os.path.join(folder, name)
+
+    def _read(self, columns, partitions):
+        frames = []
+        folders = {os.path.join(self.root, PARTITION_PREFIX + partition) for partition in partitions}
+        for path in self._snapshot()[2]:
+            if os.path.dirname(path) not in folders:
+                continue
+            file_columns = self._schemas[path]
+            if columns is not None:
+                file_columns = [col for col in columns if col in file_columns]
+            frames.append(pq.read_table(path, columns=file_columns).to_pandas())
+        data = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=columns or [])
+        return as_label_dtypes(data)
+
+    def _write(self, data, keys):
+        for partition, rows in data.groupby(keys, sort=True):
+            folder = os.path.join(self.root, PARTITION_PREFIX + partition)
+            os.makedirs(folder, exist_ok=True)
+            table = pa.Table.from_pandas(rows, preserve_index=False)
+            path = os.path.join(folder, f"part-{uuid.uuid4().hex}.parquet")
+            pq.write_table(table, path + '.tmp')
+            os.replace(path + '.tmp', path)
+        # Coarse filesystem clocks can leave the mtimes unchanged within a second
+        self._listing = None
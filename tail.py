@@ -0,0 +1,116 @@
+import os
+import threading
+import time
+
+from loader import CHUNK_ROWS, classify_calls, iter_call_chunks
+from metrics import CallSummary
+
+def complete_rows_length(block):
+    """Bytes of block up to its last row terminator that is not inside a quoted field.
+
+    block must start at a row boundary; a half-written last row is left for
+    the next read. Returns 0 when block holds no complete row.
+    """
+    quotes = block.count(b'"')
+    end = len(block)
+    while True:
+        newline = block.rfind(b'\n', 0, end)
+        if newline < 0:
+            return 0
+        # Quotes before this newline pair up unless it sits inside a quoted field
+        quotes -= block.count(b'"', newline, end)
+        if quotes % 2 == 0:
+            return newline + 1
+        end = newline
+
+class CallTail:
+    """Follows a call log CSV, or every CSV in a drop directory, keeping a running CallSummary.
+
+    Each poll() reads only the bytes appended to each file since the last
+    poll, up to the last complete row, then classifies those calls and folds
+    them into the aggregates - its cost grows with the new calls, not with
+    the log. A last row without a line break is ingested once the file has
+    not grown for a whole poll, so finished files lose no calls. A file that
+    shrinks is taken to be rotated and is read again from the start. Safe to share between sessions: polls are serialized and
+    fold new calls into a CallSummary.copy(), so the summary readers hold is
+    never modified and a poll does not copy the calls already counted.
+    """
+
+    def __init__(self, path, classify=classify_calls, chunksize=CHUNK_ROWS):
+        self.path = path
+        self.chunksize = chunksize
+        self._classify = classify
+        self.summary = None
+        self.offsets = {}         # file -> bytes ingested
+        self.headers = {}         # file -> header row
+        self.sizes = {}           # file -> size at the last poll
+        self.last_new_calls = 0
+        self.last_poll = None
+        self._lock = threading.Lock()
+
+    def files(self):
+        """The CSV files being followed, in name order"""
+        if os.path.isdir(self.path):
+            return sorted(
+                os.path.join(self.path, name) for name in os.listdir(self.path)
+                if name.lower().endswith('.csv')
+            )
+        return [self.path] if os.path.isfile(self.path) else []
+
+    def poll(self):
+        """Ingest the calls written since the last poll; returns how many there were"""
+        with self._lock:
+            summary = self.summary
+            offsets = {}
+            headers = {}
+            sizes = {}
+            new_calls = 0
+            for path in self.files():
+                block, header, offset, sizes[path] = self._read_new(path)
+                offsets[path] = offset
+                headers[path] = header
+                if not block:
+                    continue
+                if summary is self.summary and summary is not None:
+                    summary = summary.copy()
+                for chunk in iter_call_chunks(header + block, chunksize=self.chunksize, classify=self._classify):
+                    if summary is None:
+                        summary = CallSummary(chunk.columns)
+                    summary.update(chunk)
+                    new_calls += len(chunk)
+
+            # Offsets only move once their calls are in the summary
+            self.summary = summary
+            self.offsets.update(offsets)
+            self.headers.update(headers)
+            self.sizes.update(sizes)
+            self.last_new_calls = new_calls
+            self.last_poll = time.time()
+            return new_calls
+
+    def _read_new(self, path):
+        """(complete new rows, header row, offset after them, file size) for one file"""
+        size = os.path.getsize(path)
+        offset = self.offsets.get(path, 0)
+        header = self.headers.get(path, b'')
+        # Unchanged since the last poll: the writer is done with the bytes there
+        settled = size == self.sizes.get(path)
+        if size < offset:
+            offset, header, settled = 0, b'', False
+        if size == offset:
+            return b'', header, offset, size
+
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            block = f.read(size - offset)
+        if offset == 0:
+            header_length = complete_rows_length(block[:block.find(b'\n') + 1])
+            if header_length == 0:
+                return b'', b'', 0, size
+            header, block = block[:header_length], block[header_length:]
+            offset = header_length
+        length = complete_rows_length(block)
+        if settled and length < len(block) and block.count(b'"', length) % 2 == 0 and block[length:].strip():
+            # A finished last row with no line break after it
+            length = len(block)
+        return block[:length], header, offset + length, size
@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+
+from cache import DataFrameCache, value_nbytes
+from metrics import CallSummary
+from search import TranscriptIndex
+
+def test_disk_tier_round_trips_dataframes(tmp_path):
+    cache = DataFrameCache(cache_dir=str(tmp_path))
+    frame = pd.DataFrame({'a': [1, 2, 3]})
+    cache.put('frame', frame)
+
+    reopened = DataFrameCache(cache_dir=str(tmp_path))
+    pd.testing.assert_frame_equal(reopened.get('frame'), frame)
+    assert reopened.disk_hits == 1
+
+def test_disk_tier_stores_non_dataframe_values(tmp_path):
+    cache = DataFrameCache(cache_dir=str(tmp_path))
+    summary = CallSummary.from_frame(pd.DataFrame({'transcript': ['hi', 'bye'], 'Call Direction': ['Inbound', 'Outbound']}))
+    clusters = np.array([0, 0, 1])
+    cache.put('summary', summary)
+    cache.put('clusters', clusters)
+    cache.put('index', TranscriptIndex(['reschedule my appointment', 'billing question']))
+
+    reopened = DataFrameCache(cache_dir=str(tmp_path))
+    assert reopened.get('summary').total_calls == 2
+    np.testing.assert_array_equal(reopened.get('clusters'), clusters)
+    assert len(reopened.get('index').search('reschedule')) == 1
+    assert reopened.disk_hits == 3
+
+def test_values_are_sized_without_pickling(monkeypatch):
+    import pickle
+
+    def no_pickling(*args, **kwargs):
+        raise AssertionError("sized by pickling")
+    monkeypatch.setattr(pickle, 'dumps', no_pickling)
+
+    texts = [f"call {n} about billing" for n in range(5000)]
+    index = TranscriptIndex(texts)
+    assert value_nbytes(index) > index.postings.nbytes + sum(map(len, texts))
+    summary = CallSummary.from_frame(pd.DataFrame({'transcript': texts, 'Call Direction': 'Inbound'}))
+    assert value_nbytes(summary) > 0
+    assert value_nbytes(np.zeros(100)) == 800
@@ -0,0 +1,44 @@
+import threading
+
+import pandas as pd
+
+from calllog import CallLog
+from conftest import SAMPLE_CSV
+from loader import parse_date_columns
+from report import dashboard_metrics
+
+def upload(log, data):
+    labeled = log.classify(data)
+    return log.summarize(lambda: [labeled.iloc[:150], labeled.iloc[150:]])
+
+def test_appended_copies_of_earlier_rows_are_counted_like_a_rebuild():
+    calls = parse_date_columns(pd.read_csv(SAMPLE_CSV).head(300))
+    grown = pd.concat([calls, calls.iloc[[5, 5]]], ignore_index=True)
+
+    log = CallLog()
+    assert upload(log, calls).total_calls == 300
+    tally = {}
+    log.classify(grown, tally)
+    assert tally == {'classified': 0, 'reused': 302}
+    incremental = upload(log, grown)
+
+    rebuilt = upload(CallLog(), grown)
+    assert incremental.total_calls == rebuilt.total_calls == 302
+    assert dashboard_metrics(incremental) == dashboard_metrics(rebuilt)
+
+def test_a_rewritten_log_is_rebuilt():
+    calls = parse_date_columns(pd.read_csv(SAMPLE_CSV).head(300))
+    log = CallLog()
+    upload(log, calls)
+    assert upload(log, calls.iloc[100:]).total_calls == 200
+
+def test_sessions_share_a_log_one_at_a_time():
+    calls = parse_date_columns(pd.read_csv(SAMPLE_CSV).head(200))
+    log = CallLog()
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(upload(log, calls).total_calls)) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == [200] * 4
@@ -0,0 +1,32 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from charts import downsample, lttb_indices
+
+def noisy(n, seed=0):
+    return np.random.default_rng(seed).normal(size=n).cumsum()
+
+@pytest.mark.parametrize('n,threshold', [(10, 3), (100, 7), (1000, 99), (1000, 999), (5000, 500)])
+def test_keeps_threshold_distinct_points_including_both_ends(n, threshold):
+    keep = lttb_indices(np.arange(n), noisy(n), threshold)
+    assert len(keep) == threshold
+    assert keep[0] == 0 and keep[-1] == n - 1
+    assert len(np.unique(keep)) == threshold
+    assert (np.diff(keep) > 0).all()
+
+@pytest.mark.parametrize('threshold', [50, 51, 2])
+def test_short_input_is_returned_whole(threshold):
+    np.testing.assert_array_equal(lttb_indices(np.arange(50), noisy(50), threshold), np.arange(50))
+
+def test_a_lone_spike_survives_on_datetime_x():
+    x = pd.date_range('2025-08-11', periods=2000, freq='min').values
+    y = np.zeros(2000)
+    y[1234] = 100.0
+    keep = lttb_indices(x, y, 40)
+    assert 1234 in keep
+
+def test_downsample_leaves_small_frames_alone():
+    frame = pd.DataFrame({'x': np.arange(30), 'y': noisy(30)})
+    assert downsample(frame, 'x', 'y', threshold=30) is frame
+    assert len(downsample(pd.DataFrame({'x': np.arange(300), 'y': noisy(300)}), 'x', 'y', threshold=30)) == 30
@@ -0,0 +1,99 @@
+import json
+import os
+import subprocess
+import sys
+
+import pandas as pd
+import pytest
+
+import classifier
+from classifier import (
+    BITSET_MAX_BITS,
+    classify_transcript,
+    classify_transcripts,
+    compile_rules,
+    decode_emotion_column,
+)
+from conftest import SAMPLE_CSV
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def load_spec():
+    with open(os.path.join(ROOT, 'rules.json'), encoding='utf-8') as f:
+        return json.load(f)
+
+def test_nine_emotions_fit_the_emotions_column(tmp_path):
+    spec = load_spec()
+    for n in range(4):
+        spec['emotions'][f'extra{n}'] = [f'extra feeling {n}']
+    rules_path = tmp_path / 'rules.json'
+    rules_path.write_text(json.dumps(spec), encoding='utf-8')
+    # The emotions fix the column's bits at import, so classify in a fresh interpreter
+    script = (
+        "from classifier import classify_transcripts, decode_emotion_column\n"
+        "labels = classify_transcripts(['extra feeling 3 and extra feeling 2'])\n"
+        "print(labels['Emotions'].dtype, decode_emotion_column(labels['Emotions'])[0])\n"
+    )
+    result = subprocess.run(
+        [sys.executable, '-c', script], cwd=ROOT, capture_output=True, text=True, check=True,
+        env={**os.environ, 'VOICESTACK_RULES': str(rules_path)},
+    )
+    assert result.stdout.split(None, 1) == ['uint16', "['extra2', 'extra3']\n"]
+
+def test_rule_files_with_more_emotions_than_bits_are_rejected():
+    spec = load_spec()
+    spec['emotions'] = {f'emotion{n}': [f'feeling {n}'] for n in range(BITSET_MAX_BITS + 1)}
+    with pytest.raises(ValueError, match='emotions'):
+        compile_rules(spec)
+
+def test_engine_matches_the_per_row_classifiers():
+    transcripts = pd.concat([
+        pd.read_csv(SAMPLE_CSV)['transcript'],
+        pd.Series([None, "", "I NEED TO RESCHEDULE, THANK YOU SO MUCH", "Billing Insurance Question"]),
+    ], ignore_index=True)
+    labels = classify_transcripts(transcripts)
+    labels['Emotions'] = decode_emotion_column(labels['Emotions'])
+    expected = pd.DataFrame(
+        [classify_transcript(text) for text in transcripts], columns=classifier.LABEL_COLUMNS
+    )
+    for col in classifier.LABEL_COLUMNS:
+        assert labels[col].astype(object).tolist() == expected[col].tolist(), col
+
+def test_per_row_classifiers_match_the_engine_in_whole_word_mode():
+    rules = compile_rules({**load_spec(), 'match': 'words'})
+    transcripts = pd.read_csv(SAMPLE_CSV)['transcript'].head(200)
+    labels = classify_transcripts(transcripts, rules=rules)
+    labels['Emotions'] = decode_emotion_column(labels['Emotions'])
+    expected = [classify_transcript(text, rules) for text in transcripts]
+    actual = list(labels[classifier.LABEL_COLUMNS].astype(object).itertuples(index=False, name=None))
+    assert actual == expected
+
+def test_classify_transcript_reads_the_rules_once(monkeypatch):
+    reads = []
+    monkeypatch.setattr(classifier, 'current_rules', lambda: reads.append(1) or classifier.RULES)
+    classify_transcript("I'd like to reschedule my cleaning, thank you")
+    assert len(reads) == 1
+
+def test_only_the_last_compiled_rules_are_kept():
+    spec = load_spec()
+    first = compile_rules(spec)
+    assert compile_rules(load_spec()) is first
+    for n in range(3):
+        compile_rules({**spec, 'max_emotions': n})
+    assert len(classifier._compiled_rules) == 1
+
+def test_parallel_classification_is_capped_at_the_core_count(monkeypatch):
+    monkeypatch.setattr(classifier.os, 'cpu_count', lambda: 1)
+    pools = dict(classifier._pools)
+    transcripts = pd.read_csv(SAMPLE_CSV)['transcript']
+    labels = classifier.classify_transcripts_parallel(transcripts, workers=4, min_rows=0)
+    assert classifier._pools == pools
+    pd.testing.assert_frame_equal(labels, classify_transcripts(transcripts))
+
+def test_process_pool_labels_match_the_serial_engine(monkeypatch):
+    # Capped at the core count: claim two cores so the pool runs even on a single-core host
+    monkeypatch.setattr(classifier.os, 'cpu_count', lambda: 2)
+    transcripts = pd.read_csv(SAMPLE_CSV)['transcript']
+    labels = classifier.classify_transcripts_parallel(transcripts, workers=2, min_rows=0)
+    assert 2 in classifier._pools
+    pd.testing.assert_frame_equal(labels, classify_transcripts(transcripts))
@@ -0,0 +1,25 @@
+import numpy as np
+import pandas as pd
+
+from conftest import SAMPLE_CSV
+from dedup import near_duplicate_clusters
+
+def test_near_duplicates_join_when_their_bucket_starts_with_another_text():
+    text = [f"word{n}" for n in range(200)]
+    # Twelve texts, each with a different quarter reworded, reach every bucket of the pair below first
+    others = [
+        " ".join(f"other{i}x{n}" if i * 16 <= n < i * 16 + 50 else word for n, word in enumerate(text))
+        for i in range(12)
+    ]
+    near = " ".join(text)
+    clusters = near_duplicate_clusters(others + [near, near.replace("word199", "edited"), None], bands=64)
+    assert clusters[12] == clusters[13]
+    assert clusters[12] not in clusters[:12]
+    assert clusters[14] == -1
+
+def test_identical_transcripts_share_a_cluster_on_sample():
+    transcripts = pd.read_csv(SAMPLE_CSV)['transcript']
+    clusters = near_duplicate_clusters(transcripts)
+    codes = pd.factorize(transcripts)[0]
+    for code in np.unique(codes[codes >= 0]):
+        assert len(np.unique(clusters[codes == code])) == 1
@@ -0,0 +1,28 @@
+import pandas as pd
+import pytest
+
+from llm import LLMClassifier, LLMClient
+
+class EchoClient(LLMClient):
+    model = 'echo'
+
+    def __init__(self):
+        self.prompts = 0
+
+    async def complete(self, prompts):
+        self.prompts += len(prompts)
+        return ["yes" for _ in prompts]
+
+def test_clients_must_implement_complete():
+    class Incomplete(LLMClient):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+def test_classifier_sends_each_distinct_transcript_once():
+    client = EchoClient()
+    classifier = LLMClassifier(client)
+    labels = classifier.classify(pd.Series(['hi', 'hi', 'bye']))
+    assert len(labels) == 3
+    assert client.prompts == 2 * len(classifier.prompts)
@@ -0,0 +1,29 @@
+import pandas as pd
+
+import loader
+from loader import parse_dates
+
+def test_one_bad_value_in_the_sample_keeps_the_format():
+    values = pd.Series(['03/01/2024 09:15 AM', 'not a date', None, '03/02/2024 01:30 PM'], name='Call Time')
+    parsed = parse_dates(values, source='bad-sample')
+    assert loader._date_formats[('bad-sample', 'Call Time')] == '%m/%d/%Y %I:%M %p'
+    assert parsed.tolist()[::3] == [pd.Timestamp('2024-03-01 09:15'), pd.Timestamp('2024-03-02 13:30')]
+    assert parsed.isna().tolist() == [False, True, True, False]
+
+def test_later_rows_in_another_format_are_inferred_without_redetection(monkeypatch):
+    first = pd.Series(['03/01/2024 09:15 AM', '03/02/2024 01:30 PM'], name='Call Time')
+    parse_dates(first, source='mixed')
+    def detect_again(values):
+        raise AssertionError("format detected again")
+    monkeypatch.setattr(loader, 'detect_date_format', detect_again)
+    later = pd.Series(['03/03/2024 10:00 AM', '2024-03-04 11:45:00'], name='Call Time')
+    for _ in range(2):
+        parsed = parse_dates(later, source='mixed')
+        assert parsed.tolist() == [pd.Timestamp('2024-03-03 10:00'), pd.Timestamp('2024-03-04 11:45')]
+    assert loader._date_formats[('mixed', 'Call Time')] == '%m/%d/%Y %I:%M %p'
+
+def test_a_chunk_without_dates_does_not_fix_the_format():
+    parse_dates(pd.Series([None, None], name='Call Time', dtype=object), source='empty-first')
+    parsed = parse_dates(pd.Series(['2024-03-04 11:45:00'], name='Call Time'), source='empty-first')
+    assert loader._date_formats[('empty-first', 'Call Time')] == '%Y-%m-%d %H:%M:%S'
+    assert parsed.tolist() == [pd.Timestamp('2024-03-04 11:45')]
@@ -0,0 +1,43 @@
+import multiprocessing
+import os
+
+import pandas as pd
+
+from classifier import classifier_version, classify_transcripts
+from memo import LabelMemo, classify_memoized
+
+TRANSCRIPTS = pd.Series(["I need to reschedule my cleaning", "Billing question", None, "billing QUESTION"])
+
+def test_labels_round_trip_through_the_sqlite_file(tmp_path):
+    path = str(tmp_path / 'labels.sqlite')
+    first = LabelMemo(path)
+    expected = classify_transcripts(TRANSCRIPTS)
+    pd.testing.assert_frame_equal(classify_memoized(TRANSCRIPTS, first), expected)
+    assert first.misses == 3   # case-folded, the billing transcripts are one; plus the missing one
+
+    reopened = LabelMemo(path)
+    pd.testing.assert_frame_equal(classify_memoized(TRANSCRIPTS, reopened), expected)
+    assert (reopened.disk_hits, reopened.misses) == (3, 0)
+    assert reopened.stored() == 3
+
+def test_labels_of_another_rule_version_are_not_reused(tmp_path):
+    memo = LabelMemo(str(tmp_path / 'labels.sqlite'))
+    memo.put_many('old-rules', {1: (0, 0, 0, 0, 0, 0)})
+    assert memo.get_many('old-rules', [1]) == {1: (0, 0, 0, 0, 0, 0)}
+    assert memo.get_many(classifier_version(), [1]) == {}
+    assert LabelMemo(memo.path).get_many('newer-rules', [1]) == {}
+
+def _write_in_child(memo, parent_db):
+    memo.put_many('child', {7: (1, 1, 1, 1, 1, 1)})
+    # The inherited connection was left alone
+    if memo._db is parent_db or memo._db_pid != os.getpid():
+        raise SystemExit(1)
+
+def test_forked_workers_open_their_own_connection(tmp_path):
+    memo = LabelMemo(str(tmp_path / 'labels.sqlite'))
+    memo.stored()
+    child = multiprocessing.get_context('fork').Process(target=_write_in_child, args=(memo, memo._db))
+    child.start()
+    child.join()
+    assert child.exitcode == 0
+    assert memo.get_many('child', [7]) == {7: (1, 1, 1, 1, 1, 1)}
@@ -0,0 +1,55 @@
+import pandas as pd
+
+from conftest import SAMPLE_CSV
+from loader import iter_call_chunks, load_call_data
+from metrics import CallSummary
+from report import dashboard_breakdowns, dashboard_metrics
+
+def test_rows_without_a_call_id_are_all_counted():
+    # Same minute, direction and transcript: without a call id these are still distinct calls
+    calls = pd.DataFrame({
+        'Call Time': ['2024-01-02 09:15'] * 3,
+        'Call Direction': ['Inbound'] * 3,
+        'transcript': ['hello'] * 3,
+    })
+    summary = CallSummary.from_frame(calls)
+    assert summary.total_calls == 3
+    assert summary.duplicate_calls == 0
+
+def test_rows_repeating_a_call_id_are_dropped_across_chunks():
+    calls = pd.DataFrame({
+        'Call ID': ['a', 'b', 'a', 'c'],
+        'Call Direction': ['Inbound', 'Outbound', 'Inbound', 'Inbound'],
+        'transcript': ['hi', 'bye', 'hi', 'ok'],
+    })
+    summary = CallSummary(calls.columns)
+    summary.update(calls.iloc[:3])
+    summary.update(calls.iloc[1:])
+    assert summary.total_calls == 3
+    assert summary.duplicate_calls == 3
+
+def test_update_of_a_copy_leaves_the_original_alone():
+    calls = pd.DataFrame({
+        'Call ID': [f"id{n}" for n in range(40)],
+        'Call Direction': ['Inbound', 'Outbound'] * 20,
+        'Ring Duration': [float(n) for n in range(40)],
+        'transcript': ['hi'] * 40,
+    })
+    summary = CallSummary(calls.columns)
+    for start in range(0, 20, 5):
+        summary.update(calls.iloc[start:start + 5])
+    copied = summary.copy()
+    copied.update(calls.iloc[15:])
+    assert (summary.total_calls, summary.duplicate_calls) == (20, 0)
+    assert (copied.total_calls, copied.duplicate_calls) == (40, 5)
+    assert summary.durations == CallSummary.from_frame(calls.iloc[:20]).durations
+    assert sum(map(len, copied.row_keys)) == 40
+
+def test_streamed_summary_matches_the_in_memory_one():
+    with open(SAMPLE_CSV, 'rb') as f:
+        raw = f.read()
+    in_memory = CallSummary.from_frame(load_call_data(raw))
+    streamed = CallSummary.from_chunks(iter_call_chunks(raw, chunksize=250))
+    assert dashboard_metrics(streamed) == dashboard_metrics(in_memory)
+    assert dashboard_breakdowns(streamed) == dashboard_breakdowns(in_memory)
+    pd.testing.assert_frame_equal(streamed.trends('Day'), in_memory.trends('Day'))
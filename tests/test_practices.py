@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+
+from metrics import CallSummary
+from practices import UNKNOWN_PRACTICE, compare_practices
+
+def classified_calls(rows, **extra):
+    purposes, successes, sentiments, rings = zip(*rows)
+    return pd.DataFrame({
+        'Call Time': pd.date_range('2025-08-11 09:00', periods=len(rows), freq='h'),
+        'Ring Duration': rings,
+        'transcript': ['hello'] * len(rows),
+        'Call_Purpose': purposes,
+        'Booking_Success': successes,
+        'Sentiment': sentiments,
+        **extra,
+    })
+
+def test_practices_are_compared_per_id_with_missing_ids_kept_apart():
+    shared = classified_calls([
+        ('Appointment Booking', 'Successful', 'Positive', 10.0),
+        ('Appointment Booking', 'Failed', 'Negative', 20.0),
+        ('Cancellation', 'N/A', 'Neutral', np.nan),
+        ('No-Show Followup', 'N/A', 'Neutral', 5.0),
+        ('Appointment Booking', 'Successful', 'Positive', 15.0),
+        ('Cancellation', 'N/A', 'Negative', 30.0),
+    ], **{'Practice ID': ['east', 'east', 'east', 'west', 'west', None]})
+    single = classified_calls([
+        ('Appointment Booking', 'Successful', 'Positive', 8.0),
+        ('Cancellation', 'N/A', 'Negative', 12.0),
+    ])
+    comparison = compare_practices({
+        'shared.csv': CallSummary.from_frame(shared),
+        'north.csv': CallSummary.from_frame(single),
+        'empty.csv': None,
+    })
+
+    expected = pd.DataFrame({
+        'Call Volume': [3, 2, 2, 1],
+        'Booking Conversion (%)': [50.0, 100.0, 100.0, np.nan],
+        'Cancellation Rate (%)': [100 / 3, 0.0, 50.0, 100.0],
+        'No-Show Rate (%)': [0.0, 50.0, 0.0, 0.0],
+        'Net Sentiment': [0.0, 50.0, 0.0, -100.0],
+        'Avg Ring Time (s)': [15.0, 10.0, 10.0, 30.0],
+    }, index=pd.Index(['east', 'west', 'north.csv', UNKNOWN_PRACTICE], name='practice'))
+    pd.testing.assert_frame_equal(comparison.loc[expected.index, expected.columns], expected, check_dtype=False)
+    assert sorted(comparison.index) == sorted(expected.index)
+
+def test_nothing_to_compare_gives_an_empty_table():
+    assert compare_practices({'a.csv': None}).empty
@@ -0,0 +1,60 @@
+import threading
+import tracemalloc
+
+import profiling
+
+def test_memory_tracing_stops_with_the_last_profile_using_it():
+    assert not tracemalloc.is_tracing()
+    profiling.start(trace_memory=True)
+    started = threading.Event()
+    finish = threading.Event()
+    records = []
+
+    def other_session():
+        profiling.start(trace_memory=True)
+        started.set()
+        finish.wait()
+        with profiling.stage("Build") as record:
+            bytearray(1 << 20)
+        records.append(record)
+        profiling.stop()
+
+    thread = threading.Thread(target=other_session, daemon=True)
+    thread.start()
+    started.wait()
+    # The session that started tracing ends first: the other one still needs it
+    profiling.stop()
+    still_tracing = tracemalloc.is_tracing()
+    finish.set()
+    thread.join()
+    assert still_tracing
+    assert records[0]['peak_bytes'] >= 1 << 20
+    assert not tracemalloc.is_tracing()
+
+def test_stage_records_are_not_shared_when_not_profiling():
+    profiling.stop()
+    with profiling.stage("Parse") as first:
+        first['rows'] = 10
+    with profiling.stage("Parse") as second:
+        pass
+    assert second == {}
+
+def test_stop_leaves_tracing_started_elsewhere_running():
+    tracemalloc.start()
+    try:
+        profiling.start(trace_memory=True)
+        profiling.stop()
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
+
+def test_a_profile_left_running_by_a_failed_run_can_be_stopped_later():
+    left = []
+    thread = threading.Thread(target=lambda: left.append(profiling.start(trace_memory=True)))
+    thread.start()
+    thread.join()
+    assert tracemalloc.is_tracing()
+    # The next run, on another thread, releases it; stopping twice is harmless
+    profiling.stop(left[0])
+    profiling.stop(left[0])
+    assert not tracemalloc.is_tracing()
@@ -0,0 +1,28 @@
+import json
+import shutil
+
+import report
+from conftest import SAMPLE_CSV
+
+def test_practice_report_classifies_with_the_given_function():
+    calls = []
+
+    def classify(data):
+        calls.append(len(data))
+        return report.classify_calls(data, workers=0)
+
+    result = report.practice_report(SAMPLE_CSV, chunksize=500, classify=classify)
+    assert calls == [500, 500, 342]
+    assert result == report.practice_report(SAMPLE_CSV)
+
+def test_main_reports_every_export_with_workers_classifying_serially(tmp_path, monkeypatch):
+    # Workers inheriting a pool setting must not start pools of their own
+    monkeypatch.setenv('VOICESTACK_WORKERS', '-1')
+    assert report._classify_serially.keywords == {'workers': 0}
+    exports = tmp_path / 'exports'
+    exports.mkdir()
+    for name in ['north', 'south']:
+        shutil.copy(SAMPLE_CSV, exports / f'{name}.csv')
+    report.main([str(exports), '--out', str(tmp_path / 'out'), '--workers', '2'])
+    combined = json.loads((tmp_path / 'out' / 'all_practices.json').read_text())
+    assert [row['practice'] for row in combined] == ['north', 'south']
@@ -0,0 +1,29 @@
+import pandas as pd
+import pytest
+
+from conftest import SAMPLE_CSV
+from schema import resolve_schema
+
+@pytest.mark.parametrize('name', ['call_id', 'Call_ID', 'CallId', 'CallID', 'callId', 'Call ID', 'call-id', 'CALL_ID'])
+def test_call_id_resolves_whatever_the_spelling(name):
+    schema = resolve_schema(['Call Time', 'transcript', name, 'Total Duration'])
+    assert schema['call_id'] == name
+
+def test_camel_case_fields_and_durations_resolve():
+    schema = resolve_schema(['CallTime', 'CallDirection', 'CallStatus', 'ContactType', 'PracticeId',
+                             'RingDuration', 'ConversationDuration', 'TotalDuration', 'Transcript'])
+    assert schema['direction'] == 'CallDirection'
+    assert schema['practice'] == 'PracticeId'
+    assert schema['date'] == 'CallTime'
+    assert (schema['ring'], schema['conversation'], schema['total']) == \
+        ('RingDuration', 'ConversationDuration', 'TotalDuration')
+    assert schema['timestamps'] == ['CallTime']
+
+def test_sample_export_resolves_as_before():
+    schema = resolve_schema(pd.read_csv(SAMPLE_CSV, nrows=0).columns)
+    assert schema['transcript'] == 'transcript'
+    assert schema['direction'] == 'Call Direction'
+    assert schema['status'] == 'Call Status'
+    assert schema['date'] == 'Call Time'
+    assert schema['ring'] == 'Ring Duration'
+    assert schema['call_id'] is None
@@ -0,0 +1,43 @@
+import pytest
+
+from search import TranscriptIndex
+
+DOCUMENTS = [
+    "I need to reschedule my cleaning",        # 0
+    "question about insurance and my copay",   # 1
+    "reschedule please, insurance changed",    # 2
+    "please call back about the bill",         # 3
+    "or and not are just words here",          # 4
+]
+
+@pytest.fixture(scope='module')
+def index():
+    return TranscriptIndex(DOCUMENTS)
+
+def found(index, query):
+    return sorted(index.search(query).tolist())
+
+def test_and_binds_tighter_than_or(index):
+    assert found(index, 'reschedule AND insurance OR copay') == [1, 2]
+    assert found(index, 'reschedule AND (insurance OR cleaning)') == [0, 2]
+    assert found(index, 'reschedule insurance') == [2]   # AND is implied
+
+def test_not_excludes_and_nests(index):
+    assert found(index, 'reschedule NOT insurance') == [0]
+    assert found(index, 'NOT (reschedule OR insurance)') == [3, 4]
+    assert found(index, 'NOT NOT copay') == [1]
+
+def test_quoted_phrases_match_adjacent_words_and_operators_as_words(index):
+    assert found(index, '"call back"') == [3]
+    assert found(index, '"back call"') == []
+    assert found(index, '"my cleaning" OR "the bill"') == [0, 3]
+    assert found(index, '"or" "and"') == [4]
+
+@pytest.mark.parametrize('query', ['OR', 'AND', ')', 'reschedule )', 'reschedule AND', '(reschedule OR',
+                                   '(reschedule', 'OR insurance', 'reschedule AND OR copay', 'NOT', '()'])
+def test_malformed_queries_raise(index, query):
+    with pytest.raises(ValueError):
+        index.search(query)
+
+def test_empty_query_matches_nothing(index):
+    assert found(index, '') == []
@@ -0,0 +1,66 @@
+from datetime import date
+
+import pandas as pd
+
+import store
+from classifier import DERIVED_COLUMNS
+from conftest import SAMPLE_CSV
+from loader import classify_calls, parse_date_columns
+from store import CallStore
+
+def sample_calls(rows=300):
+    # 105, 130 and 65 calls on 2025-08-11, 12 and 13
+    return parse_date_columns(pd.read_csv(SAMPLE_CSV).head(rows))
+
+def as_text(data):
+    # Stored frames come back with their own dtypes; compare values, missing as None
+    data = data.reset_index(drop=True)
+    return data.astype(object).where(data.notna(), None).astype(str)
+
+def test_appended_calls_load_back_by_date_range(tmp_path):
+    calls = sample_calls()
+    call_store = CallStore(str(tmp_path))
+    labeled = call_store.classify_and_append(calls)
+    expected = classify_calls(calls.copy())
+    pd.testing.assert_frame_equal(as_text(labeled[expected.columns]), as_text(expected))
+
+    assert call_store.date_range() == (date(2025, 8, 11), date(2025, 8, 13))
+    assert len(call_store.load()) == 300
+
+    day = date(2025, 8, 12)
+    loaded = call_store.load(day, day, columns=['Call Time', 'transcript'] + DERIVED_COLUMNS)
+    wanted = expected[expected['Call Time'].dt.date == day]
+    assert len(loaded) == 130
+    pd.testing.assert_frame_equal(as_text(loaded), as_text(wanted[loaded.columns]))
+    assert len(call_store.load(date(2025, 8, 12), date(2025, 8, 13))) == 195
+
+def test_stored_calls_are_not_classified_again(tmp_path, monkeypatch):
+    call_store = CallStore(str(tmp_path))
+    call_store.classify_and_append(sample_calls(200))
+    classified = []
+    monkeypatch.setattr(store, 'classify_calls', lambda data: classified.append(len(data)) or classify_calls(data))
+    call_store.classify_and_append(sample_calls(300))
+    assert classified == [100]
+    assert len(call_store.load()) == 300
+
+def test_listing_is_reread_only_after_the_store_changes(tmp_path, monkeypatch):
+    call_store = CallStore(str(tmp_path))
+    call_store.classify_and_append(sample_calls(200))
+    reads = []
+    read_schema = store.pq.read_schema
+    monkeypatch.setattr(store.pq, 'read_schema', lambda path: reads.append(path) or read_schema(path))
+
+    version = call_store.version()
+    columns = call_store.columns()
+    assert call_store.date_range() == (date(2025, 8, 11), date(2025, 8, 12))
+    assert len(reads) == 2  # one per part file, listed once
+    reads.clear()
+    assert (call_store.version(), call_store.columns()) == (version, columns)
+    assert reads == []
+
+    # Another process appending to the same directory is picked up, reading only the new parts
+    CallStore(str(tmp_path)).classify_and_append(sample_calls(300))
+    reads.clear()
+    assert call_store.version() != version
+    assert call_store.date_range() == (date(2025, 8, 11), date(2025, 8, 13))
+    assert [path.split('/')[-2] for path in reads] == ['call_date=2025-08-12', 'call_date=2025-08-13']
@@ -0,0 +1,56 @@
+import shutil
+
+import numpy as np
+
+from conftest import SAMPLE_CSV
+from loader import load_call_data
+from metrics import CallSummary
+from tail import CallTail, complete_rows_length
+
+def _sample_bytes():
+    with open(SAMPLE_CSV, 'rb') as f:
+        return f.read()
+
+def test_complete_rows_length_skips_quoted_line_breaks():
+    assert complete_rows_length(b'a,"x\ny"\nb,c\nd,"e') == 12
+    assert complete_rows_length(b'a,"x\ny') == 0
+
+def test_last_row_without_line_break_is_ingested_once_file_settles(tmp_path):
+    raw = _sample_bytes()
+    assert not raw.endswith(b'\n')
+    path = tmp_path / 'calls.csv'
+    path.write_bytes(raw)
+
+    tail = CallTail(str(path))
+    tail.poll()
+    tail.poll()   # unchanged for a poll: the unterminated last row is complete
+
+    expected = CallSummary.from_frame(load_call_data(raw))
+    assert tail.summary.total_calls == expected.total_calls == 1342
+    assert tail.poll() == 0
+
+def test_growing_file_matches_full_load(tmp_path):
+    raw = _sample_bytes() + b'\r\n'
+    path = tmp_path / 'calls.csv'
+    path.write_bytes(b'')
+    tail = CallTail(str(path), chunksize=300)
+    rng = np.random.default_rng(0)
+    position = 0
+    while position < len(raw):
+        step = int(rng.integers(1, 40000))
+        with open(path, 'ab') as f:
+            f.write(raw[position:position + step])
+        position += step
+        tail.poll()
+
+    expected = CallSummary.from_frame(load_call_data(raw))
+    assert tail.summary.total_calls == expected.total_calls
+    for field in ['purpose', 'sentiment', 'direction', 'status', 'date']:
+        assert tail.summary.value_counts(field).equals(expected.value_counts(field)), field
+
+def test_drop_directory_picks_up_finished_files(tmp_path):
+    shutil.copy(SAMPLE_CSV, tmp_path / 'a.csv')
+    tail = CallTail(str(tmp_path))
+    tail.poll()
+    tail.poll()
+    assert tail.summary.total_calls == 1342
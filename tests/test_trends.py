@@ -0,0 +1,28 @@
+import numpy as np
+import pandas as pd
+
+from schema import resolve_schema
+from trends import hourly_sums, merge_sums
+
+def calls(times, purposes, rings):
+    return pd.DataFrame({
+        'Call Time': pd.to_datetime(times),
+        'Call_Purpose': purposes,
+        'Ring Duration': np.array(rings, dtype='float32'),
+    })
+
+def test_merged_sums_keep_integer_counts_and_float64_ring_time():
+    first = calls(['2024-03-01 09:10', '2024-03-01 09:40'], ['Cancellation', 'Appointment Booking'], [3.1, np.nan])
+    second = calls(['2024-03-01 10:05', '2024-03-01 09:20'], ['Cancellation', 'Cancellation'], [2.2, 4.7])
+    schema = resolve_schema(first.columns)
+    merged = merge_sums(hourly_sums(first, schema), hourly_sums(second, schema))
+
+    assert merged['ring_sum'].dtype == np.float64
+    counts = merged.drop(columns='ring_sum')
+    assert (counts.dtypes == np.int64).all()
+    assert merged['calls'].tolist() == [3, 1]
+    assert merged['cancellations'].tolist() == [2, 1]
+    assert merged['ring_count'].tolist() == [2, 1]
+    assert merged['ring_sum'].tolist() == [
+        float(np.float32(3.1)) + float(np.float32(4.7)), float(np.float32(2.2))
+    ]
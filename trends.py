@@ -0,0 +1,94 @@
+import pandas as pd
+
+# Trend granularity -> resample rule (weeks start on Monday)
+TREND_FREQUENCIES = {'Hour': 'H', 'Day': 'D', 'Week': 'W-MON'}
+
+# Trend metric -> (numerator column, denominator column or None, scale)
+TREND_METRICS = {
+    'Call Volume': ('calls', None, 1),
+    'Booking Conversion (%)': ('bookings', 'booking_calls', 100),
+    'Cancellation Rate (%)': ('cancellations', 'calls', 100),
+    'No-Show Rate (%)': ('noshows', 'calls', 100),
+    'Net Sentiment': ('net_sentiment', 'calls', 100),
+    'Avg Ring Time (s)': ('ring_sum', 'ring_count', 1),
+}
+# Sums of measurements, kept in float64; every other column counts calls (int64)
+FLOAT_SUMS = ['ring_sum']
+
+def call_sums(data, schema):
+    """Per-call contributions to every TREND_METRICS numerator and denominator.
+
+    Every column is additive, so grouping these rows by any key (hour,
+    practice) and summing gives tables that merge across chunks by addition.
+    """
+    sums = pd.DataFrame({'calls': 1}, index=data.index)
+    if 'Call_Purpose' in data.columns:
+        purposes = data['Call_Purpose']
+        sums['booking_calls'] = purposes == 'Appointment Booking'
+        sums['cancellations'] = purposes == 'Cancellation'
+        sums['noshows'] = purposes == 'No-Show Followup'
+        if 'Booking_Success' in data.columns:
+            sums['bookings'] = sums['booking_calls'] & (data['Booking_Success'] == 'Successful')
+    if 'Sentiment' in data.columns:
+        sums['net_sentiment'] = (
+            (data['Sentiment'] == 'Positive').astype('int64') - (data['Sentiment'] == 'Negative').astype('int64')
+        )
+    ring_col = schema['ring']
+    if ring_col is not None:
+        ring = pd.to_numeric(data[ring_col], errors='coerce')
+        # Ring times load as float32; accumulate in float64 so long exports stay exact
+        sums['ring_sum'] = ring.fillna(0).astype('float64')
+        sums['ring_count'] = ring.notna()
+    return sums
+
+def hourly_sums(data, schema):
+    """Per-hour call_sums for one chunk of classified calls.
+
+    Any coarser period is a plain resample-sum of this table. Returns None
+    without a parsed date column; calls with no date are left out.
+    """
+    date_col = schema['date']
+    if date_col is None or not pd.api.types.is_datetime64_any_dtype(data[date_col]):
+        return None
+    return call_sums(data, schema).groupby(data[date_col].dt.floor('H')).sum()
+
+def merge_sums(current, new):
+    """Add two hourly tables, keeping one sorted datetime index and integer counts"""
+    if current is None:
+        return new
+    if new is None:
+        return current
+    merged = current.add(new, fill_value=0).sort_index()
+    # Alignment fills with floats; counts go back to int64
+    counts = merged.columns.difference(FLOAT_SUMS, sort=False)
+    merged[counts] = merged[counts].astype('int64')
+    return merged
+
+def resample_sums(hourly, freq='Day'):
+    """Hourly sums rolled up to 'Hour', 'Day' or 'Week'; periods without calls are zeros"""
+    return hourly.resample(TREND_FREQUENCIES[freq], label='left', closed='left').sum()
+
+def sum_metrics(sums):
+    """TREND_METRICS for each row of a summed table. Rates with no calls behind them are NaN"""
+    metrics = pd.DataFrame(index=sums.index)
+    for name, (numerator, denominator, scale) in TREND_METRICS.items():
+        if numerator not in sums.columns:
+            continue
+        if denominator is None:
+            metrics[name] = sums[numerator] * scale
+        else:
+            metrics[name] = sums[numerator] / sums[denominator].where(sums[denominator] > 0) * scale
+    return metrics
+
+def trend_metrics(sums, window=1):
+    """TREND_METRICS per period from a resampled table.
+
+    window > 1 gives trailing values over that many periods: numerators and
+    denominators are rolled separately (one incremental pass each) so rates
+    are weighted by call volume.
+    """
+    if window > 1:
+        sums = sums.rolling(window, min_periods=1).sum()
+    metrics = sum_metrics(sums)
+    metrics.index.name = 'period'
+    return metrics